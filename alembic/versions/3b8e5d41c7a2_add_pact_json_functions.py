@@ -0,0 +1,86 @@
+"""add pact json functions and foreign key indexes
+
+Revision ID: 3b8e5d41c7a2
+Revises: 58f19222c427
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e5d41c7a2'
+down_revision: Union[str, None] = '58f19222c427'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept as they were at this revision, a change to the functions needs a migration of its own.
+CREATE_FUNCTIONS_SQL = r"""
+CREATE OR REPLACE FUNCTION pact_json_float(value double precision) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT AS $$
+    SELECT CASE
+        WHEN value = 0 THEN CASE WHEN value::text = '-0' THEN '-0.0' ELSE '0.0' END
+        WHEN abs(value) >= 1e-5 AND abs(value) < 1e16 THEN
+            CASE WHEN position('.' IN value::text::numeric::text) = 0
+                THEN value::text::numeric::text || '.0'
+                ELSE value::text::numeric::text
+            END
+        ELSE regexp_replace(value::text, 'e\+?(-?)0*', 'e\1')
+    END
+$$;
+
+CREATE OR REPLACE FUNCTION pact_json_timestamp(value timestamptz, zulu boolean) RETURNS text
+LANGUAGE sql STABLE STRICT AS $$
+    SELECT '"' || to_char(value, 'YYYY-MM-DD"T"HH24:MI:SS')
+        || CASE WHEN to_char(value, 'US') = '000000' THEN '' ELSE '.' || to_char(value, 'US') END
+        || CASE WHEN zulu AND to_char(value, 'TZH:TZM') = '+00:00' THEN 'Z' ELSE to_char(value, 'TZH:TZM') END
+        || '"'
+$$;
+
+CREATE OR REPLACE FUNCTION pact_json_compact(value jsonb) RETURNS text
+LANGUAGE plpgsql IMMUTABLE STRICT AS $$
+BEGIN
+    CASE jsonb_typeof(value)
+        WHEN 'object' THEN
+            RETURN '{' || coalesce((
+                SELECT string_agg(to_json(entry.key)::text || ':' || pact_json_compact(entry.item), ',' ORDER BY entry.ordinality)
+                FROM jsonb_each(value) WITH ORDINALITY AS entry(key, item, ordinality)
+            ), '') || '}';
+        WHEN 'array' THEN
+            RETURN '[' || coalesce((
+                SELECT string_agg(pact_json_compact(element.item), ',' ORDER BY element.ordinality)
+                FROM jsonb_array_elements(value) WITH ORDINALITY AS element(item, ordinality)
+            ), '') || ']';
+        WHEN 'number' THEN
+            IF value::text ~ '[.eE]' THEN
+                RETURN pact_json_float(value::text::double precision);
+            END IF;
+            RETURN value::text;
+        ELSE
+            RETURN value::text;
+    END CASE;
+END
+$$;
+"""
+
+DROP_FUNCTIONS_SQL = """
+DROP FUNCTION IF EXISTS pact_json_compact(jsonb);
+DROP FUNCTION IF EXISTS pact_json_timestamp(timestamptz, boolean);
+DROP FUNCTION IF EXISTS pact_json_float(double precision);
+"""
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_carbonfootprint_product_footprint_pk'), 'carbonfootprint', ['product_footprint_pk'], unique=False)
+    op.create_index(op.f('ix_productorsectorspecificrule_carbon_footprint_pk'), 'productorsectorspecificrule', ['carbon_footprint_pk'], unique=False)
+    op.create_index(op.f('ix_emissionfactordataset_carbon_footprint_pk'), 'emissionfactordataset', ['carbon_footprint_pk'], unique=False)
+    op.execute(CREATE_FUNCTIONS_SQL)
+
+
+def downgrade() -> None:
+    op.execute(DROP_FUNCTIONS_SQL)
+    op.drop_index(op.f('ix_emissionfactordataset_carbon_footprint_pk'), table_name='emissionfactordataset')
+    op.drop_index(op.f('ix_productorsectorspecificrule_carbon_footprint_pk'), table_name='productorsectorspecificrule')
+    op.drop_index(op.f('ix_carbonfootprint_product_footprint_pk'), table_name='carbonfootprint')
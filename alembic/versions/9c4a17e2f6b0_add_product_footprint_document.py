@@ -0,0 +1,146 @@
+"""add product footprint document
+
+Revision ID: 9c4a17e2f6b0
+Revises: 3b8e5d41c7a2
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4a17e2f6b0'
+down_revision: Union[str, None] = '3b8e5d41c7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The number of footprints rendered per backfill transaction.
+BACKFILL_BATCH_SIZE = 1000
+
+productfootprint = sa.table('productfootprint', sa.column('pk', sa.Integer))
+
+# Kept as it was at this revision, a change to `db.pact_json` needs a migration of its own.
+DOCUMENT_SQL = """
+'{' || '"id":' || coalesce(to_json(productfootprint.id)::text, 'null') || ',' || '"specVersion":' ||
+coalesce(to_json(productfootprint."specVersion")::text, 'null') || ',' || '"precedingPfIds":' ||
+coalesce(array_to_json(productfootprint."precedingPfIds")::text, 'null') || ',' || '"version":' ||
+coalesce(productfootprint.version::text, 'null') || ',' || '"created":' ||
+coalesce(pact_json_timestamp(productfootprint.created, true), 'null') || ',' || '"updated":' ||
+coalesce(pact_json_timestamp(productfootprint.updated, true), 'null') || ',' || '"status":' ||
+coalesce(CASE productfootprint.status::text WHEN 'ACTIVE' THEN '"Active"' WHEN 'DEPRECATED' THEN '"Deprecated"' END, 'null') ||
+',' || '"statusComment":' || coalesce(to_json(productfootprint."statusComment")::text, 'null') ||
+',' || '"validityPeriodStart":' ||
+coalesce(pact_json_timestamp(productfootprint."validityPeriodStart", true), 'null') || ',' ||
+'"validityPeriodEnd":' ||
+coalesce(pact_json_timestamp(productfootprint."validityPeriodEnd", true), 'null') || ',' ||
+'"companyName":' || coalesce(to_json(productfootprint."companyName")::text, 'null') || ',' ||
+'"companyIds":' || coalesce(array_to_json(productfootprint."companyIds")::text, 'null') || ',' ||
+'"productDescription":' || coalesce(to_json(productfootprint."productDescription")::text, 'null') ||
+',' || '"productIds":' || coalesce(array_to_json(productfootprint."productIds")::text, 'null') ||
+',' || '"productCategoryCpc":' ||
+coalesce(to_json(productfootprint."productCategoryCpc")::text, 'null') || ',' ||
+'"productNameCompany":' || coalesce(to_json(productfootprint."productNameCompany")::text, 'null') ||
+',' || '"comment":' || coalesce(to_json(productfootprint.comment)::text, 'null') || ',' ||
+'"pcf":' || coalesce(CASE WHEN carbonfootprint.pk IS NULL THEN NULL ELSE '{' || '"declaredUnit":' ||
+coalesce(CASE carbonfootprint.declared_unit::text WHEN 'LITER' THEN '"liter"' WHEN 'KILOGRAM' THEN '"kilogram"' WHEN 'CUBIC_METER' THEN '"cubic meter"' WHEN 'KILOWATT_HOUR' THEN '"kilowatt hour"' WHEN 'MEGAJOULE' THEN '"megajoule"' WHEN 'TON_KILOMETER' THEN '"ton kilometer"' WHEN 'SQUARE_METER' THEN '"square meter"' END, 'null') ||
+',' || '"unitaryProductAmount":' ||
+coalesce(pact_json_float(carbonfootprint.unitary_product_amount), 'null') || ',' ||
+'"pCfExcludingBiogenic":' ||
+coalesce(pact_json_float(carbonfootprint.pcf_excluding_biogenic), 'null') || ',' ||
+'"pCfIncludingBiogenic":' ||
+coalesce(pact_json_float(carbonfootprint.pcf_including_biogenic), 'null') || ',' ||
+'"fossilGhgEmissions":' ||
+coalesce(pact_json_float(carbonfootprint.fossil_ghg_emissions), 'null') || ',' ||
+'"fossilCarbonContent":' ||
+coalesce(pact_json_float(carbonfootprint.fossil_carbon_content), 'null') || ',' ||
+'"biogenicCarbonContent":' ||
+coalesce(pact_json_float(carbonfootprint.biogenic_carbon_content), 'null') || ',' ||
+'"dLucGhgEmissions":' || coalesce(pact_json_float(carbonfootprint.dluc_ghg_emissions), 'null') ||
+',' || '"landManagementGhgEmissions":' ||
+coalesce(pact_json_float(carbonfootprint.land_management_ghg_emissions), 'null') || ',' ||
+'"otherBiogenicGhgEmissions":' ||
+coalesce(pact_json_float(carbonfootprint.other_biogenic_ghg_emissions), 'null') || ',' ||
+'"iLucGhgEmissions":' || coalesce(pact_json_float(carbonfootprint.iluc_ghg_emissions), 'null') ||
+',' || '"biogenicCarbonWithdrawal":' ||
+coalesce(pact_json_float(carbonfootprint.biogenic_carbon_withdrawal), 'null') || ',' ||
+'"aircraftGhgEmissions":' ||
+coalesce(pact_json_float(carbonfootprint.aircraft_ghg_emissions), 'null') || ',' ||
+'"characterizationFactors":' ||
+coalesce(CASE carbonfootprint.characterization_factors::text WHEN 'AR5' THEN '"AR5"' WHEN 'AR6' THEN '"AR6"' END, 'null') ||
+',' || '"crossSectoralStandardsUsed":' ||
+coalesce(CASE WHEN carbonfootprint.cross_sectoral_standards_used IS NULL THEN NULL ELSE '[' ||
+coalesce((SELECT string_agg(CASE item.value::text WHEN 'GHG_PROTOCOL' THEN '"GHG Protocol Product standard"' WHEN 'ISO_14067' THEN '"ISO Standard 14067"' WHEN 'ISO_14044' THEN '"ISO Standard 14044"' END, ',' ORDER BY item.ordinality) FROM unnest(carbonfootprint.cross_sectoral_standards_used) WITH ORDINALITY AS item(value, ordinality)), '') ||
+']' END, 'null') || ',' || '"productOrSectorSpecificRules":' || coalesce('[' ||
+coalesce((SELECT string_agg('{' || '"operator":' ||
+coalesce(CASE productorsectorspecificrule.operator::text WHEN 'PEF' THEN '"PEF"' WHEN 'EPD_INTERNATIONAL' THEN '"EPD International"' WHEN 'OTHER' THEN '"Other"' END, 'null') ||
+',' || '"ruleNames":' ||
+coalesce(array_to_json(productorsectorspecificrule.rule_names)::text, 'null') || ',' ||
+'"otherOperatorName":' ||
+coalesce(to_json(productorsectorspecificrule.other_operator_name)::text, 'null') ||
+'}', ',' ORDER BY productorsectorspecificrule.pk) FROM productorsectorspecificrule WHERE productorsectorspecificrule.carbon_footprint_pk = carbonfootprint.pk), '') ||
+']', 'null') || ',' || '"biogenicAccountingMethodology":' ||
+coalesce(CASE carbonfootprint.biogenic_accounting_methodology::text WHEN 'PEF' THEN '"PEF"' WHEN 'ISO' THEN '"ISO"' WHEN 'GHGP' THEN '"GHGP"' WHEN 'QUANTIS' THEN '"Quantis"' END, 'null') ||
+',' || '"boundaryProcessesDescription":' ||
+coalesce(to_json(carbonfootprint.boundary_processes_description)::text, 'null') || ',' ||
+'"referencePeriodStart":' ||
+coalesce(pact_json_timestamp(carbonfootprint.reference_period_start, false), 'null') || ',' ||
+'"referencePeriodEnd":' ||
+coalesce(pact_json_timestamp(carbonfootprint.reference_period_end, false), 'null') || ',' ||
+'"geographyCountrySubdivision":' ||
+coalesce(to_json(carbonfootprint.geography_country_subdivision)::text, 'null') || ',' ||
+'"geographyCountry":' || coalesce(to_json(carbonfootprint.geography_country)::text, 'null') ||
+',' || '"geographyRegionOrSubregion":' ||
+coalesce(CASE carbonfootprint.geography_region_or_subregion::text WHEN 'AFRICA' THEN '"Africa"' WHEN 'AMERICAS' THEN '"Americas"' WHEN 'ASIA' THEN '"Asia"' WHEN 'EUROPE' THEN '"Europe"' WHEN 'OCEANIA' THEN '"Oceania"' WHEN 'AUSTRALIA_AND_NEW_ZEALAND' THEN '"Australia and New Zealand"' WHEN 'CENTRAL_ASIA' THEN '"Central Asia"' WHEN 'EASTERN_ASIA' THEN '"Eastern Asia"' WHEN 'EASTERN_EUROPE' THEN '"Eastern Europe"' WHEN 'LATIN_AMERICA_AND_THE_CARIBBEAN' THEN '"Latin America and the Caribbean"' WHEN 'MELANESIA' THEN '"Melanesia"' WHEN 'MICRONESIA' THEN '"Micronesia"' WHEN 'NORTHERN_AFRICA' THEN '"Northern Africa"' WHEN 'NORTHERN_AMERICA' THEN '"Northern America"' WHEN 'NORTHERN_EUROPE' THEN '"Northern Europe"' WHEN 'POLYNESIA' THEN '"Polynesia"' WHEN 'SOUTH_EASTERN_ASIA' THEN '"South-eastern Asia"' WHEN 'SOUTHERN_ASIA' THEN '"Southern Asia"' WHEN 'SOUTHERN_EUROPE' THEN '"Southern Europe"' WHEN 'SUB_SAHARAN_AFRICA' THEN '"Sub-Saharan Africa"' WHEN 'WESTERN_ASIA' THEN '"Western Asia"' WHEN 'WESTERN_EUROPE' THEN '"Western Europe"' END, 'null') ||
+',' || '"secondaryEmissionFactorSources":' || coalesce('[' || coalesce((SELECT string_agg('{' ||
+'"name":' || coalesce(to_json(emissionfactordataset.name)::text, 'null') || ',' || '"version":' ||
+coalesce(to_json(emissionfactordataset.version)::text, 'null') ||
+'}', ',' ORDER BY emissionfactordataset.pk) FROM emissionfactordataset WHERE emissionfactordataset.carbon_footprint_pk = carbonfootprint.pk), '') ||
+']', 'null') || ',' || '"exemptedEmissionsPercent":' ||
+coalesce(pact_json_float(carbonfootprint.exempted_emissions_percent), 'null') || ',' ||
+'"exemptedEmissionsDescription":' ||
+coalesce(to_json(carbonfootprint.exempted_emissions_description)::text, 'null') || ',' ||
+'"packagingEmissionsIncluded":' ||
+coalesce(CASE WHEN carbonfootprint.packaging_emissions_included THEN 'true' WHEN NOT carbonfootprint.packaging_emissions_included THEN 'false' END, 'null') ||
+',' || '"packagingGhgEmissions":' ||
+coalesce(pact_json_float(carbonfootprint.packaging_ghg_emissions), 'null') || ',' ||
+'"allocationRulesDescription":' ||
+coalesce(to_json(carbonfootprint.allocation_rules_description)::text, 'null') || ',' ||
+'"uncertaintyAssessmentDescription":' ||
+coalesce(to_json(carbonfootprint.uncertainty_assessment_description)::text, 'null') || ',' ||
+'"primaryDataShare":' || coalesce(pact_json_float(carbonfootprint.primary_data_share), 'null') ||
+',' || '"dqi":' || coalesce(pact_json_compact(carbonfootprint.dqi), 'null') || ',' ||
+'"assurance":' || coalesce(pact_json_compact(carbonfootprint.assurance), 'null') ||
+'}' END, 'null') || ',' || '"extensions":' ||
+coalesce(pact_json_compact(productfootprint.extensions), 'null') || '}'
+"""
+
+# `pact_json_timestamp` renders in the TimeZone of the session at this revision, so each
+# batch pins it to UTC, as the application's sessions are. The two statements are sent
+# at once, which Postgres runs as one transaction, so SET LOCAL holds for the batch.
+BACKFILL_SQL = sa.text(
+    "SET LOCAL timezone = 'UTC'; "
+    "UPDATE productfootprint SET document = rendered.document FROM ("
+    f"SELECT productfootprint.pk, convert_to({DOCUMENT_SQL.strip()}, 'UTF8') AS document "
+    "FROM productfootprint LEFT OUTER JOIN carbonfootprint ON carbonfootprint.product_footprint_pk = productfootprint.pk "
+    "WHERE productfootprint.pk > :start AND productfootprint.pk <= :end AND productfootprint.document IS NULL"
+    ") AS rendered WHERE productfootprint.pk = rendered.pk"
+)
+
+
+def upgrade() -> None:
+    op.add_column('productfootprint', sa.Column('document', sa.LargeBinary(), nullable=True, comment='The canonical PACT JSON of the ProductFootprint, written on ingest.'))
+
+    # The backfill commits batch by batch, so that a large table is not rewritten in one
+    # long transaction. The column being nullable, readers cope with rows not done yet.
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_pk = connection.execute(sa.select(sa.func.max(productfootprint.c.pk))).scalar() or 0
+        for start in range(0, max_pk, BACKFILL_BATCH_SIZE):
+            connection.execute(BACKFILL_SQL, {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+
+def downgrade() -> None:
+    op.drop_column('productfootprint', 'document')
@@ -0,0 +1,47 @@
+"""render pact json timestamps in utc
+
+Revision ID: a6d3f9e2b871
+Revises: f3a8c6d2e719
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f9e2b871'
+down_revision: Union[str, None] = 'f3a8c6d2e719'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept as they were at this revision, a change to the function needs a migration of its own.
+UTC_TIMESTAMP_SQL = r"""
+CREATE OR REPLACE FUNCTION pact_json_timestamp(value timestamptz, zulu boolean) RETURNS text
+LANGUAGE sql STABLE STRICT AS $$
+    SELECT '"' || to_char(value AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS')
+        || CASE WHEN to_char(value AT TIME ZONE 'UTC', 'US') = '000000' THEN '' ELSE '.' || to_char(value AT TIME ZONE 'UTC', 'US') END
+        || CASE WHEN zulu THEN 'Z' ELSE '+00:00' END
+        || '"'
+$$;
+"""
+
+SESSION_TIMESTAMP_SQL = r"""
+CREATE OR REPLACE FUNCTION pact_json_timestamp(value timestamptz, zulu boolean) RETURNS text
+LANGUAGE sql STABLE STRICT AS $$
+    SELECT '"' || to_char(value, 'YYYY-MM-DD"T"HH24:MI:SS')
+        || CASE WHEN to_char(value, 'US') = '000000' THEN '' ELSE '.' || to_char(value, 'US') END
+        || CASE WHEN zulu AND to_char(value, 'TZH:TZM') = '+00:00' THEN 'Z' ELSE to_char(value, 'TZH:TZM') END
+        || '"'
+$$;
+"""
+
+
+def upgrade() -> None:
+    # Documents stored by sessions in another time zone keep their offsets until rewritten.
+    op.execute(UTC_TIMESTAMP_SQL)
+
+
+def downgrade() -> None:
+    op.execute(SESSION_TIMESTAMP_SQL)
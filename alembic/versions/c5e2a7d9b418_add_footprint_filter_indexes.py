@@ -0,0 +1,40 @@
+"""add footprint filter indexes
+
+Revision ID: c5e2a7d9b418
+Revises: 9c4a17e2f6b0
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2a7d9b418'
+down_revision: Union[str, None] = '9c4a17e2f6b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The columns that `$filter` compares, see `db.footprint_filter`.
+INDEXES = [
+    ('ix_productfootprint_created', 'productfootprint', 'created'),
+    ('ix_productfootprint_updated', 'productfootprint', 'updated'),
+    ('ix_productfootprint_productCategoryCpc', 'productfootprint', 'productCategoryCpc'),
+    ('ix_carbonfootprint_geography_country', 'carbonfootprint', 'geography_country'),
+    ('ix_carbonfootprint_reference_period_start', 'carbonfootprint', 'reference_period_start'),
+    ('ix_carbonfootprint_reference_period_end', 'carbonfootprint', 'reference_period_end'),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently, outside of a transaction, so that writes carry on meanwhile.
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(op.f(name), table, [column], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(op.f(name), table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,40 @@
+"""add footprint id array indexes
+
+Revision ID: e1f7b3c9a254
+Revises: c5e2a7d9b418
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f7b3c9a254'
+down_revision: Union[str, None] = 'c5e2a7d9b418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The id arrays looked up by containment, see `db.repository.product_footprints.with_product_id`.
+INDEXES = [
+    ('ix_productfootprint_precedingPfIds', 'precedingPfIds'),
+    ('ix_productfootprint_companyIds', 'companyIds'),
+    ('ix_productfootprint_productIds', 'productIds'),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently, outside of a transaction, so that writes carry on meanwhile.
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.create_index(
+                name, 'productfootprint', [column], unique=False,
+                postgresql_using='gin', postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='productfootprint', postgresql_concurrently=True)
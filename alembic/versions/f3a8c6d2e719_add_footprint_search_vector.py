@@ -0,0 +1,42 @@
+"""add footprint search vector
+
+Revision ID: f3a8c6d2e719
+Revises: e1f7b3c9a254
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c6d2e719'
+down_revision: Union[str, None] = 'e1f7b3c9a254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept as it was at this revision, a change to `SEARCH_VECTOR_SQL` needs a migration of its own.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(\"productNameCompany\", '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(\"productDescription\", '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(comment, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites the table, which is locked meanwhile.
+    op.add_column('productfootprint', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True), comment='The full-text search vector of the product name, description and comment.'))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_productfootprint_search_vector', 'productfootprint', ['search_vector'], unique=False,
+            postgresql_using='gin', postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_productfootprint_search_vector', table_name='productfootprint', postgresql_concurrently=True)
+    op.drop_column('productfootprint', 'search_vector')
@@ -1,15 +1,51 @@
 from fastapi import APIRouter
+from fastapi import Depends
 
+from apis.version1 import async_route_login
+from apis.version1 import async_route_product_footprints
+from apis.version1 import async_route_users
 from apis.version1 import route_login
 from apis.version1 import route_users
 from apis.version1 import route_events
+from apis.version1 import route_internal
 from apis.version1 import route_product_footprints
+from core.config import settings
+from core.rate_limit import RateLimit, client_address, token_client_id
 
+# Each route group limits its clients on its own. Token requests are told apart by their
+# address, since they have no access token yet.
+auth_rate_limit = RateLimit(
+    "auth", rate=settings.AUTH_RATE_LIMIT, burst=settings.AUTH_RATE_LIMIT_BURST, client=client_address
+)
+footprint_rate_limit = RateLimit(
+    "footprints", rate=settings.FOOTPRINT_RATE_LIMIT, burst=settings.FOOTPRINT_RATE_LIMIT_BURST, client=token_client_id
+)
 
 api_router = APIRouter(
     redirect_slashes=False
 )
 api_router.include_router(route_users.router, prefix="/users", tags=["users"])
-api_router.include_router(route_login.router, prefix="/auth", tags=["auth"])
+api_router.include_router(
+    route_login.router, prefix="/auth", tags=["auth"], dependencies=[Depends(auth_rate_limit)]
+)
 api_router.include_router(route_events.router, prefix="/2/events", tags=["events"])
-api_router.include_router(route_product_footprints.router, prefix="/2/footprints", tags=["product_footprints"])
+api_router.include_router(
+    route_product_footprints.router, prefix="/2/footprints", tags=["product_footprints"],
+    dependencies=[Depends(footprint_rate_limit)]
+)
+api_router.include_router(route_internal.router, prefix="/internal", tags=["internal"])
+
+# The same API with `async def` routes on an asyncpg session, see `settings.DATABASE_ASYNC`.
+async_api_router = APIRouter(
+    redirect_slashes=False
+)
+async_api_router.include_router(async_route_users.router, prefix="/users", tags=["users"])
+async_api_router.include_router(
+    async_route_login.router, prefix="/auth", tags=["auth"], dependencies=[Depends(auth_rate_limit)]
+)
+async_api_router.include_router(route_events.router, prefix="/2/events", tags=["events"])
+async_api_router.include_router(
+    async_route_product_footprints.router, prefix="/2/footprints", tags=["product_footprints"],
+    dependencies=[Depends(footprint_rate_limit)]
+)
+async_api_router.include_router(route_internal.router, prefix="/internal", tags=["internal"])
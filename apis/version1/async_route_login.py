@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apis.version1.route_login import password_hashing_busy_response
+from core.auth_config import get_authx_security
+from core.authorization import create_user_access_token
+from core.error_responses import BadRequestError
+from core.hashing import PasswordHashingBusyError
+from core.logger import logger
+from core.oauth2_client_credentials import OAuth2ClientCredentialsRequestForm
+from db.repository.async_users import authenticate_user
+from db.session import get_async_db
+from schemas.token import Token
+
+router = APIRouter()
+
+security = get_authx_security()
+
+
+@router.post("/token", response_model=Token)
+async def login_for_access_token(
+        form_data: OAuth2ClientCredentialsRequestForm = Depends(),
+        db: AsyncSession = Depends(get_async_db)
+):
+    logger.info("Login attempt for client_id {client_id}", client_id=form_data.client_id)
+
+    if form_data.client_id and form_data.client_secret:
+        client_id = form_data.client_id
+        client_secret = form_data.client_secret
+    else:
+        logger.warning("Missing client_id or client_secret")
+        return BadRequestError().to_json_response()
+
+    try:
+        user = await authenticate_user(client_id, client_secret, db)
+    except PasswordHashingBusyError:
+        logger.warning("Password hashing pool is full, turning away client_id {client_id}", client_id=client_id)
+        return password_hashing_busy_response()
+    if not user:
+        logger.error("Authentication failed for client_id {client_id}", client_id=client_id)
+        return JSONResponse({"error": "invalid_client", "error_description": "Authentication failed"}, status_code=400)
+
+    access_token: str = create_user_access_token(security, user)
+
+    logger.success("Access token created for user {email}", email=user.email)
+    return {"access_token": access_token, "token_type": "bearer"}
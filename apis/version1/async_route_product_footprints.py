@@ -0,0 +1,252 @@
+"""
+The `async def` versions of the routes in `apis.version1.route_product_footprints`,
+served when `settings.DATABASE_ASYNC` is enabled. They share its caching, ETag and
+pagination handling, and only differ in awaiting the async repository functions.
+"""
+
+from typing import AsyncIterator
+
+from authx import TokenPayload
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Request
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from apis.version1.route_product_footprints import (
+    NDJSON_MEDIA_TYPE, STREAM_CHUNK_BYTES, PagePlan, cached_footprint_response, footprint_content,
+    footprint_response, ingest_product_footprints, link_next_page, list_logger, not_modified_response,
+    page_response, plan_page, search_plan, security, streams_page
+)
+from core.config import settings
+from core.error_responses import BadRequestError, NoSuchFootprintError
+from core.etag import footprint_etag
+from core.pagination import JSON_PAGE_HEAD, JSONAPIPage, json_page_tail
+from db.models.user import User
+from db.repository.async_product_footprints import commit_inserted_product_footprints
+from db.repository.async_product_footprints import count_product_footprints
+from db.repository.async_product_footprints import create_new_product_footprint
+from db.repository.async_product_footprints import estimate_product_footprints
+from db.repository.async_product_footprints import insert_product_footprints
+from db.repository.async_product_footprints import list_product_footprint_documents
+from db.repository.async_product_footprints import list_product_footprints
+from db.repository.async_product_footprints import list_product_footprints_json
+from db.repository.async_product_footprints import retrieve_page_bounds
+from db.repository.async_product_footprints import retrieve_product_footprint
+from db.repository.async_product_footprints import retrieve_product_footprint_document
+from db.repository.async_product_footprints import retrieve_product_footprint_json
+from db.repository.async_product_footprints import retrieve_product_footprint_version
+from db.repository.async_product_footprints import search_product_footprints
+from db.repository.async_product_footprints import stream_product_footprint_documents
+from db.repository.product_footprints import with_company_id
+from db.repository.product_footprints import with_product_id
+from db.session import get_async_db
+from schemas.product_footprint import ProductFootprint as ProductFootprintSchema
+
+
+router = APIRouter()
+
+document_retrievers = {
+    "postgres": retrieve_product_footprint_json,
+    "document": retrieve_product_footprint_document,
+}
+document_listers = {
+    "postgres": list_product_footprints_json,
+    "document": list_product_footprint_documents,
+}
+
+
+@router.post("/create-product-footprint/", status_code=200)
+async def create_product_footprint(
+    product_footprint: ProductFootprintSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    product_footprint = await create_new_product_footprint(product_footprint=product_footprint, db=db)
+    if product_footprint:
+        return "Success"
+
+
+@router.post("/bulk", status_code=200)
+async def create_product_footprints(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    async def insert_batch(product_footprints: list[ProductFootprintSchema]) -> list[str]:
+        return await insert_product_footprints(product_footprints, db)
+
+    async def commit(ids: list[str]):
+        await commit_inserted_product_footprints(ids, db)
+
+    return await ingest_product_footprints(request, insert_batch, commit)
+
+
+@router.get("/export", status_code=200)
+async def export_product_footprints(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    lines = (document + "\n" async for document in stream_product_footprint_documents(db))
+    return StreamingResponse(stream_body(lines, db), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def stream_body(pieces: AsyncIterator[str], db: AsyncSession) -> AsyncIterator[bytes]:
+    try:
+        chunk, size = [], 0
+        async for piece in pieces:
+            encoded = piece.encode()
+            chunk.append(encoded)
+            size += len(encoded)
+            if size >= STREAM_CHUNK_BYTES:
+                yield b"".join(chunk)
+                chunk, size = [], 0
+        if chunk:
+            yield b"".join(chunk)
+    finally:
+        await db.close()
+
+
+async def stream_json_page(documents: AsyncIterator[str], total: int | None) -> AsyncIterator[str]:
+    yield JSON_PAGE_HEAD
+    index = 0
+    async for document in documents:
+        if index:
+            yield ","
+        yield document
+        index += 1
+    yield json_page_tail(total)
+
+
+@router.get("/search", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
+async def search_footprints(
+    request: Request,
+    q: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    try:
+        plan = plan_page(request, ranked=True)
+    except ValueError:
+        return BadRequestError().to_json_response()
+    if q is None or not q.strip():
+        return BadRequestError().to_json_response()
+
+    product_footprints = await search_product_footprints(
+        db=db, terms=q, limit=plan.fetch_limit, offset=plan.offset, where=plan.where
+    )
+    if not product_footprints:
+        return {'data': []}
+
+    return page_response(request, plan, product_footprints, await count_footprints(db, search_plan(plan, q)), False)
+
+
+@router.get("/{id}", response_model=dict[str, ProductFootprintSchema], status_code=200)
+async def read_product_footprint(
+    id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenPayload = Depends(security.access_token_required),
+):
+    cached_response = cached_footprint_response(request, id)
+    if cached_response is not None:
+        return cached_response
+
+    footprint_version = await retrieve_product_footprint_version(id=id, db=db)
+    if footprint_version is None:
+        return NoSuchFootprintError().to_json_response()
+
+    etag = footprint_etag(footprint_version.id, footprint_version.version, footprint_version.updated)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    if settings.FOOTPRINT_SERIALIZER in document_retrievers:
+        document = await document_retrievers[settings.FOOTPRINT_SERIALIZER](id=id, db=db)
+        if document is None:
+            return NoSuchFootprintError().to_json_response()
+        content = footprint_content(document=document)
+    else:
+        product_footprint = await retrieve_product_footprint(id=id, db=db)
+
+        if not product_footprint:
+            return NoSuchFootprintError().to_json_response()
+
+        content = footprint_content(product_footprint)
+
+    return footprint_response(id, etag, content)
+
+
+@router.get("", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
+async def list_footprints(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    list_logger.debug("Listing footprints for {subject}", subject=current_user.sub)
+    return await footprints_page(request, db)
+
+
+@router.get("/by-product-id/{product_id}", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
+async def list_footprints_by_product_id(
+    product_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    return await footprints_page(request, db, with_product_id(product_id))
+
+
+@router.get("/by-company-id/{company_id}", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
+async def list_footprints_by_company_id(
+    company_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    return await footprints_page(request, db, with_company_id(company_id))
+
+
+async def footprints_page(request: Request, db: AsyncSession, scope: ColumnElement | None = None) -> Response | dict:
+    try:
+        plan = plan_page(request, scope)
+    except ValueError:
+        return BadRequestError().to_json_response()
+
+    if streams_page(plan):
+        return await stream_footprints_page(request, plan, db)
+
+    documents = settings.FOOTPRINT_SERIALIZER in document_listers
+    list_function = document_listers[settings.FOOTPRINT_SERIALIZER] if documents else list_product_footprints
+    product_footprints = await list_function(
+        db=db, limit=plan.fetch_limit, offset=plan.fetch_offset, after_pk=plan.after_pk, where=plan.where
+    )
+    if not product_footprints or len(product_footprints) == 0:
+        return {'data': []}
+
+    return page_response(request, plan, product_footprints, await count_footprints(db, plan), documents)
+
+
+async def count_footprints(db: AsyncSession, plan: PagePlan) -> int | None:
+    if settings.FOOTPRINT_COUNT_STRATEGY == "exact":
+        return await count_product_footprints(db=db, cached=True, where=plan.where)
+    elif settings.FOOTPRINT_COUNT_STRATEGY == "estimated" and plan.where is None:
+        return await estimate_product_footprints(db=db)
+    return None
+
+
+async def stream_footprints_page(request: Request, plan: PagePlan, db: AsyncSession) -> Response | dict:
+    rows, last_pk, has_more = await retrieve_page_bounds(
+        db, plan.limit, offset=plan.fetch_offset, after_pk=plan.after_pk, where=plan.where
+    )
+    if rows == 0:
+        return {'data': []}
+
+    total = await count_footprints(db, plan)
+    link_next_page(request, plan, has_more, last_pk)
+    documents = stream_product_footprint_documents(
+        db, limit=plan.limit, offset=plan.fetch_offset, after_pk=plan.after_pk, where=plan.where
+    )
+    return StreamingResponse(stream_body(stream_json_page(documents, total), db), media_type="application/json")
@@ -0,0 +1,41 @@
+from authx import TokenPayload
+from fastapi import APIRouter
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.auth_config import get_authx_security
+from core.authorization import SUPERUSER, has_role
+from core.error_responses import AccessDeniedError, DuplicateEntryError
+from core.logger import logger
+from db.repository.async_users import create_new_user
+from db.session import get_async_db
+from schemas.user import ShowUser
+from schemas.user import UserCreate
+
+
+router = APIRouter()
+security = get_authx_security()
+
+
+@router.post("/", response_model=ShowUser)
+async def create_user(
+        user: UserCreate,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: TokenPayload = Depends(security.access_token_required),
+):
+    """
+    The `async def` version of `apis.version1.route_users.create_user`.
+    """
+    logger.info("Creating a new user with email {email}", email=user.email)
+
+    if not has_role(current_user, SUPERUSER):
+        logger.warning("Access denied for user {subject} trying to create a new user", subject=current_user.sub)
+        return AccessDeniedError().to_json_response()
+
+    try:
+        user = await create_new_user(user=user, db=db)
+        logger.success("New user created with email {email}", email=user.email)
+        return user
+    except ValueError as e:
+        logger.error("Error creating a new user: {error}", error=str(e))
+        return DuplicateEntryError(message=str(e)).to_json_response()
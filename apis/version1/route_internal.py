@@ -0,0 +1,55 @@
+from authx import TokenPayload
+from fastapi import APIRouter
+from fastapi import Depends
+
+from core.auth_config import get_authx_security
+from core.authorization import SUPERUSER, has_role
+from core.config import settings
+from core.credential_cache import verified_credentials
+from core.error_responses import AccessDeniedError
+from core.hashing import password_hashing_pool
+from db.pool_metrics import pool_metrics
+from db.session import engine, get_async_engine
+
+
+# Operational routes, left out of the OpenAPI schema and only answered for superusers.
+# They check the roles of the access token, see `core.authorization`, but do not query
+# the database, so that they still answer when the pool is exhausted.
+router = APIRouter(include_in_schema=False)
+security = get_authx_security()
+
+
+@router.get("/pool-metrics")
+def read_pool_metrics(current_user: TokenPayload = Depends(security.access_token_required)):
+    """
+    Returns the state and checkout metrics of the database connection pools of this
+    worker process.
+    """
+    if not has_role(current_user, SUPERUSER):
+        return AccessDeniedError().to_json_response()
+    pools = {"sync": pool_metrics(engine.pool)}
+    if settings.DATABASE_ASYNC:
+        pools["async"] = pool_metrics(get_async_engine().sync_engine.pool)
+    return pools
+
+
+@router.get("/credential-cache-metrics")
+def read_credential_cache_metrics(current_user: TokenPayload = Depends(security.access_token_required)):
+    """
+    Returns the hits, misses and size of the verified credential cache of this worker
+    process, see `core.credential_cache`. Every hit is a bcrypt verification saved.
+    """
+    if not has_role(current_user, SUPERUSER):
+        return AccessDeniedError().to_json_response()
+    return verified_credentials.stats()
+
+
+@router.get("/password-hashing-metrics")
+def read_password_hashing_metrics(current_user: TokenPayload = Depends(security.access_token_required)):
+    """
+    Returns the queue depth, wait times and rejections of the password hashing pool of
+    this worker process, see `core.hashing`.
+    """
+    if not has_role(current_user, SUPERUSER):
+        return AccessDeniedError().to_json_response()
+    return password_hashing_pool.stats()
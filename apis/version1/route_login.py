@@ -4,11 +4,12 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from core.auth_config import get_authx_security
+from core.authorization import create_user_access_token
 from core.error_responses import BadRequestError
-from core.hashing import Hasher
+from core.hashing import Hasher, PasswordHashingBusyError
 from core.logger import logger
 from core.oauth2_client_credentials import OAuth2ClientCredentialsRequestForm, OAuth2ClientCredentials
-from db.repository.users import retrieve_user_by_email, authenticate_user
+from db.repository.users import retrieve_user_by_email, authenticate_user_async
 from db.session import get_db
 from schemas.token import Token
 
@@ -18,12 +19,24 @@ oauth2_scheme = OAuth2ClientCredentials(tokenUrl="/auth/token")
 security = get_authx_security()
 
 
+def password_hashing_busy_response() -> JSONResponse:
+    """
+    Turns a token request away when the password hashing pool is full, as an OAuth 2.0
+    error so that clients retry rather than treat their credentials as invalid.
+    """
+    return JSONResponse(
+        {"error": "temporarily_unavailable", "error_description": "Too many token requests, try again later"},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
         form_data: OAuth2ClientCredentialsRequestForm = Depends(),
         db: Session = Depends(get_db)
 ):
-    logger.info(f"Login attempt for client_id {form_data.client_id}")
+    logger.info("Login attempt for client_id {client_id}", client_id=form_data.client_id)
 
     if form_data.client_id and form_data.client_secret:
         client_id = form_data.client_id
@@ -32,12 +45,17 @@ def login_for_access_token(
         logger.warning("Missing client_id or client_secret")
         return BadRequestError().to_json_response()
 
-    user = authenticate_user(client_id, client_secret, db)
+    # Only the user lookup takes a thread, bcrypt runs in the password hashing pool.
+    try:
+        user = await authenticate_user_async(client_id, client_secret, db)
+    except PasswordHashingBusyError:
+        logger.warning("Password hashing pool is full, turning away client_id {client_id}", client_id=client_id)
+        return password_hashing_busy_response()
     if not user:
-        logger.error(f"Authentication failed for client_id {client_id}")
+        logger.error("Authentication failed for client_id {client_id}", client_id=client_id)
         return JSONResponse({"error": "invalid_client", "error_description": "Authentication failed"}, status_code=400)
 
-    access_token: str = security.create_access_token(uid=str(user.id), sub=user.email)
+    access_token: str = create_user_access_token(security, user)
 
-    logger.success(f"Access token created for user {user.email}")
+    logger.success("Access token created for user {email}", email=user.email)
     return {"access_token": access_token, "token_type": "bearer"}
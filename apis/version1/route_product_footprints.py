@@ -1,23 +1,74 @@
+import json
+from typing import AsyncIterator, Awaitable, Callable, Iterator, NamedTuple
+
 from authx import TokenPayload
-from fastapi_pagination import paginate
+from fastapi_pagination import create_page, resolve_params
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Request
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from starlette.concurrency import run_in_threadpool
 
 from core.auth_config import get_authx_security
-from core.error_responses import NoSuchFootprintError
-from core.pagination import JSONAPIPage
+from core.config import settings
+from core.error_responses import BadRequestError, NoSuchFootprintError
+from core.etag import footprint_etag, if_none_match
+from core.logger import sampled_logger
+from core.pagination import (
+    JSONAPIPage, JSONAPIParams, decode_cursor, encode_cursor, render_json_page, stream_json_page
+)
+from db.footprint_filter import parse_footprint_filter
+from db.mapper import to_product_footprint_schema
 from db.models.user import User
+from db.repository.product_footprints import commit_inserted_product_footprints
+from db.repository.product_footprints import count_product_footprints
 from db.repository.product_footprints import create_new_product_footprint
+from db.repository.product_footprints import estimate_product_footprints
+from db.repository.product_footprints import insert_product_footprints
+from db.repository.product_footprints import list_product_footprint_documents
 from db.repository.product_footprints import list_product_footprints
+from db.repository.product_footprints import list_product_footprints_json
+from db.repository.product_footprints import matching_search
+from db.repository.product_footprints import product_footprint_cache
+from db.repository.product_footprints import retrieve_page_bounds
 from db.repository.product_footprints import retrieve_product_footprint
+from db.repository.product_footprints import retrieve_product_footprint_document
+from db.repository.product_footprints import retrieve_product_footprint_json
+from db.repository.product_footprints import retrieve_product_footprint_version
+from db.repository.product_footprints import search_product_footprints
+from db.repository.product_footprints import stream_product_footprint_documents
+from db.repository.product_footprints import with_company_id
+from db.repository.product_footprints import with_product_id
 from db.session import get_db
 from schemas.product_footprint import ProductFootprint as ProductFootprintSchema
-from schemas.carbon_footprint import CarbonFootprint as CarbonFootprintSchema, EmissionFactorDS, ProductOrSectorSpecificRule
 
 
 router = APIRouter()
 security = get_authx_security()
+single_footprint_adapter = TypeAdapter(dict[str, ProductFootprintSchema])
+# The footprint list is polled by every integration.
+list_logger = sampled_logger(__name__)
+
+# The serializers, other than "python", that read footprints as ready made JSON documents.
+document_retrievers = {
+    "postgres": retrieve_product_footprint_json,
+    "document": retrieve_product_footprint_document,
+}
+document_listers = {
+    "postgres": list_product_footprints_json,
+    "document": list_product_footprint_documents,
+}
+
+# Content types of a bulk load with one footprint per line, any other is read as a JSON array.
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Streamed bodies are sent in chunks of about this many bytes, rather than a footprint at a time.
+STREAM_CHUNK_BYTES = 64 * 1024
 
 """
 TODO: Implement full CRUD functionality for this module.
@@ -35,93 +86,395 @@ def create_product_footprint(
         return "Success"
 
 
+@router.post("/bulk", status_code=200)
+async def create_product_footprints(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    """
+    Creates the footprints in a JSON array or NDJSON body, see `ingest_product_footprints`.
+    """
+    async def insert_batch(product_footprints: list[ProductFootprintSchema]) -> list[str]:
+        return await run_in_threadpool(insert_product_footprints, product_footprints, db)
+
+    async def commit(ids: list[str]):
+        await run_in_threadpool(commit_inserted_product_footprints, ids, db)
+
+    return await ingest_product_footprints(request, insert_batch, commit)
+
+
+@router.get("/export", status_code=200)
+def export_product_footprints(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    """
+    Streams every footprint as NDJSON, one PACT JSON document per line, read through a
+    server-side cursor so that memory use does not grow with the size of the catalog.
+    """
+    lines = (document + "\n" for document in stream_product_footprint_documents(db))
+    return StreamingResponse(stream_body(lines, db), media_type=NDJSON_MEDIA_TYPE)
+
+
+def stream_body(pieces: Iterator[str], db: Session) -> Iterator[bytes]:
+    """
+    Encodes the pieces of a streamed body, in chunks of about `STREAM_CHUNK_BYTES`.
+
+    The dependency closes the session before a streamed body is sent, so the body is
+    read in a transaction of its own, which is ended here once the last chunk is sent.
+    """
+    try:
+        chunk, size = [], 0
+        for piece in pieces:
+            encoded = piece.encode()
+            chunk.append(encoded)
+            size += len(encoded)
+            if size >= STREAM_CHUNK_BYTES:
+                yield b"".join(chunk)
+                chunk, size = [], 0
+        if chunk:
+            yield b"".join(chunk)
+    finally:
+        db.close()
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    remainder = b""
+    async for chunk in request.stream():
+        *lines, remainder = (remainder + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if remainder.strip():
+        yield remainder
+
+
+async def _iterate(items: list) -> AsyncIterator:
+    for item in items:
+        yield item
+
+
+async def _read_bulk_body(request: Request) -> tuple[AsyncIterator, Callable[..., ProductFootprintSchema]]:
+    """
+    Returns the raw items of a bulk load, and the function that validates one. An NDJSON
+    body is read line by line as it streams in.
+
+    Raises:
+        ValueError: If a body that is not NDJSON is not a JSON array.
+    """
+    content_type = request.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        return _ndjson_lines(request), ProductFootprintSchema.model_validate_json
+
+    body = await run_in_threadpool(json.loads, await request.body())
+    if not isinstance(body, list):
+        raise ValueError("The body of a bulk load must be a JSON array")
+    return _iterate(body), ProductFootprintSchema.model_validate
+
+
+def _validate_bulk_items(validate: Callable[..., ProductFootprintSchema], items: list) -> list[tuple]:
+    results = []
+    for item in items:
+        try:
+            results.append((validate(item), None))
+        except ValidationError as e:
+            results.append((None, [{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()]))
+    return results
+
+
+async def ingest_product_footprints(
+    request: Request,
+    insert_batch: Callable[[list[ProductFootprintSchema]], Awaitable[list[str]]],
+    commit: Callable[[list[str]], Awaitable[None]],
+) -> Response:
+    """
+    Validates every footprint of a bulk load, and inserts the valid ones in batches of
+    `settings.FOOTPRINT_BULK_BATCH_SIZE` in a single transaction. Parsing and validation
+    run in the thread pool, so a large load does not hold up the event loop.
+
+    Args:
+        request (Request): A request with a JSON array of footprints, or one footprint per
+            line if its content type is in `NDJSON_MEDIA_TYPES`.
+        insert_batch: Inserts a batch of footprints without committing, and returns the
+            ids that were inserted, as `insert_product_footprints` does.
+        commit: Commits the inserted ids, as `commit_inserted_product_footprints` does.
+
+    Returns:
+        Response: A report with the status of each item, by its position in the body:
+            "created", "duplicate" if its id is already stored or came earlier in the
+            body, or "invalid" along with its validation errors. A body that cannot be
+            read is a BadRequest.
+    """
+    try:
+        items, validate = await _read_bulk_body(request)
+    except ValueError:
+        # Also raised by `json.loads` for a body that is not valid JSON.
+        return BadRequestError().to_json_response()
+
+    report: list[dict] = []
+    created_ids: list[str] = []
+    batch: list = []
+
+    async def flush():
+        validated = await run_in_threadpool(_validate_bulk_items, validate, batch)
+        ids = await insert_batch([product_footprint for product_footprint, _ in validated if product_footprint])
+        created = set(ids)
+        for product_footprint, errors in validated:
+            if product_footprint is None:
+                report.append({"index": len(report), "status": "invalid", "errors": errors})
+                continue
+            id = str(product_footprint.id)
+            report.append({"index": len(report), "id": id, "status": "created" if id in created else "duplicate"})
+            created.discard(id)
+        created_ids.extend(ids)
+        batch.clear()
+
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= settings.FOOTPRINT_BULK_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+    await commit(created_ids)
+
+    statuses = [item["status"] for item in report]
+    meta = {status: statuses.count(status) for status in ("created", "duplicate", "invalid")}
+    return Response(content=json.dumps({"data": report, "meta": meta}), media_type="application/json")
+
+
+class PagePlan(NamedTuple):
+    """
+    How a page of the footprint list is fetched, worked out from the query parameters.
+
+    Attributes:
+        params (JSONAPIParams): The resolved pagination parameters.
+        limit (int): The page size.
+        offset (int): The offset of the page, in offset mode.
+        after_pk (int | None): The primary key the page starts after, in cursor mode.
+        keyset (bool): Whether the next page is linked to with a cursor.
+        probe (bool): Whether one extra row is fetched to find out if there is a next page.
+        where (ColumnElement | None): The compiled `$filter`, if any, see `db.footprint_filter`.
+    """
+    params: JSONAPIParams
+    limit: int
+    offset: int
+    after_pk: int | None
+    keyset: bool
+    probe: bool
+    where: ColumnElement | None
+
+    @property
+    def fetch_limit(self) -> int:
+        return self.limit + 1 if self.probe else self.limit
+
+    @property
+    def fetch_offset(self) -> int | None:
+        return None if self.after_pk is not None else self.offset
+
+
+def plan_page(request: Request, scope: ColumnElement | None = None, ranked: bool = False) -> PagePlan:
+    """
+    Resolves the pagination and filter parameters of the current request into a `PagePlan`,
+    listing only the footprints in `scope`, if given, e.g. those of one product.
+
+    Pages that are `ranked`, rather than ordered by primary key, are always linked by offset.
+
+    Raises:
+        ValueError: If the cursor or the `$filter` is malformed, the filter is not supported,
+            or a ranked page is asked for by cursor.
+    """
+    params: JSONAPIParams = resolve_params()
+    if ranked and params.cursor is not None:
+        raise ValueError("Ranked pages cannot be paginated with a cursor")
+    raw_params = params.to_raw_params()
+    after_pk = decode_cursor(params.cursor) if params.cursor is not None else None
+    where = parse_footprint_filter(request.query_params.get("$filter"))
+    if scope is not None:
+        where = scope if where is None else and_(scope, where)
+    keyset = not ranked and (params.cursor is not None or settings.PAGINATION_MODE == "cursor")
+    # Unless there is an exact count to compare against, fetch one extra row to find
+    # out whether there is a next page. An estimate is not good enough for that.
+    probe = keyset or settings.FOOTPRINT_COUNT_STRATEGY != "exact"
+    return PagePlan(params, raw_params.limit, raw_params.offset, after_pk, keyset, probe, where)
+
+
+def page_response(request: Request, plan: PagePlan, rows: list, total: int | None, documents: bool) -> Response:
+    """
+    Builds the response for a page of footprints, and leaves the parameters of the next
+    page, if there is one, for `PaginationMiddleware` to link to.
+
+    Args:
+        request (Request): The current request.
+        plan (PagePlan): How the page was fetched.
+        rows (list): The fetched rows, `(pk, document)` pairs if `documents` is True,
+            ORM product footprints otherwise.
+        total (int | None): The total number of footprints, if counted.
+        documents (bool): Whether the rows are ready made JSON documents.
+    """
+    has_more = len(rows) > plan.limit
+    rows = rows[:plan.limit]
+    if total is not None and not plan.probe:
+        has_more = plan.offset + plan.limit < total
+    link_next_page(request, plan, has_more, last_pk=rows[-1][0] if documents else rows[-1].pk)
+
+    if documents:
+        content = render_json_page([document for _, document in rows], total=total)
+        return Response(content=content, media_type="application/json")
+
+    page = create_page(
+        [to_product_footprint_schema(product_footprint) for product_footprint in rows],
+        total=total,
+        params=plan.params,
+    )
+    return Response(content=page.model_dump_json(), media_type="application/json")
+
+
+def link_next_page(request: Request, plan: PagePlan, has_more: bool, last_pk: int):
+    """
+    Leaves the parameters of the page after the current one, ending with the footprint
+    with primary key `last_pk`, for `PaginationMiddleware` to link to, if there is one.
+    """
+    if has_more and plan.keyset:
+        request.state.next_page_params = {"cursor": encode_cursor(last_pk)}
+    elif has_more:
+        request.state.next_page_params = {"offset": plan.offset + plan.limit}
+
+
+def streams_page(plan: PagePlan) -> bool:
+    """
+    Whether a page is large enough to be streamed, see `settings.FOOTPRINT_STREAM_MIN_LIMIT`.
+    """
+    return 0 < settings.FOOTPRINT_STREAM_MIN_LIMIT <= plan.limit
+
+
+def cached_footprint_response(request: Request, id: str) -> Response | None:
+    """
+    Answers a single footprint request from `product_footprint_cache`, if it has an entry.
+    """
+    # Cache entries are the ETag and the response body, separated by a newline.
+    cached = product_footprint_cache.get(id)
+    if cached is None:
+        return None
+    etag, _, content = cached.partition(b"\n")
+    etag = etag.decode()
+    return not_modified_response(request, etag) or Response(
+        content=content, media_type="application/json", headers={"ETag": etag}
+    )
+
+
+def not_modified_response(request: Request, etag: str) -> Response | None:
+    """
+    Returns a 304 if the client's copy, per `If-None-Match`, has the current `etag`.
+    """
+    if if_none_match(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def footprint_content(product_footprint=None, document: str | None = None) -> bytes:
+    """
+    Builds the body of a single footprint response, from either an ORM product footprint
+    or a ready made JSON document.
+    """
+    if document is not None:
+        return ('{"data":' + document + '}').encode()
+    # Rows are validated on ingest, so the response is serialised directly rather than
+    # being validated again against the response model.
+    return single_footprint_adapter.dump_json({'data': to_product_footprint_schema(product_footprint)})
+
+
+def footprint_response(id: str, etag: str, content: bytes) -> Response:
+    """
+    Caches a single footprint response body, and returns the response.
+    """
+    product_footprint_cache.set(id, etag.encode() + b"\n" + content)
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/search", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
+def search_footprints(
+    request: Request,
+    q: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    """
+    Searches the product name, description and comment of the footprints for `q`, in web
+    search syntax, and lists the matches best first. `$filter` narrows the search down
+    the same way as it does the footprint list.
+    """
+    try:
+        plan = plan_page(request, ranked=True)
+    except ValueError:
+        return BadRequestError().to_json_response()
+    if q is None or not q.strip():
+        return BadRequestError().to_json_response()
+
+    product_footprints = search_product_footprints(
+        db=db, terms=q, limit=plan.fetch_limit, offset=plan.offset, where=plan.where
+    )
+    if not product_footprints:
+        return {'data': []}
+
+    return page_response(request, plan, product_footprints, count_footprints(db, search_plan(plan, q)), False)
+
+
+def search_plan(plan: PagePlan, terms: str) -> PagePlan:
+    """
+    The `plan` of a page of search results, narrowed down to the matches of `terms`, for counting them.
+    """
+    match = matching_search(terms)
+    return plan._replace(where=match if plan.where is None else and_(match, plan.where))
+
+
 @router.get("/{id}", response_model=dict[str, ProductFootprintSchema], status_code=200)
-def read_product_footprint(id: str, db: Session = Depends(get_db), current_user: TokenPayload = Depends(security.access_token_required)):
+def read_product_footprint(
+    id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: TokenPayload = Depends(security.access_token_required),
+):
     """
     TODO: Replace the {id} with a Pydantic inout validation schema for UUIDv4 values
     """
-    product_footprint = retrieve_product_footprint(id=id, db=db)
+    cached_response = cached_footprint_response(request, id)
+    if cached_response is not None:
+        return cached_response
 
-    if not product_footprint:
+    # The ETag comes from an indexed lookup, so an unchanged footprint is answered with
+    # a 304 without loading its carbon footprint or serialising anything.
+    footprint_version = retrieve_product_footprint_version(id=id, db=db)
+    if footprint_version is None:
         return NoSuchFootprintError().to_json_response()
 
-    secondary_emission_factor_sources: list[EmissionFactorDS] = []
-    for dataset in product_footprint.carbon_footprint.secondary_emission_factor_sources:
-        dataset_schema = EmissionFactorDS(
-            name=dataset.name,
-            version=dataset.version
-        )
-        secondary_emission_factor_sources.append(dataset_schema)
-
-    product_or_sector_specific_rules: list[ProductOrSectorSpecificRule] = []
-    for rule in product_footprint.carbon_footprint.product_or_sector_specific_rules:
-        rule_schema = ProductOrSectorSpecificRule(
-            operator=rule.operator,
-            ruleNames=rule.rule_names,
-            otherOperatorName=rule.other_operator_name
-        )
-        product_or_sector_specific_rules.append(rule_schema)
-
-    product_footprint_schema = ProductFootprintSchema(
-        id=product_footprint.id,
-        specVersion=product_footprint.specVersion,
-        precedingPfIds=product_footprint.precedingPfIds,
-        version=product_footprint.version,
-        created=product_footprint.created,
-        updated=product_footprint.updated,
-        status=product_footprint.status,
-        statusComment=product_footprint.statusComment,
-        validityPeriodStart=product_footprint.validityPeriodStart,
-        validityPeriodEnd=product_footprint.validityPeriodEnd,
-        companyName=product_footprint.companyName,
-        companyIds=product_footprint.companyIds,
-        productDescription=product_footprint.productDescription,
-        productIds=product_footprint.productIds,
-        productCategoryCpc=product_footprint.productCategoryCpc,
-        productNameCompany=product_footprint.productNameCompany,
-        comment=product_footprint.comment,
-        pcf=CarbonFootprintSchema(
-            declaredUnit=product_footprint.carbon_footprint.declared_unit,
-            unitaryProductAmount=product_footprint.carbon_footprint.unitary_product_amount,
-            pCfExcludingBiogenic=product_footprint.carbon_footprint.pcf_excluding_biogenic,
-            pcfIncludingBiogenic=product_footprint.carbon_footprint.pcf_including_biogenic,
-            fossilGhgEmissions=product_footprint.carbon_footprint.fossil_ghg_emissions,
-            fossilCarbonContent=product_footprint.carbon_footprint.fossil_carbon_content,
-            biogenicCarbonContent=product_footprint.carbon_footprint.biogenic_carbon_content,
-            dlucGhgEmissions=product_footprint.carbon_footprint.dluc_ghg_emissions,
-            landManagementGhgEmissions=product_footprint.carbon_footprint.land_management_ghg_emissions,
-            otherBiogenicGhgEmissions=product_footprint.carbon_footprint.other_biogenic_ghg_emissions,
-            ilucGhgEmissions=product_footprint.carbon_footprint.iluc_ghg_emissions,
-            biogenicCarbonWithdrawal=product_footprint.carbon_footprint.biogenic_carbon_withdrawal,
-            aircraftGhgEmissions=product_footprint.carbon_footprint.aircraft_ghg_emissions,
-            characterizationFactors=product_footprint.carbon_footprint.characterization_factors,
-            crossSectoralStandardsUsed=product_footprint.carbon_footprint.cross_sectoral_standards_used,
-            productOrSectorSpecificRules=product_or_sector_specific_rules,
-            biogenicAccountingMethodology=product_footprint.carbon_footprint.biogenic_accounting_methodology,
-            boundaryProcessesDescription=product_footprint.carbon_footprint.boundary_processes_description,
-            referencePeriodStart=product_footprint.carbon_footprint.reference_period_start,
-            referencePeriodEnd=product_footprint.carbon_footprint.reference_period_end,
-            # missing additional fields for the other two geo fields, they are not in the database i dont think
-            geographyRegionOrSubregion=product_footprint.carbon_footprint.geography_region_or_subregion,
-            secondaryEmissionFactorSources=secondary_emission_factor_sources,
-            exemptedEmissionsPercent=product_footprint.carbon_footprint.exempted_emissions_percent,
-            exemptedEmissionsDescription=product_footprint.carbon_footprint.exempted_emissions_description,
-            packagingEmissionsIncluded=product_footprint.carbon_footprint.packaging_emissions_included,
-            packagingGhgEmissions=product_footprint.carbon_footprint.packaging_ghg_emissions,
-            allocationRulesDescription=product_footprint.carbon_footprint.allocation_rules_description,
-            uncertaintyAssessmentDescription=product_footprint.carbon_footprint.uncertainty_assessment_description,
-            primaryDataShare=product_footprint.carbon_footprint.primary_data_share,
-            dqi=product_footprint.carbon_footprint.dqi,
-            assurance=product_footprint.carbon_footprint.assurance
-        ),
-        extensions=product_footprint.extensions
-    )
+    etag = footprint_etag(footprint_version.id, footprint_version.version, footprint_version.updated)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    if settings.FOOTPRINT_SERIALIZER in document_retrievers:
+        document = document_retrievers[settings.FOOTPRINT_SERIALIZER](id=id, db=db)
+        if document is None:
+            return NoSuchFootprintError().to_json_response()
+        content = footprint_content(document=document)
+    else:
+        product_footprint = retrieve_product_footprint(id=id, db=db)
 
-    return {'data': product_footprint_schema}
+        if not product_footprint:
+            return NoSuchFootprintError().to_json_response()
+
+        content = footprint_content(product_footprint)
+
+    return footprint_response(id, etag, content)
 
 
 @router.get("", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
-def list_footprints(db: Session = Depends(get_db), current_user: User = Depends(security.access_token_required)):
+def list_footprints(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(security.access_token_required),
+):
     """
     TODO: This route is currently not tested due to the pagination module being too difficult
         to programmatically interact with, during alpha, it will be tuned up and formed into
@@ -129,88 +482,87 @@ def list_footprints(db: Session = Depends(get_db), current_user: User = Depends(
         to understand, the code was added in so that the PoC could move forward and an ALpha
         release needs to happen sooner rather than later.
     """
-    print(current_user)
-    product_footprints = list_product_footprints(db=db)
+    list_logger.debug("Listing footprints for {subject}", subject=current_user.sub)
+    return footprints_page(request, db)
+
+
+@router.get("/by-product-id/{product_id}", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
+def list_footprints_by_product_id(
+    product_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    """
+    Lists the footprints of the product with the URN `product_id`, paginated and
+    filtered the same way as the footprint list.
+    """
+    return footprints_page(request, db, with_product_id(product_id))
+
+
+@router.get("/by-company-id/{company_id}", response_model=JSONAPIPage[ProductFootprintSchema], status_code=200)
+def list_footprints_by_company_id(
+    company_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(security.access_token_required),
+):
+    """
+    Lists the footprints owned by the company with the URN `company_id`, paginated and
+    filtered the same way as the footprint list.
+    """
+    return footprints_page(request, db, with_company_id(company_id))
+
+
+def footprints_page(request: Request, db: Session, scope: ColumnElement | None = None) -> Response | dict:
+    """
+    Builds a page of the footprints in `scope`, or of all footprints.
+    """
+    try:
+        plan = plan_page(request, scope)
+    except ValueError:
+        return BadRequestError().to_json_response()
+
+    if streams_page(plan):
+        return stream_footprints_page(request, plan, db)
+
+    documents = settings.FOOTPRINT_SERIALIZER in document_listers
+    list_function = document_listers[settings.FOOTPRINT_SERIALIZER] if documents else list_product_footprints
+    product_footprints = list_function(
+        db=db, limit=plan.fetch_limit, offset=plan.fetch_offset, after_pk=plan.after_pk, where=plan.where
+    )
     if not product_footprints or len(product_footprints) == 0:
         return {'data': []}
 
-    return paginate(product_footprints, transformer=transformer)
-
-
-def transformer(product_footprints):
-    product_footprint_schemas: list[ProductFootprintSchema] = []
-    for product_footprint in product_footprints:
-        secondary_emission_factor_sources: list[EmissionFactorDS] = []
-        for dataset in product_footprint.carbon_footprint.secondary_emission_factor_sources:
-            dataset_schema = EmissionFactorDS(
-                name=dataset.name,
-                version=dataset.version
-            )
-            secondary_emission_factor_sources.append(dataset_schema)
-
-        product_or_sector_specific_rules: list[ProductOrSectorSpecificRule] = []
-        for rule in product_footprint.carbon_footprint.product_or_sector_specific_rules:
-            rule_schema = ProductOrSectorSpecificRule(
-                operator=rule.operator,
-                ruleNames=rule.rule_names,
-                otherOperatorName=rule.other_operator_name
-            )
-            product_or_sector_specific_rules.append(rule_schema)
-
-        product_footprint_schema = ProductFootprintSchema(
-            id=product_footprint.id,
-            specVersion=product_footprint.specVersion,
-            precedingPfIds=product_footprint.precedingPfIds,
-            version=product_footprint.version,
-            created=product_footprint.created,
-            updated=product_footprint.updated,
-            status=product_footprint.status,
-            statusComment=product_footprint.statusComment,
-            validityPeriodStart=product_footprint.validityPeriodStart,
-            validityPeriodEnd=product_footprint.validityPeriodEnd,
-            companyName=product_footprint.companyName,
-            companyIds=product_footprint.companyIds,
-            productDescription=product_footprint.productDescription,
-            productIds=product_footprint.productIds,
-            productCategoryCpc=product_footprint.productCategoryCpc,
-            productNameCompany=product_footprint.productNameCompany,
-            comment=product_footprint.comment,
-            pcf=CarbonFootprintSchema(
-                declaredUnit=product_footprint.carbon_footprint.declared_unit,
-                unitaryProductAmount=product_footprint.carbon_footprint.unitary_product_amount,
-                pCfExcludingBiogenic=product_footprint.carbon_footprint.pcf_excluding_biogenic,
-                pcfIncludingBiogenic=product_footprint.carbon_footprint.pcf_including_biogenic,
-                fossilGhgEmissions=product_footprint.carbon_footprint.fossil_ghg_emissions,
-                fossilCarbonContent=product_footprint.carbon_footprint.fossil_carbon_content,
-                biogenicCarbonContent=product_footprint.carbon_footprint.biogenic_carbon_content,
-                dlucGhgEmissions=product_footprint.carbon_footprint.dluc_ghg_emissions,
-                landManagementGhgEmissions=product_footprint.carbon_footprint.land_management_ghg_emissions,
-                otherBiogenicGhgEmissions=product_footprint.carbon_footprint.other_biogenic_ghg_emissions,
-                ilucGhgEmissions=product_footprint.carbon_footprint.iluc_ghg_emissions,
-                biogenicCarbonWithdrawal=product_footprint.carbon_footprint.biogenic_carbon_withdrawal,
-                aircraftGhgEmissions=product_footprint.carbon_footprint.aircraft_ghg_emissions,
-                characterizationFactors=product_footprint.carbon_footprint.characterization_factors,
-                crossSectoralStandardsUsed=product_footprint.carbon_footprint.cross_sectoral_standards_used,
-                productOrSectorSpecificRules=product_or_sector_specific_rules,
-                biogenicAccountingMethodology=product_footprint.carbon_footprint.biogenic_accounting_methodology,
-                boundaryProcessesDescription=product_footprint.carbon_footprint.boundary_processes_description,
-                referencePeriodStart=product_footprint.carbon_footprint.reference_period_start,
-                referencePeriodEnd=product_footprint.carbon_footprint.reference_period_end,
-                # missing additional fields for the other two geo fields, they are not in the database i dont think
-                geographyRegionOrSubregion=product_footprint.carbon_footprint.geography_region_or_subregion,
-                secondaryEmissionFactorSources=secondary_emission_factor_sources,
-                exemptedEmissionsPercent=product_footprint.carbon_footprint.exempted_emissions_percent,
-                exemptedEmissionsDescription=product_footprint.carbon_footprint.exempted_emissions_description,
-                packagingEmissionsIncluded=product_footprint.carbon_footprint.packaging_emissions_included,
-                packagingGhgEmissions=product_footprint.carbon_footprint.packaging_ghg_emissions,
-                allocationRulesDescription=product_footprint.carbon_footprint.allocation_rules_description,
-                uncertaintyAssessmentDescription=product_footprint.carbon_footprint.uncertainty_assessment_description,
-                primaryDataShare=product_footprint.carbon_footprint.primary_data_share,
-                dqi=product_footprint.carbon_footprint.dqi,
-                assurance=product_footprint.carbon_footprint.assurance
-            ),
-            extensions=product_footprint.extensions
-        )
-        product_footprint_schemas.append(product_footprint_schema)
-
-    return product_footprint_schemas
+    return page_response(request, plan, product_footprints, count_footprints(db, plan), documents)
+
+
+def count_footprints(db: Session, plan: PagePlan) -> int | None:
+    # The planner statistics can only estimate the whole table, not the footprints a filter matches.
+    if settings.FOOTPRINT_COUNT_STRATEGY == "exact":
+        return count_product_footprints(db=db, cached=True, where=plan.where)
+    elif settings.FOOTPRINT_COUNT_STRATEGY == "estimated" and plan.where is None:
+        return estimate_product_footprints(db=db)
+    return None
+
+
+def stream_footprints_page(request: Request, plan: PagePlan, db: Session) -> Response | dict:
+    """
+    Streams a large page of footprints, writing each stored document as it comes off a
+    server-side cursor, instead of building the whole page in memory.
+
+    The extent of the page is looked up from the primary key index first, so that the
+    `Link` header to the next page is known before the body is sent.
+    """
+    rows, last_pk, has_more = retrieve_page_bounds(
+        db, plan.limit, offset=plan.fetch_offset, after_pk=plan.after_pk, where=plan.where
+    )
+    if rows == 0:
+        return {'data': []}
+
+    total = count_footprints(db, plan)
+    link_next_page(request, plan, has_more, last_pk)
+    documents = stream_product_footprint_documents(
+        db, limit=plan.limit, offset=plan.fetch_offset, after_pk=plan.after_pk, where=plan.where
+    )
+    return StreamingResponse(stream_body(stream_json_page(documents, total), db), media_type="application/json")
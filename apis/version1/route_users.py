@@ -4,9 +4,10 @@ from fastapi import Depends
 from sqlalchemy.orm import Session
 
 from core.auth_config import get_authx_security
+from core.authorization import SUPERUSER, has_role
 from core.error_responses import AccessDeniedError, DuplicateEntryError
 from core.logger import logger
-from db.repository.users import create_new_user, retrieve_user_by_id
+from db.repository.users import create_new_user
 from db.session import get_db
 from schemas.user import ShowUser
 from schemas.user import UserCreate
@@ -34,21 +35,20 @@ def create_user(
         ShowUser: The created user.
 
     Raises:
-        AccessDeniedError: If the current user is not a superuser.
+        AccessDeniedError: If the current user is not a superuser, per the claims of
+            their token, see `core.authorization`.
         DuplicateEntryError: If a user with the same email or username already exists.
     """
-    logger.info(f"Creating a new user with email {user.email}")
+    logger.info("Creating a new user with email {email}", email=user.email)
 
-    user_id = int(current_user.sub)
-    user_info = retrieve_user_by_id(db=db, user_id=user_id)
-    if not user_info.is_superuser:
-        logger.warning(f"Access denied for user {current_user.sub} trying to create a new user")
+    if not has_role(current_user, SUPERUSER):
+        logger.warning("Access denied for user {subject} trying to create a new user", subject=current_user.sub)
         return AccessDeniedError().to_json_response()
 
     try:
         user = create_new_user(user=user, db=db)
-        logger.success(f"New user created with email {user.email}")
+        logger.success("New user created with email {email}", email=user.email)
         return user
     except ValueError as e:
-        logger.error(f"Error creating a new user: {str(e)}")
+        logger.error("Error creating a new user: {error}", error=str(e))
         return DuplicateEntryError(message=str(e)).to_json_response()
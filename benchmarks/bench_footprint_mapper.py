@@ -0,0 +1,146 @@
+"""
+Microbenchmark for converting a product footprint row into its PACT JSON representation.
+
+Compares what the GET footprint route did before the mapper existed, a schema built by
+hand field by field that FastAPI then dumped, validated again against the response model
+and encoded, with what it does now: a trusted schema serialised straight to JSON. The
+mapper's validated path, with the same response handling as the hand-written code, is
+timed as well, to tell the gain of the mapper from that of skipping validation. Runs
+without a database, against an in-memory ORM row.
+
+Usage:
+    python -m benchmarks.bench_footprint_mapper --iterations 20000
+"""
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from db.mapper import to_product_footprint_schema
+from db.repository.product_footprints import build_product_footprint_model
+from schemas.carbon_footprint import CarbonFootprint, EmissionFactorDS, ProductOrSectorSpecificRule
+from schemas.product_footprint import ProductFootprint
+
+
+SAMPLE_FOOTPRINT = Path(__file__).resolve().parent.parent / "docs" / "valid_test_product_footprint.json"
+response_adapter = TypeAdapter(dict[str, ProductFootprint])
+
+
+def hand_written_schema(product_footprint) -> ProductFootprint:
+    # The conversion of the GET footprint route before the mapper, as it was, including
+    # the misnamed fields whose values it dropped.
+    carbon_footprint = product_footprint.carbon_footprint
+    return ProductFootprint(
+        id=product_footprint.id,
+        specVersion=product_footprint.specVersion,
+        precedingPfIds=product_footprint.precedingPfIds,
+        version=product_footprint.version,
+        created=product_footprint.created,
+        updated=product_footprint.updated,
+        status=product_footprint.status,
+        statusComment=product_footprint.statusComment,
+        validityPeriodStart=product_footprint.validityPeriodStart,
+        validityPeriodEnd=product_footprint.validityPeriodEnd,
+        companyName=product_footprint.companyName,
+        companyIds=product_footprint.companyIds,
+        productDescription=product_footprint.productDescription,
+        productIds=product_footprint.productIds,
+        productCategoryCpc=product_footprint.productCategoryCpc,
+        productNameCompany=product_footprint.productNameCompany,
+        comment=product_footprint.comment,
+        pcf=CarbonFootprint(
+            declaredUnit=carbon_footprint.declared_unit,
+            unitaryProductAmount=carbon_footprint.unitary_product_amount,
+            pCfExcludingBiogenic=carbon_footprint.pcf_excluding_biogenic,
+            pcfIncludingBiogenic=carbon_footprint.pcf_including_biogenic,
+            fossilGhgEmissions=carbon_footprint.fossil_ghg_emissions,
+            fossilCarbonContent=carbon_footprint.fossil_carbon_content,
+            biogenicCarbonContent=carbon_footprint.biogenic_carbon_content,
+            dlucGhgEmissions=carbon_footprint.dluc_ghg_emissions,
+            landManagementGhgEmissions=carbon_footprint.land_management_ghg_emissions,
+            otherBiogenicGhgEmissions=carbon_footprint.other_biogenic_ghg_emissions,
+            ilucGhgEmissions=carbon_footprint.iluc_ghg_emissions,
+            biogenicCarbonWithdrawal=carbon_footprint.biogenic_carbon_withdrawal,
+            aircraftGhgEmissions=carbon_footprint.aircraft_ghg_emissions,
+            characterizationFactors=carbon_footprint.characterization_factors,
+            crossSectoralStandardsUsed=carbon_footprint.cross_sectoral_standards_used,
+            productOrSectorSpecificRules=[
+                ProductOrSectorSpecificRule(
+                    operator=rule.operator, ruleNames=rule.rule_names, otherOperatorName=rule.other_operator_name
+                )
+                for rule in carbon_footprint.product_or_sector_specific_rules
+            ],
+            biogenicAccountingMethodology=carbon_footprint.biogenic_accounting_methodology,
+            boundaryProcessesDescription=carbon_footprint.boundary_processes_description,
+            referencePeriodStart=carbon_footprint.reference_period_start,
+            referencePeriodEnd=carbon_footprint.reference_period_end,
+            geographyRegionOrSubregion=carbon_footprint.geography_region_or_subregion,
+            secondaryEmissionFactorSources=[
+                EmissionFactorDS(name=dataset.name, version=dataset.version)
+                for dataset in carbon_footprint.secondary_emission_factor_sources
+            ],
+            exemptedEmissionsPercent=carbon_footprint.exempted_emissions_percent,
+            exemptedEmissionsDescription=carbon_footprint.exempted_emissions_description,
+            packagingEmissionsIncluded=carbon_footprint.packaging_emissions_included,
+            packagingGhgEmissions=carbon_footprint.packaging_ghg_emissions,
+            allocationRulesDescription=carbon_footprint.allocation_rules_description,
+            uncertaintyAssessmentDescription=carbon_footprint.uncertainty_assessment_description,
+            primaryDataShare=carbon_footprint.primary_data_share,
+            dqi=carbon_footprint.dqi,
+            assurance=carbon_footprint.assurance,
+        ),
+        extensions=product_footprint.extensions,
+    )
+
+
+def response_model_json(schema: ProductFootprint) -> bytes:
+    # Mirrors FastAPI's handling of a `response_model`: dump, re-validate, dump as JSON, encode.
+    response = response_adapter.validate_python({"data": schema.model_dump(by_alias=True)})
+    content = response_adapter.dump_python(response, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def before(product_footprint) -> bytes:
+    return response_model_json(hand_written_schema(product_footprint))
+
+
+def validated(product_footprint) -> bytes:
+    return response_model_json(to_product_footprint_schema(product_footprint, trusted=False))
+
+
+def after(product_footprint) -> bytes:
+    return response_adapter.dump_json({"data": to_product_footprint_schema(product_footprint, trusted=True)})
+
+
+def run(iterations: int):
+    with open(SAMPLE_FOOTPRINT) as f:
+        product_footprint = build_product_footprint_model(ProductFootprint(**json.load(f)))
+
+    # The hand-written conversion dropped some fields, so only the mapper's paths agree.
+    assert validated(product_footprint) == after(product_footprint)
+
+    cases = {
+        "before": lambda: before(product_footprint),
+        "validated": lambda: validated(product_footprint),
+        "after": lambda: after(product_footprint),
+    }
+
+    results = {}
+    for name, case in cases.items():
+        case()  # warm up
+        seconds = min(timeit.repeat(case, number=iterations, repeat=3))
+        results[name] = seconds / iterations * 1_000_000
+        print(f"{name:>9}: {results[name]:8.2f} us per footprint")
+
+    print(f"  speedup: {results['before'] / results['after']:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ORM to PACT footprint conversion")
+    parser.add_argument("--iterations", type=int, default=20000, help="Conversions per timing run")
+
+    args = parser.parse_args()
+
+    run(iterations=args.iterations)
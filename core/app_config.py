@@ -1,22 +1,52 @@
+import math
+
 from authx.exceptions import JWTDecodeError, MissingTokenError
 from fastapi import FastAPI, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi_pagination import add_pagination
 from fastapi.responses import JSONResponse
+from sqlalchemy.engine import make_url
 
-from apis.base import api_router
+from apis.base import api_router, async_api_router
 from core.auth_config import apply_authx_error_handling
 from core.config import settings
+from core.error_responses import ServiceUnavailableError, TooManyRequestsError
+from core.hashing import PasswordHashingBusyError
+from core.logger import logger
 from core.pagination import PaginationMiddleware
+from core.rate_limit import RateLimitExceededError
+from db.cache_invalidation import InvalidationListener
+from db.repository.product_footprints import product_footprint_cache
+from db.session import dispose_async_engine
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION)
-    app.include_router(api_router)
+    app.include_router(async_api_router if settings.DATABASE_ASYNC else api_router)
     add_pagination(app)
     app.add_middleware(PaginationMiddleware)
     apply_authx_error_handling(app)
+    if settings.DATABASE_ASYNC:
+        app.add_event_handler("shutdown", dispose_async_engine)
+    if settings.FOOTPRINT_STREAM_MIN_LIMIT > settings.PAGINATION_MAX_LIMIT:
+        logger.warning(
+            "No footprint list page is streamed, FOOTPRINT_STREAM_MIN_LIMIT {stream_min_limit} is above "
+            "PAGINATION_MAX_LIMIT {max_limit}",
+            stream_min_limit=settings.FOOTPRINT_STREAM_MIN_LIMIT,
+            max_limit=settings.PAGINATION_MAX_LIMIT,
+        )
+
+    # The log sinks are enqueued, this waits for the lines still in the queue to be written.
+    app.add_event_handler("shutdown", logger.complete)
+
+    # Shared cache backends see invalidations made by any worker, a cache in process
+    # memory has to be told about them, unless it is disabled.
+    if settings.FOOTPRINT_CACHE_BACKEND == "memory" and settings.FOOTPRINT_CACHE_MAX_BYTES > 0:
+        dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        invalidation_listener = InvalidationListener(dsn=dsn, cache=product_footprint_cache)
+        app.add_event_handler("startup", invalidation_listener.start)
+        app.add_event_handler("shutdown", invalidation_listener.stop)
 
     @app.exception_handler(MissingTokenError)
     async def missing_bearer_token_error_handler(request, exc):
@@ -37,6 +67,14 @@ def create_app() -> FastAPI:
                 status_code=403
             )
 
+    @app.exception_handler(PasswordHashingBusyError)
+    async def password_hashing_busy_error_handler(request, exc):
+        return ServiceUnavailableError().to_json_response()
+
+    @app.exception_handler(RateLimitExceededError)
+    async def rate_limit_exceeded_error_handler(request, exc: RateLimitExceededError):
+        return TooManyRequestsError(retry_after=max(1, math.ceil(exc.retry_after))).to_json_response()
+
     @app.exception_handler(RequestValidationError)
     def standard_validation_exception_handler(request: Request, exc: RequestValidationError):
         return JSONResponse(
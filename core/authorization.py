@@ -0,0 +1,93 @@
+"""
+Role based authorization from the claims of the access token, so that checking what a
+user may do needs no database round trip.
+
+`create_user_access_token` embeds the roles of a user in the token as the `roles`
+claim, and `has_role` checks them. As a token outlives changes to its user, e.g. a
+superuser being demoted or deactivated, the write paths record the current claims of
+a changed user in `user_claims_cache` through `remember_user_claims`, and `has_role`
+prefers those over the token's. The cache is process local, so in another worker
+process a change takes effect when the tokens issued before it expire.
+"""
+
+from typing import NamedTuple
+
+from authx import AuthX, TokenPayload
+from authx.token import create_token
+
+from core.cache import LRUCache
+from core.config import settings
+from db.models.user import User
+
+
+SUPERUSER = "superuser"
+
+
+class UserClaims(NamedTuple):
+    """
+    What a user is allowed to do, as embedded in their access tokens.
+
+    Attributes:
+        is_active (bool): Whether the user may use the API at all.
+        roles (frozenset[str]): The roles of the user, e.g. `SUPERUSER`.
+    """
+    is_active: bool
+    roles: frozenset[str]
+
+
+# Keyed by user id as a string, the `sub` of a token. Entries are counted as one byte
+# each, so that `max_bytes` bounds the number of users. Their TTL should be at least
+# the token lifetime, so that a change is not forgotten while older tokens are valid.
+user_claims_cache = LRUCache(max_bytes=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.USER_CACHE_TTL)
+
+
+def user_claims(user: User) -> UserClaims:
+    """
+    Works out the claims of a user from their database row.
+    """
+    roles = {SUPERUSER} if user.is_superuser else set()
+    return UserClaims(is_active=bool(user.is_active), roles=frozenset(roles))
+
+
+def remember_user_claims(user: User):
+    """
+    Records the current claims of a user, to be called whenever the user changes.
+    """
+    user_claims_cache.set(str(user.id), user_claims(user), size=1)
+
+
+def create_user_access_token(security: AuthX, user: User) -> str:
+    """
+    Creates an access token for a user, with their roles as the `roles` claim.
+
+    The token is encoded with `authx.token.create_token`, as `AuthX.create_access_token`
+    drops any claim other than the registered ones.
+    """
+    claims = user_claims(user)
+    return create_token(
+        uid=str(user.id),
+        key=security.config.private_key,
+        algorithm=security.config.JWT_ALGORITHM,
+        type="access",
+        expiry=security.config.JWT_ACCESS_TOKEN_EXPIRES,
+        csrf=False,
+        additional_data={"roles": sorted(claims.roles)},
+    )
+
+
+def has_role(token: TokenPayload, role: str) -> bool:
+    """
+    Checks that the user a token was issued to has `role`, from the claims recorded
+    since the user last changed, if any, or else from the token itself.
+
+    Args:
+        token (TokenPayload): The verified access token, e.g. from `access_token_required`.
+        role (str): The role to check for, e.g. `SUPERUSER`.
+
+    Returns:
+        bool: Whether the user has the role, and is active.
+    """
+    claims = user_claims_cache.get(token.sub)
+    if claims is not None:
+        return claims.is_active and role in claims.roles
+    return role in (getattr(token, "roles", None) or [])
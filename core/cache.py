@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class CachedCount:
+    """
+    A process local count that is loaded once, kept up to date incrementally by the
+    write paths through `adjust`, and reloaded from the source after `ttl` seconds.
+
+    The reload bounds how far the cached value can drift from the truth, e.g. when
+    another worker process writes, or when a transaction that called `adjust` is
+    rolled back.
+
+    Attributes:
+        ttl (float): The number of seconds a loaded count is trusted for.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: int | None = None
+        self._expires_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, load: Callable[[], int]) -> int:
+        """
+        Returns the cached count, calling `load` to fetch it if it is missing or expired.
+
+        Args:
+            load (Callable[[], int]): Produces the exact count, e.g. a COUNT(*) query.
+
+        Returns:
+            int: The count.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._value is not None and now < self._expires_at:
+                return self._value
+
+        value = load()
+        with self._lock:
+            self._value = value
+            self._expires_at = now + self.ttl
+        return value
+
+    async def get_async(self, load: Callable[[], Awaitable[int]]) -> int:
+        """
+        Like `get`, for a `load` coroutine function, e.g. a COUNT(*) on an async session.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._value is not None and now < self._expires_at:
+                return self._value
+
+        value = await load()
+        with self._lock:
+            self._value = value
+            self._expires_at = now + self.ttl
+        return value
+
+    def adjust(self, delta: int):
+        """
+        Applies a change to the cached count. Does nothing if no count is cached yet.
+
+        Args:
+            delta (int): The number of records added, or removed if negative.
+        """
+        with self._lock:
+            if self._value is not None:
+                self._value += delta
+
+    def invalidate(self):
+        """
+        Drops the cached count so that the next `get` reloads it.
+        """
+        with self._lock:
+            self._value = None
+
+
+class LRUCache:
+    """
+    A process local, thread safe cache that is bounded by the total size of its values,
+    evicting the least recently used entries first, and that expires entries `ttl`
+    seconds after they were stored.
+
+    The TTL bounds how long a stale entry can be served when the underlying data is
+    changed without `invalidate` being called here, e.g. by another worker process.
+
+    Attributes:
+        max_bytes (int): The total size of the values that the cache may hold. 0 disables the cache.
+        ttl (float): The number of seconds an entry is served for.
+        hits (int): The number of `get` calls that found a live entry.
+        misses (int): The number of `get` calls that did not, including expired entries.
+        evictions (int): The number of entries dropped to make room for new ones.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Returns the value stored for `key` and marks it as recently used.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Any | None: The value, or None if there is no live entry for the key.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, size: int):
+        """
+        Stores a value, evicting the least recently used entries until it fits. Values
+        larger than the whole cache are not stored.
+
+        Args:
+            key (Hashable): The key of the entry.
+            value (Any): The value to store.
+            size (int): The size of the value in bytes, counted against `max_bytes`.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """
+        Drops the entry for `key`, if there is one.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        """
+        Drops every entry. The counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the counters along with the current number of entries and their total size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
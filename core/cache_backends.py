@@ -0,0 +1,344 @@
+"""
+This module has the stores behind the footprint response cache.
+
+All backends cache `bytes` values under string keys with a TTL, and can be swapped
+through `settings.FOOTPRINT_CACHE_BACKEND`:
+
+    - memory: an `LRUCache` in each worker process. Workers are kept consistent by the
+      invalidations broadcast through Postgres, see `db.cache_invalidation`.
+    - file: one file per entry in a directory that all workers on a host share, e.g.
+      under `/dev/shm` for a shared memory store.
+    - memcached: a server speaking the memcached text protocol, shared by every worker
+      on every host.
+
+The file and memcached stores are shared, so an invalidation made by one worker is
+seen by all of them. A cache that is unavailable is treated as empty, it never fails
+the request. Setting `settings.FOOTPRINT_CACHE_MAX_BYTES` to 0 disables the cache,
+whichever the backend.
+"""
+
+import hashlib
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from core.cache import LRUCache
+from core.config import settings
+from core.logger import logger
+
+
+def _digest(key: str) -> str:
+    # Hashing makes any footprint id safe as a file name or memcached key.
+    return hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+
+
+class CacheBackend(ABC):
+    """
+    A store of `bytes` values with a TTL, shared by some or all worker processes.
+
+    Attributes:
+        ttl (float): The number of seconds an entry is served for.
+        hits (int): The number of `get` calls in this process that found an entry.
+        misses (int): The number of `get` calls in this process that did not.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Returns the value stored for `key`, or None if there is none.
+        """
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    @abstractmethod
+    def _get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes):
+        """
+        Stores a value for `key`, replacing any previous one.
+        """
+
+    @abstractmethod
+    def invalidate(self, key: str):
+        """
+        Drops the value stored for `key`, if there is one.
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Drops every value.
+        """
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the hit and miss counters of this process.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class DisabledCacheBackend(CacheBackend):
+    """
+    Caches nothing, for when the cache is disabled.
+    """
+
+    def _get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes):
+        pass
+
+    def invalidate(self, key: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Caches values in this process, in an `LRUCache` bounded by `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        super().__init__(ttl)
+        self.cache = LRUCache(max_bytes=max_bytes, ttl=ttl)
+
+    def _get(self, key: str) -> bytes | None:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: bytes):
+        self.cache.set(key, value, size=len(value))
+
+    def invalidate(self, key: str):
+        self.cache.invalidate(key)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self.cache.stats()
+
+
+class FileCacheBackend(CacheBackend):
+    """
+    Caches values as files in `directory`, which the worker processes on a host share.
+    Each file starts with the expiry time of its entry, as a big endian double.
+
+    Files are written to a temporary name and renamed into place, so readers never see
+    a partial entry. Reads touch the file, and every `prune_interval` writes the oldest
+    files are removed until the directory holds at most `max_bytes`.
+    """
+
+    _HEADER = struct.Struct(">d")
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float, prune_interval: int = 100):
+        super().__init__(ttl)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, _digest(key))
+
+    def _get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        if len(data) < self._HEADER.size or self._HEADER.unpack_from(data)[0] <= time.time():
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data[self._HEADER.size:]
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        temporary_path = None
+        try:
+            descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(self._HEADER.pack(time.time() + self.ttl))
+                file.write(value)
+            os.replace(temporary_path, self._path(key))
+        except OSError as e:
+            logger.warning("Could not write to the footprint cache in {directory}: {error}", directory=self.directory, error=str(e))
+            if temporary_path is not None:
+                self._remove(temporary_path)
+            return
+
+        self._writes += 1
+        if self._writes % self.prune_interval == 0:
+            self.prune()
+
+    def invalidate(self, key: str):
+        self._remove(self._path(key))
+
+    def clear(self):
+        try:
+            for entry in os.scandir(self.directory):
+                self._remove(entry.path)
+        except OSError as e:
+            logger.warning("Could not clear the footprint cache in {directory}: {error}", directory=self.directory, error=str(e))
+
+    def prune(self):
+        """
+        Removes expired entries, then the least recently used ones until the directory
+        holds at most `max_bytes`.
+        """
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            logger.warning("Could not prune the footprint cache in {directory}: {error}", directory=self.directory, error=str(e))
+            return
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        for modified, size, path in entries:
+            if total <= self.max_bytes and modified + self.ttl > now:
+                continue
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class MemcachedCacheBackend(CacheBackend):
+    """
+    Caches values on a server that speaks the memcached text protocol.
+
+    Uses a single connection per process, guarded by a lock, which is re-opened after
+    a failure. Any error is logged and treated as a miss.
+    """
+
+    def __init__(self, host: str, port: int, ttl: float, timeout: float = 0.5, prefix: str = "pact:footprint:"):
+        super().__init__(ttl)
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.prefix = prefix
+        self._connection: socket.socket | None = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> bytes:
+        return (self.prefix + _digest(key)).encode()
+
+    def _command(self, command: bytes, handle_reply):
+        with self._lock:
+            try:
+                if self._connection is None:
+                    self._connection = socket.create_connection((self.host, self.port), timeout=self.timeout)
+                    self._reader = self._connection.makefile("rb")
+                self._connection.sendall(command)
+                return handle_reply(self._reader)
+            except (OSError, ValueError) as e:
+                logger.warning("Footprint cache server {host}:{port} failed: {error}", host=self.host, port=self.port, error=str(e))
+                self._close()
+                return None
+
+    def _close(self):
+        if self._connection is not None:
+            self._reader.close()
+            self._connection.close()
+        self._connection = None
+        self._reader = None
+
+    @staticmethod
+    def _expect(*replies: bytes):
+        def handle_reply(reader) -> bool:
+            line = reader.readline()
+            if line not in replies:
+                raise ValueError(f"Unexpected reply {line!r}")
+            return True
+        return handle_reply
+
+    def _get(self, key: str) -> bytes | None:
+        def handle_reply(reader) -> bytes | None:
+            value = None
+            line = reader.readline()
+            if line.startswith(b"VALUE "):
+                length = int(line.split()[3])
+                value = reader.read(length + 2)[:-2]
+                line = reader.readline()
+            if line != b"END\r\n":
+                raise ValueError(f"Unexpected reply {line!r}")
+            return value
+
+        return self._command(b"get " + self._key(key) + b"\r\n", handle_reply)
+
+    def set(self, key: str, value: bytes):
+        expiry = max(1, int(self.ttl + 0.5))
+        header = b"set %s 0 %d %d\r\n" % (self._key(key), expiry, len(value))
+        self._command(header + value + b"\r\n", self._expect(b"STORED\r\n"))
+
+    def invalidate(self, key: str):
+        self._command(b"delete " + self._key(key) + b"\r\n", self._expect(b"DELETED\r\n", b"NOT_FOUND\r\n"))
+
+    def clear(self):
+        self._command(b"flush_all\r\n", self._expect(b"OK\r\n"))
+
+
+def create_cache_backend(backend: str | None = None) -> CacheBackend:
+    """
+    Creates the footprint response cache configured in settings.
+
+    Args:
+        backend (str | None): One of "memory", "file" or "memcached". Defaults to
+            `settings.FOOTPRINT_CACHE_BACKEND`.
+
+    Returns:
+        CacheBackend: The cache, a `DisabledCacheBackend` if `settings.FOOTPRINT_CACHE_MAX_BYTES` is 0.
+
+    Raises:
+        ValueError: If the backend is not known.
+    """
+    backend = backend or settings.FOOTPRINT_CACHE_BACKEND
+    if backend not in ("memory", "file", "memcached"):
+        raise ValueError(f"Unknown cache backend: {backend}")
+    if settings.FOOTPRINT_CACHE_MAX_BYTES <= 0:
+        return DisabledCacheBackend(ttl=settings.FOOTPRINT_CACHE_TTL)
+    if backend == "memory":
+        return MemoryCacheBackend(max_bytes=settings.FOOTPRINT_CACHE_MAX_BYTES, ttl=settings.FOOTPRINT_CACHE_TTL)
+    if backend == "file":
+        return FileCacheBackend(
+            directory=settings.FOOTPRINT_CACHE_DIRECTORY,
+            max_bytes=settings.FOOTPRINT_CACHE_MAX_BYTES,
+            ttl=settings.FOOTPRINT_CACHE_TTL,
+        )
+    host, _, port = settings.FOOTPRINT_CACHE_SERVER.rpartition(":")
+    return MemcachedCacheBackend(host=host, port=int(port), ttl=settings.FOOTPRINT_CACHE_TTL)
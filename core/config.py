@@ -24,12 +24,50 @@ class Settings:
     )  # default postgres port is 5432
     POSTGRES_DB: str = os.getenv("PGDATABASE")
     DATABASE_URL = os.getenv("DATABASE_URL")
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() == "true"  # serve the API with asyncpg and async routes
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", 5))  # connections kept open per process
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))  # extra connections opened under load
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", 30))  # in seconds, to wait for a connection
+    DATABASE_POOL_PRE_PING: bool = os.getenv("DATABASE_POOL_PRE_PING", "false").lower() == "true"  # test connections on checkout
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", -1))  # in seconds, -1 never recycles connections
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 2  # in mins
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", ACCESS_TOKEN_EXPIRE_MINUTES * 60))  # in seconds, at least the token lifetime
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000))  # users whose claims are kept, 0 disables the cache
+    CREDENTIAL_CACHE_TTL: float = float(os.getenv("CREDENTIAL_CACHE_TTL", 300))  # in seconds, a verified client secret skips bcrypt
+    CREDENTIAL_CACHE_MAX_ENTRIES: int = int(os.getenv("CREDENTIAL_CACHE_MAX_ENTRIES", 10000))  # 0 disables the cache
+    PASSWORD_HASHING_WORKERS: int = int(os.getenv("PASSWORD_HASHING_WORKERS", 2))  # bcrypt processes, 0 hashes on the thread pool
+    PASSWORD_HASHING_QUEUE_LIMIT: int = int(os.getenv("PASSWORD_HASHING_QUEUE_LIMIT", 16))  # jobs waiting for a bcrypt process before 503s
+    AUTH_RATE_LIMIT: float = float(os.getenv("AUTH_RATE_LIMIT", 0))  # token requests per second and client address, 0 disables the limit
+    AUTH_RATE_LIMIT_BURST: int = int(os.getenv("AUTH_RATE_LIMIT_BURST", 10))  # token requests a client address may make at once
+    FOOTPRINT_RATE_LIMIT: float = float(os.getenv("FOOTPRINT_RATE_LIMIT", 0))  # footprint requests per second and client, 0 disables the limit
+    FOOTPRINT_RATE_LIMIT_BURST: int = int(os.getenv("FOOTPRINT_RATE_LIMIT_BURST", 100))  # footprint requests a client may make at once
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" or "file"
+    RATE_LIMIT_DIRECTORY: str = os.getenv("RATE_LIMIT_DIRECTORY", "/dev/shm/pact-rate-limits")
+    RATE_LIMIT_MAX_ENTRIES: int = int(os.getenv("RATE_LIMIT_MAX_ENTRIES", 100000))  # clients whose buckets are kept in memory
     LOG_FILE: Path = Path(os.getenv("LOG_FILE", "logs/logs.log"))
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG")
     LOG_ROTATION: str = os.getenv("LOG_ROTATION", "1 day")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # of the log file, "json" or "text"
+    LOG_ENQUEUE: bool = os.getenv("LOG_ENQUEUE", "true").lower() == "true"  # write log lines on a background thread
+    LOG_DEBUG_SAMPLE_EVERY: int = int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", 100))  # keep one in so many hot path debug lines
+    LOG_DEBUG_SAMPLING: str = os.getenv("LOG_DEBUG_SAMPLING", "")  # per logger overrides, e.g. "db.repository.users=10"
+    PAGINATION_DEFAULT_LIMIT: int = int(os.getenv("PAGINATION_DEFAULT_LIMIT", 100))  # page size of a request without a limit
+    PAGINATION_MAX_LIMIT: int = int(os.getenv("PAGINATION_MAX_LIMIT", 1000))  # hard cap on page size
+    PAGINATION_MODE: str = os.getenv("PAGINATION_MODE", "offset")  # "offset" or "cursor"
+    FOOTPRINT_COUNT_STRATEGY: str = os.getenv("FOOTPRINT_COUNT_STRATEGY", "exact")  # "exact", "estimated" or "probe"
+    FOOTPRINT_COUNT_TTL: float = float(os.getenv("FOOTPRINT_COUNT_TTL", 60))  # in seconds
+    FOOTPRINT_LOADING_STRATEGY: str = os.getenv("FOOTPRINT_LOADING_STRATEGY", "selectin")  # "selectin", "joined" or "lazy"
+    FOOTPRINT_SERIALIZER: str = os.getenv("FOOTPRINT_SERIALIZER", "python")  # "python", "postgres" or "document"
+    FOOTPRINT_CACHE_MAX_BYTES: int = int(os.getenv("FOOTPRINT_CACHE_MAX_BYTES", 64 * 1024 * 1024))  # 0 disables the cache, memcached is bounded by its server
+    FOOTPRINT_CACHE_TTL: float = float(os.getenv("FOOTPRINT_CACHE_TTL", 300))  # in seconds
+    FOOTPRINT_CACHE_BACKEND: str = os.getenv("FOOTPRINT_CACHE_BACKEND", "memory")  # "memory", "file" or "memcached"
+    FOOTPRINT_CACHE_DIRECTORY: str = os.getenv("FOOTPRINT_CACHE_DIRECTORY", "/dev/shm/pact-footprint-cache")
+    FOOTPRINT_CACHE_SERVER: str = os.getenv("FOOTPRINT_CACHE_SERVER", "localhost:11211")  # host:port of a memcached server
+    FOOTPRINT_BULK_BATCH_SIZE: int = int(os.getenv("FOOTPRINT_BULK_BATCH_SIZE", 500))  # footprints per multi-row INSERT
+    FOOTPRINT_EXPORT_BATCH_SIZE: int = int(os.getenv("FOOTPRINT_EXPORT_BATCH_SIZE", 1000))  # rows fetched per round trip of an export
+    FOOTPRINT_STREAM_MIN_LIMIT: int = int(os.getenv("FOOTPRINT_STREAM_MIN_LIMIT", 1000))  # list pages this large are streamed, 0 never streams, at most PAGINATION_MAX_LIMIT
 
 
 settings = Settings()
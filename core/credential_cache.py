@@ -0,0 +1,157 @@
+"""
+This module caches the outcome of password verifications, so that a client requesting
+a token over and over, as it has to with short lived tokens, only pays for bcrypt once
+per `settings.CREDENTIAL_CACHE_TTL`.
+
+Credentials are never stored. An entry is keyed by an HMAC of the client id and secret
+under a random key that only exists in the memory of this process, and holds the id and
+password hash of the user they were verified against. A hit only counts if the user's
+current row still has the same password hash, so a password changed by any process
+is never accepted from the cache, and `forget_user` drops the entries of a user whose
+password was changed or who was deactivated in this one.
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from core.config import settings
+from core.hashing import Hasher
+from db.models.user import User
+
+
+class _VerifiedCredential(NamedTuple):
+    user_id: int
+    hashed_password: str
+    expires_at: float
+
+
+class VerifiedCredentialCache:
+    """
+    A process local, thread safe map of verified credentials to the user they belong
+    to, evicting the least recently used entries beyond `max_entries`, and expiring
+    entries `ttl` seconds after they were stored.
+
+    Attributes:
+        max_entries (int): The number of credentials that the cache may hold. 0 disables the cache.
+        ttl (float): The number of seconds a verification is trusted for.
+        hits (int): The number of verifications answered from the cache.
+        misses (int): The number of verifications that were not.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._key = secrets.token_bytes(32)
+        self._entries: OrderedDict[bytes, _VerifiedCredential] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, client_id: str, client_secret: str) -> bytes:
+        # Length prefixed, so that no two pairs of strings have the same message.
+        message = b"%d:%s%s" % (len(client_id.encode()), client_id.encode(), client_secret.encode())
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def verified(self, client_id: str, client_secret: str, user: User) -> bool:
+        """
+        Checks whether the credentials were verified against the current password of
+        `user` within the TTL.
+
+        Args:
+            client_id (str): The client id, i.e. the email of the user.
+            client_secret (str): The client secret, i.e. the password of the user.
+            user (User): The user that `client_id` identifies.
+
+        Returns:
+            bool: True if the credentials are known to be valid, False if they have to be verified.
+        """
+        digest = self._digest(client_id, client_secret)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return False
+            if entry.user_id != user.id or not hmac.compare_digest(entry.hashed_password, user.hashed_password):
+                del self._entries[digest]
+                self.misses += 1
+                return False
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return True
+
+    def remember(self, client_id: str, client_secret: str, user: User):
+        """
+        Records that the credentials were verified against the current password of `user`.
+        """
+        if self.max_entries <= 0:
+            return
+        digest = self._digest(client_id, client_secret)
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._entries[digest] = _VerifiedCredential(user.id, user.hashed_password, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget_user(self, user_id: int):
+        """
+        Drops every entry of a user, to be called when their password changes or they
+        are deactivated.
+        """
+        with self._lock:
+            for digest in [digest for digest, entry in self._entries.items() if entry.user_id == user_id]:
+                del self._entries[digest]
+
+    def clear(self):
+        """
+        Drops every entry. The counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the counters along with the current number of entries.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+verified_credentials = VerifiedCredentialCache(
+    max_entries=settings.CREDENTIAL_CACHE_MAX_ENTRIES, ttl=settings.CREDENTIAL_CACHE_TTL
+)
+
+
+def verify_credentials(client_id: str, client_secret: str, user: User) -> bool:
+    """
+    Verifies a client secret against the password of `user`, with bcrypt unless it was
+    verified recently.
+    """
+    if verified_credentials.verified(client_id, client_secret, user):
+        return True
+    if not Hasher.verify_password(plain_password=client_secret, hashed_password=user.hashed_password):
+        return False
+    verified_credentials.remember(client_id, client_secret, user)
+    return True
+
+
+async def verify_credentials_async(client_id: str, client_secret: str, user: User) -> bool:
+    """
+    Like `verify_credentials`, with bcrypt run in the password hashing pool.
+
+    Raises:
+        PasswordHashingBusyError: If the pool's queue is full.
+    """
+    if verified_credentials.verified(client_id, client_secret, user):
+        return True
+    if not await Hasher.verify_password_async(plain_password=client_secret, hashed_password=user.hashed_password):
+        return False
+    verified_credentials.remember(client_id, client_secret, user)
+    return True
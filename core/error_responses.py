@@ -16,6 +16,8 @@ The error response codes and their related HTTP status codes are as follows:
     - NotImplemented: 400
     - TokenExpired: 401
     - InternalError: 500
+    - TooManyRequests: 429, when a client exceeds its rate limit
+    - ServiceUnavailable: 503, when the host is too busy to handle the request
 
 A host system MAY return error messages different from the table below, for instance localized values depending on a data recipient.
 """
@@ -29,12 +31,14 @@ class ErrorResponse:
         message (str): A human-readable error description.
         code (str): An error response code.
         status_code (int): The HTTP status code associated with the error response code.
+        headers (dict[str, str] | None): Headers to send along, e.g. `Retry-After`.
     """
 
-    def __init__(self, message, code, status_code):
+    def __init__(self, message, code, status_code, headers=None):
         self.message = message
         self.code = code
         self.status_code = status_code
+        self.headers = headers
 
     def to_json_response(self):
         """
@@ -43,7 +47,9 @@ class ErrorResponse:
         Returns:
             JSONResponse: A JSON response object with the error message and code.
         """
-        return JSONResponse({"message": self.message, "code": self.code}, status_code=self.status_code)
+        return JSONResponse(
+            {"message": self.message, "code": self.code}, status_code=self.status_code, headers=self.headers
+        )
 
 
 class AccessDeniedError(ErrorResponse):
@@ -142,3 +148,38 @@ class DuplicateEntryError(ErrorResponse):
 
     def __init__(self, message):
         super().__init__(message, "DuplicateEntry", 409)
+
+
+class TooManyRequestsError(ErrorResponse):
+    """
+    Error response for requests turned away because the client exceeded its rate limit.
+
+    Attributes:
+        message (str): A human-readable error description. Defaults to "Too many requests, try again later".
+        code (str): An error response code. Defaults to "TooManyRequests".
+        status_code (int): The HTTP status code associated with the error response code. Defaults to 429.
+        headers (dict[str, str]): Asks the client to retry after `retry_after` seconds.
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            "Too many requests, try again later", "TooManyRequests", 429, headers={"Retry-After": str(retry_after)}
+        )
+
+
+class ServiceUnavailableError(ErrorResponse):
+    """
+    Error response for requests turned away because the host is too busy, e.g. when the
+    password hashing pool is full.
+
+    Attributes:
+        message (str): A human-readable error description. Defaults to "The service is busy, try again later".
+        code (str): An error response code. Defaults to "ServiceUnavailable".
+        status_code (int): The HTTP status code associated with the error response code. Defaults to 503.
+        headers (dict[str, str]): Asks the client to retry after `retry_after` seconds.
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            "The service is busy, try again later", "ServiceUnavailable", 503, headers={"Retry-After": str(retry_after)}
+        )
@@ -0,0 +1,40 @@
+import hashlib
+from datetime import datetime
+
+
+def footprint_etag(id: str, version: int | None, updated: datetime | None) -> str:
+    """
+    Builds the strong ETag of a product footprint from the fields that change whenever
+    its content does, so it can be computed without building the response body.
+
+    Args:
+        id (str): The product footprint identifier.
+        version (int | None): The version of the product footprint.
+        updated (datetime | None): The timestamp of the last update, if any.
+
+    Returns:
+        str: The quoted ETag, e.g. `"5d41402abc4b2a76b9719d911017c592"`.
+    """
+    updated_value = updated.isoformat() if updated is not None else ""
+    digest = hashlib.blake2b(f"{id}\x00{version}\x00{updated_value}".encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def if_none_match(header: str | None, etag: str) -> bool:
+    """
+    Checks an `If-None-Match` request header against the current ETag of a resource,
+    using the weak comparison that RFC 9110 prescribes for this header.
+
+    Args:
+        header (str | None): The value of the `If-None-Match` header, if it was sent.
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 can be returned.
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque_tag for candidate in header.split(","))
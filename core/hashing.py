@@ -1,8 +1,126 @@
+import asyncio
+import bisect
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+from db.pool_metrics import WAIT_BUCKETS
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHashingBusyError(Exception):
+    """
+    Raised when the password hashing pool already has as many jobs waiting as it
+    admits, so that the caller can turn the request away at once.
+    """
+
+
+def _timed(function: Callable, kwargs: dict) -> tuple[float, Any]:
+    # Runs in a worker process, the wall clock is the one clock it shares with the parent.
+    return time.time(), function(**kwargs)
+
+
+class PasswordHashingPool:
+    """
+    Runs password hashing and verification in a pool of worker processes, so that bcrypt
+    neither holds the GIL nor takes up the threads that serve reads, and turns jobs away
+    with `PasswordHashingBusyError` once `queue_limit` of them are waiting for a worker.
+
+    The processes are started on first use, from a fork server so that they do not
+    inherit the threads and locks of the application. With no workers, jobs run on the
+    Starlette thread pool instead, without admission control.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        queue_limit (int): The number of jobs that may wait for a worker.
+        completed (int): The number of jobs that ran.
+        rejected (int): The number of jobs turned away.
+        wait_seconds (float): The total time jobs spent waiting for a worker.
+        wait_buckets (list[int]): The number of jobs per bucket of `WAIT_BUCKETS`, with a
+            last bucket for longer waits.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self._in_flight = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
+
+    async def run(self, function: Callable, **kwargs) -> Any:
+        """
+        Runs `function(**kwargs)` in a worker process, and returns its result.
+
+        Raises:
+            PasswordHashingBusyError: If `queue_limit` jobs are already waiting for a worker.
+        """
+        if self.workers <= 0:
+            return await run_in_threadpool(function, **kwargs)
+
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHashingBusyError()
+            self._in_flight += 1
+        try:
+            submitted = time.time()
+            future = self._get_executor().submit(_timed, function, kwargs)
+            started, result = await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        wait = max(started - submitted, 0.0)
+        with self._lock:
+            self.completed += 1
+            self.wait_seconds += wait
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, wait)] += 1
+        return result
+
+    def stats(self) -> dict:
+        """
+        Returns the configuration, the current queue depth and the counters, with the
+        wait histogram keyed by the upper bound of each bucket.
+        """
+        with self._lock:
+            histogram = {str(bound): count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)}
+            histogram["+Inf"] = self.wait_buckets[-1]
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._in_flight,
+                "queued": max(self._in_flight - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds,
+                "wait_seconds_histogram": histogram,
+            }
+
+
+password_hashing_pool = PasswordHashingPool(
+    workers=settings.PASSWORD_HASHING_WORKERS, queue_limit=settings.PASSWORD_HASHING_QUEUE_LIMIT
+)
+
+
 class Hasher:
     """
     Helper class for password hashing and verification.
@@ -39,4 +157,26 @@ class Hasher:
             str: The generated hashed password.
         """
 
-        return pwd_context.hash(password)
\ No newline at end of file
+        return pwd_context.hash(password)
+
+    @staticmethod
+    async def verify_password_async(*, plain_password: str, hashed_password: str) -> bool:
+        """
+        Like `verify_password`, run in the password hashing pool.
+
+        Raises:
+            PasswordHashingBusyError: If the pool's queue is full.
+        """
+        return await password_hashing_pool.run(
+            Hasher.verify_password, plain_password=plain_password, hashed_password=hashed_password
+        )
+
+    @staticmethod
+    async def get_password_hash_async(*, password: str) -> str:
+        """
+        Like `get_password_hash`, run in the password hashing pool.
+
+        Raises:
+            PasswordHashingBusyError: If the pool's queue is full.
+        """
+        return await password_hashing_pool.run(Hasher.get_password_hash, password=password)
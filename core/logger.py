@@ -1,11 +1,92 @@
+"""
+This module configures the loguru `logger` that the application logs to.
+
+Both sinks are enqueued unless `settings.LOG_ENQUEUE` is disabled: a logging call only
+formats its record and puts it on a queue, and a background thread writes it, so that
+neither a slow disk nor the rotation and compression of the log file ever block a
+request thread. Passing the record through the queue costs more CPU than writing it, so
+on a host with a fast disk and few cores the sinks may be better off synchronous. The
+file sink writes one JSON object per line when `settings.LOG_FORMAT` is "json".
+
+Messages are formatted lazily, from a template and keyword arguments, which also end up
+as fields of the JSON record:
+
+    logger.info("Retrieving user with email {email}", email=email)
+
+so a line below the configured level costs no formatting at all. Debug lines on hot
+paths go through a `SampledLogger`, which passes on one in every so many of them.
+"""
+
+import sys
+import threading
+
 from loguru import logger
 
 from core.config import settings
 
 
+logger.remove()
+logger.add(sys.stderr, level=settings.LOG_LEVEL, enqueue=settings.LOG_ENQUEUE)
 logger.add(
     settings.LOG_FILE,
     level=settings.LOG_LEVEL,
     rotation=settings.LOG_ROTATION,
-    compression="zip"
+    compression="zip",
+    serialize=settings.LOG_FORMAT == "json",
+    enqueue=settings.LOG_ENQUEUE,
 )
+
+DEBUG_ENABLED = logger.level(settings.LOG_LEVEL.upper()).no <= logger.level("DEBUG").no
+
+
+def _sampling_rates(sampling: str) -> dict[str, int]:
+    # "db.repository.users=10,core.pagination=100" keeps one in 10 and one in 100 lines.
+    rates = {}
+    for rate in filter(None, (part.strip() for part in sampling.split(","))):
+        name, _, every = rate.partition("=")
+        rates[name.strip()] = int(every)
+    return rates
+
+
+_SAMPLING_RATES = _sampling_rates(settings.LOG_DEBUG_SAMPLING)
+
+
+class SampledLogger:
+    """
+    Passes on the first and then every `every`-th debug line logged through it, and
+    drops the others before they are formatted. Each module that logs on a hot path
+    has its own, so a busy module does not crowd out the debug lines of the others.
+
+    Attributes:
+        name (str): The name of the logger, usually the `__name__` of the module.
+        every (int): One in how many lines is passed on. 0 drops every line.
+    """
+
+    def __init__(self, name: str, every: int):
+        self.name = name
+        self.every = every
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def debug(self, message: str, **fields):
+        """
+        Logs a debug line, if it is sampled, with the `fields` formatted into `message`.
+        """
+        if self.every <= 0:
+            return
+        with self._lock:
+            sampled = self._count % self.every == 0
+            self._count += 1
+        if sampled:
+            logger.opt(depth=1).debug(message, sampled_every=self.every, **fields)
+
+
+def sampled_logger(name: str) -> SampledLogger:
+    """
+    Returns a `SampledLogger` for `name`, which passes on the share of debug lines
+    configured for it in `settings.LOG_DEBUG_SAMPLING`, or else one in
+    `settings.LOG_DEBUG_SAMPLE_EVERY`. It drops every line when debug logging is off.
+    """
+    if not DEBUG_ENABLED:
+        return SampledLogger(name, every=0)
+    return SampledLogger(name, every=_SAMPLING_RATES.get(name, settings.LOG_DEBUG_SAMPLE_EVERY))
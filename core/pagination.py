@@ -1,14 +1,15 @@
-from contextlib import contextmanager
-from typing import Any, Generic, Optional, Sequence, TypeVar
+import base64
+import json
+from typing import Any, Generic, Iterable, Iterator, Optional, Sequence, TypeVar
 from typing_extensions import Self
 
-from fastapi_pagination.bases import AbstractPage
-from fastapi_pagination.limit_offset import OptionalLimitOffsetParams
+from fastapi import Query
+from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
+from pydantic import BaseModel
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
-from db.session import get_db
-from db.repository.product_footprints import count_product_footprints
+from core.config import settings
 
 
 """
@@ -25,6 +26,75 @@ time to understand some of the more arcane parts of it.
 
 T = TypeVar("T")
 
+# The JSON that precedes the items of a page rendered from documents.
+JSON_PAGE_HEAD = '{"data":['
+
+
+class JSONAPIParams(BaseModel, AbstractParams):
+    """
+    Limit/offset query parameters for the footprint list endpoint.
+
+    Both parameters are optional, as per the PACT spec, but the page size is always
+    bounded by `settings.PAGINATION_MAX_LIMIT` so that a request can never pull the
+    whole table in one go. A larger limit is lowered to the maximum rather than
+    rejected, and a request without a limit gets a page of
+    `settings.PAGINATION_DEFAULT_LIMIT`.
+
+    The `cursor` parameter is only ever set from a `Link` header produced in cursor
+    mode, see `encode_cursor`. When present it takes precedence over `offset`.
+
+    Attributes:
+        limit (Optional[int]): The requested page size, lowered to `PAGINATION_MAX_LIMIT` if above it.
+        offset (Optional[int]): The number of records to skip.
+        cursor (Optional[str]): An opaque keyset cursor pointing after the last record seen.
+    """
+    limit: Optional[int] = Query(None, ge=1, description="Page size limit")
+    offset: Optional[int] = Query(None, ge=0, description="Page offset")
+    cursor: Optional[str] = Query(None, description="Opaque pagination cursor")
+
+    def to_raw_params(self) -> RawParams:
+        return RawParams(
+            limit=min(self.limit or settings.PAGINATION_DEFAULT_LIMIT, settings.PAGINATION_MAX_LIMIT),
+            offset=self.offset or 0,
+        )
+
+
+def encode_cursor(pk: int) -> str:
+    """
+    Encodes the primary key of the last record of a page into an opaque cursor.
+
+    Args:
+        pk (int): The primary key of the last record on the current page.
+
+    Returns:
+        str: A URL safe cursor string.
+    """
+    payload = json.dumps({"pk": pk}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodes a cursor produced by `encode_cursor` back into a primary key.
+
+    Args:
+        cursor (str): The cursor string taken from the request.
+
+    Returns:
+        int: The primary key that the next page should start after.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        pk = json.loads(base64.urlsafe_b64decode(padded))["pk"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        raise ValueError("Invalid pagination cursor")
+    return pk
+
 
 class JSONAPIPage(AbstractPage[T], Generic[T]):
     """
@@ -36,7 +106,8 @@ class JSONAPIPage(AbstractPage[T], Generic[T]):
 
     Methods:
         create(cls, items, params, *, total, **kwargs): Creates a JSONAPIPage object.
-            Requires total record count for proper pagination metadata generation.
+            `meta.total` is only included when a total record count is passed, it is
+            left out when the route is configured not to count.
 
     Testing Notes:
         * Create unit tests for this class as well. Focus on:
@@ -46,63 +117,88 @@ class JSONAPIPage(AbstractPage[T], Generic[T]):
     data: Sequence[T]
     meta: dict[str, int] = {}
 
-    __params_type__ = OptionalLimitOffsetParams
+    __params_type__ = JSONAPIParams
 
     @classmethod
     def create(
         cls,
         items: Sequence[T],
-        params: OptionalLimitOffsetParams = None,
+        params: JSONAPIParams = None,
         *,
         total: Optional[int] = None,
         **kwargs: Any,
     ) -> Self:
-        assert isinstance(params, OptionalLimitOffsetParams)
-        assert total is not None
+        assert isinstance(params, JSONAPIParams)
 
         return cls(
             data=items,
-            meta={"total": total},
+            meta={"total": total} if total is not None else {},
             **kwargs,
         )
 
 
+def render_json_page(documents: Sequence[str], total: Optional[int] = None) -> str:
+    """
+    Renders a page from documents that are already serialised JSON, giving the same
+    bytes as `JSONAPIPage.model_dump_json` would for the equivalent items.
+
+    Args:
+        documents (Sequence[str]): The JSON documents of the items on the page.
+        total (Optional[int]): The total record count, `meta.total` is left out if None.
+
+    Returns:
+        str: The JSON of the page.
+    """
+    return JSON_PAGE_HEAD + ",".join(documents) + json_page_tail(total)
+
+
+def json_page_tail(total: Optional[int] = None) -> str:
+    """
+    Returns the JSON that follows the items of a page, see `render_json_page`.
+    """
+    meta = json.dumps({"total": total} if total is not None else {}, separators=(",", ":"))
+    return '],"meta":' + meta + "}"
+
+
+def stream_json_page(documents: Iterable[str], total: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields the pieces of `render_json_page`, one document at a time, so that a page
+    can be sent while its documents are still being read.
+    """
+    yield JSON_PAGE_HEAD
+    for index, document in enumerate(documents):
+        if index:
+            yield ","
+        yield document
+    yield json_page_tail(total)
+
+
 class PaginationMiddleware(BaseHTTPMiddleware):
     """
     Starlette middleware to intercept API responses and add pagination-related headers.
 
     Responsibilities:
-        1. Counts total product footprints in the database.
-        2. Calculates the URL for the 'next' page of results (if applicable).
+        1. Picks up the query parameters for the 'next' page of results, if the route left any.
+        2. Calculates the URL for the 'next' page of results.
         3. Adds a 'Link' header to the response, guiding clients on how to fetch the next data set.
 
+    Paginated routes work out whether there is a next page themselves and store its query
+    parameters on `request.state.next_page_params`, e.g. `{"offset": 4}` or
+    `{"cursor": "..."}`. Requests to any other route pass straight through, so the
+    middleware never touches the database.
+
     Testing Notes:
         * Consider extracting link-generation logic into a separate, testable helper function.
-        * Use mocking to replace 'count_product_footprints' in endpoint tests. This lets you focus on
-          pagination behavior without requiring a live database.
         * Write a few integration tests focused on the middleware, where realistic requests
           trigger Link header creation.
     """
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
 
-        with contextmanager(get_db)() as db:
-            product_footprint_count = count_product_footprints(db=db)
-
-        limit = request.query_params.get('limit')
-        print(f"we have a limit here: {limit}")
-        offset = request.query_params.get('offset', 0)
-        if limit:
-            # Get current URL, adjust for next page
-            http_url = request.url
-            url = http_url.replace(scheme='https')
-            next_offset = int(offset) + int(limit)
-            next_url = url.include_query_params(offset=next_offset)
-            print(f'limit: {limit}, offset:{offset}, next_offset:{next_offset}, count:{product_footprint_count}')
-
-            # Construct Link header
-            if next_offset < product_footprint_count:
-                response.headers['Link'] = f'<{next_url}>; rel="next"'
-                print(f"link: {response.headers['Link']}")
+        next_page_params = getattr(request.state, "next_page_params", None)
+        if next_page_params:
+            url = request.url.replace(scheme='https').remove_query_params(['offset', 'cursor'])
+            next_url = url.include_query_params(**next_page_params)
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
 
         return response
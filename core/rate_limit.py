@@ -0,0 +1,276 @@
+"""
+This module limits the rate at which each client may call a group of routes, so that
+one integration polling in a tight loop cannot take the database or bcrypt capacity
+that every other client shares.
+
+Each client has a token bucket per group, holding up to `burst` tokens and refilled
+at `rate` tokens per second. A request takes a token, and is turned away with a 429
+and a `Retry-After` when the bucket is empty. Limits are attached to route groups as
+dependencies, see `apis.base`, and run before any other dependency of the route, so a
+limited request never checks out a database connection.
+
+The buckets are kept in a backend that can be swapped through
+`settings.RATE_LIMIT_BACKEND`:
+
+    - memory: a map in each worker process, so each worker enforces the limit on its
+      own, and a client may make up to `workers * rate` requests per second.
+    - file: one file per bucket in a directory that all workers on a host share, e.g.
+      under `/dev/shm`, updated under an exclusive lock so that they enforce one limit.
+
+A backend that fails lets the request through, it never fails the request. Both limits
+are off unless `settings.AUTH_RATE_LIMIT` and `settings.FOOTPRINT_RATE_LIMIT` are set.
+"""
+
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from fastapi import Request
+
+from core.auth_config import get_authx_security
+from core.config import settings
+from core.logger import logger
+
+
+security = get_authx_security()
+
+
+class RateLimitExceededError(Exception):
+    """
+    Raised by a `RateLimit` when the client has no token left.
+
+    Attributes:
+        retry_after (float): The number of seconds until the client has a token again.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.3f} seconds")
+        self.retry_after = retry_after
+
+
+def _take(tokens: float, updated: float, now: float, rate: float, burst: int) -> tuple[float, float]:
+    # Refills the bucket for the time since it was last updated, then takes a token.
+    tokens = min(float(burst), tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class RateLimitBackend(ABC):
+    """
+    A store of token buckets, shared by some or all worker processes.
+    """
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Takes a token from the bucket of `key`, which starts out full.
+
+        Args:
+            key (str): Identifies the bucket, i.e. the group and the client.
+            rate (float): The number of tokens added to the bucket per second.
+            burst (int): The number of tokens the bucket holds.
+
+        Returns:
+            float: 0 if a token was taken, else the number of seconds until there is one.
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Drops every bucket, so that all of them are full again.
+        """
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Keeps the buckets in this process, dropping those of the least recently seen clients
+    beyond `max_entries`. A dropped bucket is full when its client comes back.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(burst), now))
+            tokens, wait = _take(tokens, updated, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class FileRateLimitBackend(RateLimitBackend):
+    """
+    Keeps each bucket in a file in `directory`, which the worker processes on a host
+    share. A file holds the tokens left and the time they were counted, as big endian
+    doubles, and is read and written under an exclusive `flock`.
+
+    Every `prune_interval` takes, files not updated for `prune_after` seconds are
+    removed, which by then are full buckets.
+    """
+
+    _BUCKET = struct.Struct(">dd")
+
+    def __init__(self, directory: str, prune_interval: int = 1000, prune_after: float = 3600):
+        self.directory = directory
+        self.prune_interval = prune_interval
+        self.prune_after = prune_after
+        self._takes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Hashing makes any client id safe as a file name.
+        return os.path.join(self.directory, hashlib.blake2b(key.encode(), digest_size=20).hexdigest())
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        try:
+            descriptor = os.open(self._path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            logger.warning("Could not open the rate limit bucket in {directory}: {error}", directory=self.directory, error=str(e))
+            return 0.0
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            now = time.time()
+            data = os.pread(descriptor, self._BUCKET.size, 0)
+            tokens, updated = self._BUCKET.unpack(data) if len(data) == self._BUCKET.size else (float(burst), now)
+            tokens, wait = _take(tokens, updated, now, rate, burst)
+            os.pwrite(descriptor, self._BUCKET.pack(tokens, now), 0)
+        except OSError as e:
+            logger.warning("Could not update the rate limit bucket in {directory}: {error}", directory=self.directory, error=str(e))
+            return 0.0
+        finally:
+            os.close(descriptor)
+
+        self._takes += 1
+        if self._takes % self.prune_interval == 0:
+            self.prune()
+        return wait
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            self._remove(entry.path)
+
+    def prune(self):
+        """
+        Removes the buckets that were not updated for `prune_after` seconds.
+        """
+        oldest = time.time() - self.prune_after
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < oldest:
+                    self._remove(entry.path)
+            except OSError:
+                continue
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def create_rate_limit_backend(backend: str | None = None) -> RateLimitBackend:
+    """
+    Creates the rate limit backend configured in settings.
+
+    Args:
+        backend (str | None): One of "memory" or "file". Defaults to `settings.RATE_LIMIT_BACKEND`.
+
+    Returns:
+        RateLimitBackend: The backend.
+
+    Raises:
+        ValueError: If the backend is not known.
+    """
+    backend = backend or settings.RATE_LIMIT_BACKEND
+    if backend == "memory":
+        return MemoryRateLimitBackend(max_entries=settings.RATE_LIMIT_MAX_ENTRIES)
+    if backend == "file":
+        return FileRateLimitBackend(directory=settings.RATE_LIMIT_DIRECTORY)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+rate_limit_backend = create_rate_limit_backend()
+
+
+def _address(request: Request) -> str:
+    return f"address:{request.client.host if request.client else 'unknown'}"
+
+
+async def client_address(request: Request) -> str:
+    """
+    Identifies the client of a request by its address. Used for token requests, whose
+    callers are not authenticated yet: a limit keyed on the `client_id` they send would
+    be evaded by sending a different one each time.
+    """
+    return _address(request)
+
+
+async def token_client_id(request: Request) -> str | None:
+    """
+    Identifies the client of an authenticated request by the subject of its access token.
+
+    Raises:
+        MissingTokenError, JWTDecodeError: If the request has no valid access token,
+            which are answered as by the route itself.
+    """
+    payload = await security.access_token_required(request)
+    return payload.sub
+
+
+class RateLimit:
+    """
+    A FastAPI dependency that limits each client to `rate` requests per second, with
+    bursts of up to `burst` requests, across the routes of `group`.
+
+    Clients are told apart by `client`, and by their address if it cannot tell.
+
+    Attributes:
+        group (str): The name of the route group, which has its own bucket per client.
+        rate (float): The number of requests per second a client may make. 0 disables the limit.
+        burst (int): The number of requests a client may make at once.
+        client (Callable[[Request], Awaitable[str | None]]): Identifies the client of a request.
+        backend (RateLimitBackend | None): The store of the buckets. Defaults to `rate_limit_backend`.
+    """
+
+    def __init__(
+        self,
+        group: str,
+        rate: float,
+        burst: int,
+        client: Callable[[Request], Awaitable[str | None]],
+        backend: RateLimitBackend | None = None,
+    ):
+        self.group = group
+        self.rate = rate
+        self.burst = burst
+        self.client = client
+        self.backend = backend
+
+    async def __call__(self, request: Request):
+        if self.rate <= 0:
+            return
+        client_id = await self.client(request)
+        if client_id is None:
+            client_id = _address(request)
+
+        backend = self.backend or rate_limit_backend
+        wait = backend.take(f"{self.group}:{client_id}", self.rate, self.burst)
+        if wait > 0:
+            raise RateLimitExceededError(wait)
@@ -1,4 +1,5 @@
 from db.base_class import Base
 from db.models.user import User
 from db.models.product_footprint import ProductFootprint
-from db.models.carbon_footprint import CarbonFootprintModel, ProductOrSectorSpecificRuleModel, EmissionFactorDatasetModel
\ No newline at end of file
+from db.models.carbon_footprint import CarbonFootprintModel, ProductOrSectorSpecificRuleModel, EmissionFactorDatasetModel
+from db import pact_json  # registers the SQL functions used to render PACT JSON
@@ -0,0 +1,116 @@
+"""
+This module builds INSERT statements that load a batch of rows through a single JSON
+parameter, for bulk loads.
+
+A multi-row VALUES clause binds one parameter per column per row, and SQLAlchemy
+compiles it afresh for every batch, which soon costs more than the insert itself.
+Here the rows are sent as one JSON array, which Postgres expands with
+`json_to_recordset`, so the statement is built once and is the same for every batch.
+Values are converted as their column types would bind them, e.g. enums by name and
+JSON columns with None as a JSON null, so that the rows match those the ORM writes.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable
+
+import pydantic.json
+from sqlalchemy import JSON, Table, bindparam, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.elements import TextClause
+
+
+_dialect = postgresql.dialect()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return pydantic.json.pydantic_encoder(value)
+
+
+def bind_processors(table: Table, columns: Iterable[str]) -> dict[str, Callable[[Any], Any]]:
+    """
+    Returns the functions that convert Python values of the non-JSON `columns` of
+    `table` to what is sent to the database, e.g. enum members to their names.
+    """
+    processors = {}
+    for name in columns:
+        column_type = table.c[name].type
+        if isinstance(column_type, JSON):
+            continue
+        processor = column_type.bind_processor(_dialect)
+        if processor is not None:
+            processors[name] = processor
+    return processors
+
+
+class RecordsetInsert:
+    """
+    An `INSERT INTO table (columns) SELECT ... FROM json_to_recordset(:rows)` statement.
+
+    Attributes:
+        table (Table): The table inserted into.
+        columns (list[str]): The columns each row provides. Missing keys insert NULL.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        columns: Iterable[str],
+        returning: Iterable[str] = (),
+        on_conflict_do_nothing: Iterable[str] = (),
+    ):
+        """
+        Args:
+            table (Table): The table to insert into.
+            columns (Iterable[str]): The columns each row provides.
+            returning (Iterable[str]): The columns of the inserted rows to return.
+            on_conflict_do_nothing (Iterable[str]): The columns of a unique index, rows
+                that conflict on which are skipped.
+        """
+        self.table = table
+        self.columns = list(columns)
+        returning = list(returning)
+        on_conflict_do_nothing = list(on_conflict_do_nothing)
+        preparer = _dialect.identifier_preparer
+
+        names, definitions, values = [], [], []
+        self._processors = bind_processors(table, self.columns)
+        for name in self.columns:
+            column = table.c[name]
+            quoted = preparer.quote(column.name)
+            names.append(quoted)
+            definitions.append(f"{quoted} {column.type.compile(dialect=_dialect)}")
+            if isinstance(column.type, JSON):
+                # The ORM writes None to a JSON column as a JSON null, not SQL NULL.
+                values.append(f"coalesce(r.{quoted}, CAST('null' AS {column.type.compile(dialect=_dialect)}))")
+            else:
+                values.append(f"r.{quoted}")
+
+        sql = (
+            f"INSERT INTO {preparer.format_table(table)} ({', '.join(names)}) "
+            f"SELECT {', '.join(values)} FROM json_to_recordset(CAST(:rows AS json)) AS r({', '.join(definitions)})"
+        )
+        if on_conflict_do_nothing:
+            sql += f" ON CONFLICT ({', '.join(preparer.quote(name) for name in on_conflict_do_nothing)}) DO NOTHING"
+        if returning:
+            sql += f" RETURNING {', '.join(preparer.quote(name) for name in returning)}"
+        statement = text(sql).bindparams(bindparam("rows"))
+        if returning:
+            statement = statement.columns(*(table.c[name] for name in returning))
+        self._statement = statement
+
+    def _process(self, row: dict) -> dict:
+        processed = {}
+        for name in self.columns:
+            value = row.get(name)
+            processor = self._processors.get(name)
+            processed[name] = processor(value) if processor is not None and value is not None else value
+        return processed
+
+    def statement(self, rows: list[dict]) -> TextClause:
+        """
+        Returns the statement that inserts `rows`, dicts keyed by column name.
+        """
+        return self._statement.bindparams(rows=json.dumps([self._process(row) for row in rows], default=_json_default))
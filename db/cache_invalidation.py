@@ -0,0 +1,111 @@
+"""
+This module broadcasts footprint cache invalidations to every worker process through
+Postgres `NOTIFY`.
+
+A write path calls `broadcast_invalidation` before it commits. Postgres only delivers
+the notification once the transaction commits, and drops it if it is rolled back, so
+other workers never drop an entry for a write that did not happen, nor miss one that
+did. Each worker runs an `InvalidationListener` that drops the keys it is told about
+from its own cache.
+"""
+
+import os
+import select
+import threading
+
+import psycopg2
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.cache_backends import CacheBackend
+from core.logger import logger
+
+
+CHANNEL = "footprint_cache_invalidation"
+
+
+def broadcast_invalidation(db: Session, key: str):
+    """
+    Queues a notification that drops `key` from the cache of every worker once the
+    current transaction of `db` commits.
+    """
+    db.execute(text("SELECT pg_notify(:channel, :key)"), {"channel": CHANNEL, "key": key})
+
+
+async def broadcast_invalidation_async(db: AsyncSession, key: str):
+    """
+    The `AsyncSession` version of `broadcast_invalidation`.
+    """
+    await db.run_sync(broadcast_invalidation, key)
+
+
+class InvalidationListener:
+    """
+    Listens for invalidations on its own database connection, in a daemon thread, and
+    applies them to `cache`. The connection is re-opened if it is lost, in which case
+    the whole cache is cleared, as notifications sent meanwhile were missed.
+
+    Attributes:
+        dsn (str): The database to listen on.
+        cache (CacheBackend): The cache of this worker process.
+    """
+
+    def __init__(self, dsn: str, cache: CacheBackend, poll_interval: float = 1.0):
+        self.dsn = dsn
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+        self._listening = threading.Event()
+        self._thread: threading.Thread | None = None
+        # Written to by `stop` to wake the thread up without waiting for `poll_interval`.
+        self._wakeup_reader, self._wakeup_writer = -1, -1
+
+    def start(self):
+        """
+        Starts listening, returning once the listener is connected or has failed to connect.
+        """
+        self._stopped.clear()
+        self._wakeup_reader, self._wakeup_writer = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="footprint-cache-invalidation", daemon=True)
+        self._thread.start()
+        self._listening.wait(timeout=5)
+
+    def stop(self):
+        """
+        Stops listening and waits for the thread to exit.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            os.write(self._wakeup_writer, b"\0")
+            self._thread.join()
+            self._thread = None
+            os.close(self._wakeup_reader)
+            os.close(self._wakeup_writer)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error as e:
+                logger.warning("Footprint cache invalidation listener lost its connection: {error}", error=str(e))
+                self._listening.set()
+                self.cache.clear()
+                self._stopped.wait(self.poll_interval)
+
+    def _listen(self):
+        connection = psycopg2.connect(self.dsn)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            self._listening.set()
+            while not self._stopped.is_set():
+                readable, _, _ = select.select([connection, self._wakeup_reader], [], [], self.poll_interval)
+                if connection not in readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self.cache.invalidate(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
@@ -0,0 +1,198 @@
+"""
+This module compiles the `$filter` parameter of the footprint list, see PACT Tech Specs
+V2.2 § api-action-list-filtering, into a SQLAlchemy WHERE clause on the
+`productfootprint` table.
+
+The supported subset of OData v4 is the comparison of a filterable property with a
+string literal, `any` over the product or company ids, `and`, and parentheses:
+
+    created ge '2023-01-01T00:00:00.000Z' and pcf/geographyCountry eq 'DE'
+    productIds/any(productId:(productId eq 'urn:gtin:4712345060507'))
+
+Every property maps to an indexed column. The carbon footprint properties compile to
+an EXISTS on the carbon footprint, and `any` to array containment, so a filter never
+needs a join or a scan of the footprints that it leaves out. Anything else, e.g. `or`,
+`not` or another property, is rejected with a `ValueError` before the database is
+queried.
+"""
+
+import re
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from pydantic import AwareDatetime, TypeAdapter
+from sqlalchemy import and_, exists
+from sqlalchemy.sql.elements import ColumnElement
+
+from db.models.carbon_footprint import CarbonFootprintModel
+from db.models.product_footprint import ProductFootprint as ProductFootprintModel
+from db.repository.product_footprints import with_company_id, with_product_id
+
+
+# Filters are parsed before anything else, this bounds the work a request can ask for.
+MAX_FILTER_LENGTH = 2048
+# Each level of parentheses takes two frames of the recursive descent parser.
+MAX_FILTER_DEPTH = 32
+
+_OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "lt": lambda column, value: column < value,
+    "le": lambda column, value: column <= value,
+    "gt": lambda column, value: column > value,
+    "ge": lambda column, value: column >= value,
+}
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<string>'(?:[^']|'')*')|(?P<name>[A-Za-z_][A-Za-z0-9_]*(?:/[A-Za-z_][A-Za-z0-9_]*)*)|(?P<punctuation>[():]))"
+)
+
+
+# `datetime.fromisoformat` only accepts a trailing "Z", as the PACT timestamps have, from
+# Python 3.11 on. A `ValidationError` is a `ValueError`.
+_aware_datetime = TypeAdapter(AwareDatetime)
+
+
+def _timestamp(value: str) -> datetime:
+    return _aware_datetime.validate_python(value)
+
+
+class _Property(NamedTuple):
+    column: ColumnElement
+    convert: Callable[[str], object]
+    carbon_footprint: bool = False
+
+
+_PROPERTIES = {
+    "created": _Property(ProductFootprintModel.created, _timestamp),
+    "updated": _Property(ProductFootprintModel.updated, _timestamp),
+    "productCategoryCpc": _Property(ProductFootprintModel.productCategoryCpc, str),
+    "pcf/geographyCountry": _Property(CarbonFootprintModel.geography_country, str, carbon_footprint=True),
+    "pcf/referencePeriodStart": _Property(CarbonFootprintModel.reference_period_start, _timestamp, carbon_footprint=True),
+    "pcf/referencePeriodEnd": _Property(CarbonFootprintModel.reference_period_end, _timestamp, carbon_footprint=True),
+}
+
+_COLLECTIONS = {
+    "productIds/any": with_product_id,
+    "companyIds/any": with_company_id,
+}
+
+
+def _tokenize(expression: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError(f"Unexpected character at position {position} of the filter")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = value[1:-1].replace("''", "'")
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    A recursive descent parser of the supported subset, which compiles each term as it
+    is parsed.
+    """
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, kind: str, value: str | None = None) -> str:
+        token = self.peek()
+        if token is None or token[0] != kind or (value is not None and token[1] != value):
+            expected = repr(value) if value is not None else f"a {kind}"
+            found = repr(token[1]) if token is not None else "the end of the filter"
+            raise ValueError(f"Expected {expected} but found {found}")
+        self.position += 1
+        return token[1]
+
+    def parse(self) -> ColumnElement:
+        clause = self.conjunction()
+        if self.peek() is not None:
+            raise ValueError(f"Unsupported filter expression at {self.peek()[1]!r}")
+        return clause
+
+    def conjunction(self) -> ColumnElement:
+        clauses = [self.term()]
+        while self.peek() == ("name", "and"):
+            self.position += 1
+            clauses.append(self.term())
+        return and_(*clauses) if len(clauses) > 1 else clauses[0]
+
+    def term(self) -> ColumnElement:
+        if self.peek() == ("punctuation", "("):
+            self.position += 1
+            self.depth += 1
+            if self.depth > MAX_FILTER_DEPTH:
+                raise ValueError(f"The filter is nested more than {MAX_FILTER_DEPTH} levels deep")
+            clause = self.conjunction()
+            self.take("punctuation", ")")
+            self.depth -= 1
+            return clause
+
+        name = self.take("name")
+        if name in _COLLECTIONS:
+            return _COLLECTIONS[name](self.any())
+        if name not in _PROPERTIES:
+            raise ValueError(f"Filtering on {name!r} is not supported")
+        operator = self.take("name")
+        if operator not in _OPERATORS:
+            raise ValueError(f"The operator {operator!r} is not supported")
+        prop = _PROPERTIES[name]
+        clause = _OPERATORS[operator](prop.column, prop.convert(self.take("string")))
+        if prop.carbon_footprint:
+            # Only correlated to the footprint, as some queries also join the carbon footprint.
+            return (
+                exists()
+                .where(CarbonFootprintModel.product_footprint_pk == ProductFootprintModel.pk, clause)
+                .correlate(ProductFootprintModel)
+            )
+        return clause
+
+    def any(self) -> str:
+        # collection/any(variable:(variable eq 'value')), with the inner parentheses optional.
+        self.take("punctuation", "(")
+        variable = self.take("name")
+        self.take("punctuation", ":")
+        parenthesised = self.peek() == ("punctuation", "(")
+        if parenthesised:
+            self.position += 1
+        self.take("name", variable)
+        self.take("name", "eq")
+        value = self.take("string")
+        if parenthesised:
+            self.take("punctuation", ")")
+        self.take("punctuation", ")")
+        return value
+
+
+def parse_footprint_filter(expression: str | None) -> ColumnElement | None:
+    """
+    Compiles a `$filter` expression into a WHERE clause on `productfootprint`.
+
+    Args:
+        expression (str | None): The `$filter` query parameter, if given.
+
+    Returns:
+        ColumnElement | None: The clause, or None if there is no filter.
+
+    Raises:
+        ValueError: If the expression is malformed, too long or too deeply nested, or uses
+            anything that is not supported.
+    """
+    if expression is None or not expression.strip():
+        return None
+    if len(expression) > MAX_FILTER_LENGTH:
+        raise ValueError(f"The filter is longer than {MAX_FILTER_LENGTH} characters")
+    return _Parser(_tokenize(expression)).parse()
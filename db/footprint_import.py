@@ -0,0 +1,381 @@
+"""
+This module loads large sets of PACT footprints straight into the database, for the
+initial onboarding of a tenant, see `import_footprints.py` for the command line.
+
+An import runs in three steps:
+
+    1. Validate: the footprints are read from NDJSON or JSON files and validated
+       against the `ProductFootprint` schema in a pool of worker processes, which also
+       render each valid footprint as rows of Postgres COPY text.
+    2. Stage: the rows are streamed with COPY into temporary staging tables, shaped
+       like the target tables but linked by the position of each footprint in the
+       import rather than by primary keys, which do not exist yet.
+    3. Merge: one INSERT ... SELECT per table moves the staged rows into the target
+       tables, skipping ids that are already stored or repeated in the import, and
+       the documents of the new footprints are rendered.
+
+All of it runs in one transaction, so an import that fails leaves nothing behind.
+"""
+
+import io
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import JSON, select, table, text
+from sqlalchemy.engine import Engine
+
+from db.bulk_insert import _json_default, bind_processors
+from db.models.carbon_footprint import (
+    CarbonFootprintModel, EmissionFactorDatasetModel, ProductOrSectorSpecificRuleModel
+)
+from db.models.product_footprint import ProductFootprint as ProductFootprintModel
+from db.pact_json import update_documents
+from db.repository.product_footprints import (
+    _carbon_footprint_values, _emission_factor_dataset_values, _insertable_columns, _product_footprint_values,
+    _product_or_sector_specific_rule_values
+)
+from schemas.product_footprint import ProductFootprint as ProductFootprintSchema
+
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+JSON_SUFFIXES = {".json"}
+
+
+@dataclass
+class _StagingTable:
+    """
+    A temporary table that the rows of `target` are staged in, with the columns of
+    `target` that an import provides, followed by the columns that link the rows.
+    """
+    name: str
+    target: Any
+    columns: list[str]
+    links: list[str]
+
+    def __post_init__(self):
+        self.json_columns = {name for name in self.columns if isinstance(self.target.c[name].type, JSON)}
+        self.processors = bind_processors(self.target, self.columns)
+
+    def create_sql(self) -> str:
+        columns = ", ".join([f'"{name}"' for name in self.columns] + [f"NULL::integer AS {name}" for name in self.links])
+        return f"CREATE TEMPORARY TABLE {self.name} ON COMMIT DROP AS SELECT {columns} FROM {self.target.name} WITH NO DATA"
+
+    def copy_sql(self) -> str:
+        columns = ", ".join([f'"{name}"' for name in self.columns] + self.links)
+        return f"COPY {self.name} ({columns}) FROM STDIN"
+
+    def copy_line(self, values: dict, *links: int) -> str:
+        fields = []
+        for name in self.columns:
+            value = values.get(name)
+            if name in self.json_columns:
+                # The ORM writes None to a JSON column as a JSON null, not SQL NULL.
+                value = json.dumps(value, default=_json_default)
+            elif value is not None and name in self.processors:
+                value = self.processors[name](value)
+            fields.append(_copy_field(value))
+        fields.extend(str(link) for link in links)
+        return "\t".join(fields) + "\n"
+
+
+def _staged_columns(model, parent_pk: str | None = None) -> list[str]:
+    # The primary key of the parent row is only known once the parent is merged.
+    return [name for name in _insertable_columns(model) if name != parent_pk]
+
+
+_PRODUCT_FOOTPRINTS = _StagingTable(
+    "import_productfootprint", ProductFootprintModel.__table__, _staged_columns(ProductFootprintModel), ["seq"]
+)
+_CARBON_FOOTPRINTS = _StagingTable(
+    "import_carbonfootprint", CarbonFootprintModel.__table__,
+    _staged_columns(CarbonFootprintModel, "product_footprint_pk"), ["seq"],
+)
+_RULES = _StagingTable(
+    "import_productorsectorspecificrule", ProductOrSectorSpecificRuleModel.__table__,
+    _staged_columns(ProductOrSectorSpecificRuleModel, "carbon_footprint_pk"), ["seq", "ordinal"],
+)
+_EMISSION_FACTOR_DATASETS = _StagingTable(
+    "import_emissionfactordataset", EmissionFactorDatasetModel.__table__,
+    _staged_columns(EmissionFactorDatasetModel, "carbon_footprint_pk"), ["seq", "ordinal"],
+)
+_STAGING_TABLES = [_PRODUCT_FOOTPRINTS, _CARBON_FOOTPRINTS, _RULES, _EMISSION_FACTOR_DATASETS]
+
+
+def _escape_copy_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _array_literal(values: list) -> str:
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        else:
+            elements.append('"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(elements) + "}"
+
+
+def _copy_field(value: Any) -> str:
+    """
+    Renders a value as a field of the COPY text format.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return _escape_copy_text(_array_literal(value))
+    return _escape_copy_text(str(value))
+
+
+@dataclass
+class ValidatedChunk:
+    """
+    The result of validating a chunk of an import in a worker process.
+
+    Attributes:
+        copy_text (dict[str, str]): The COPY text of the valid footprints, per staging table.
+        valid (int): The number of valid footprints.
+        errors (list[dict]): The source and validation errors of each invalid footprint.
+    """
+    copy_text: dict[str, str] = field(default_factory=dict)
+    valid: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+
+def validate_chunk(items: list[tuple[int, str, str | dict]]) -> ValidatedChunk:
+    """
+    Validates a chunk of footprints, and renders the valid ones as staging rows. Runs
+    in the worker processes.
+
+    Args:
+        items (list[tuple[int, str, str | dict]]): The position of each footprint in the
+            import, where it was read from, and its JSON text or parsed JSON.
+    """
+    buffers = {staging_table.name: io.StringIO() for staging_table in _STAGING_TABLES}
+    chunk = ValidatedChunk()
+    for seq, source, item in items:
+        try:
+            if isinstance(item, str):
+                product_footprint = ProductFootprintSchema.model_validate_json(item)
+            else:
+                product_footprint = ProductFootprintSchema.model_validate(item)
+        except ValidationError as e:
+            errors = [{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()]
+            chunk.errors.append({"source": source, "errors": errors})
+            continue
+
+        chunk.valid += 1
+        pcf = product_footprint.pcf
+        buffers[_PRODUCT_FOOTPRINTS.name].write(
+            _PRODUCT_FOOTPRINTS.copy_line(_product_footprint_values(product_footprint), seq)
+        )
+        buffers[_CARBON_FOOTPRINTS.name].write(_CARBON_FOOTPRINTS.copy_line(_carbon_footprint_values(pcf), seq))
+        for ordinal, rule in enumerate(pcf.productOrSectorSpecificRules):
+            buffers[_RULES.name].write(_RULES.copy_line(_product_or_sector_specific_rule_values(rule), seq, ordinal))
+        for ordinal, dataset in enumerate(pcf.secondaryEmissionFactorSources):
+            buffers[_EMISSION_FACTOR_DATASETS.name].write(
+                _EMISSION_FACTOR_DATASETS.copy_line(_emission_factor_dataset_values(dataset), seq, ordinal)
+            )
+
+    chunk.copy_text = {name: buffer.getvalue() for name, buffer in buffers.items()}
+    return chunk
+
+
+def read_footprints(path: Path) -> Iterator[tuple[str, str | dict]]:
+    """
+    Reads the footprints in an NDJSON or JSON file, or in the files of a directory and
+    its subdirectories, in name order. A JSON file holds one footprint or an array of them.
+
+    Yields:
+        tuple[str, str | dict]: Where each footprint was read from, and its JSON text
+            from an NDJSON file or its parsed JSON from a JSON file.
+    """
+    if path.is_dir():
+        files = sorted(
+            file for file in path.rglob("*")
+            if file.is_file() and file.suffix.lower() in NDJSON_SUFFIXES | JSON_SUFFIXES
+        )
+    else:
+        files = [path]
+
+    for file in files:
+        if file.suffix.lower() in JSON_SUFFIXES:
+            with open(file, encoding="utf-8") as f:
+                document = json.load(f)
+            items = document if isinstance(document, list) else [document]
+            for index, item in enumerate(items):
+                yield f"{file}[{index}]", item
+        else:
+            with open(file, encoding="utf-8") as f:
+                for number, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield f"{file}:{number}", line
+
+
+def _chunks(items: Iterator[tuple[str, str | dict]], size: int) -> Iterator[list[tuple[int, str, str | dict]]]:
+    chunk = []
+    for seq, (source, item) in enumerate(items):
+        chunk.append((seq, source, item))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validated_chunks(path: Path, workers: int, chunk_size: int) -> Iterator[ValidatedChunk]:
+    """
+    Validates the footprints under `path` in `workers` processes, yielding the chunks in
+    order. Only a few chunks per worker are in flight at a time, so memory use does not
+    grow with the size of the import.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: deque[Future] = deque()
+        for chunk in _chunks(read_footprints(path), chunk_size):
+            in_flight.append(executor.submit(validate_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+@dataclass
+class ImportReport:
+    """
+    The outcome of an import.
+
+    Attributes:
+        read (int): The number of footprints read.
+        imported (int): The number of footprints inserted.
+        duplicates (int): The number of valid footprints skipped, as their id was already
+            stored or came earlier in the import.
+        errors (list[dict]): The source and validation errors of each invalid footprint.
+    """
+    read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+
+_MERGE_SQL = [
+    # Each statement records the primary keys it assigned against `seq`, for the next.
+    "CREATE TEMPORARY TABLE import_productfootprint_pk (pk integer, seq integer) ON COMMIT DROP",
+    "CREATE TEMPORARY TABLE import_carbonfootprint_pk (pk integer, seq integer) ON COMMIT DROP",
+    """
+    WITH chosen AS (
+        SELECT DISTINCT ON (id) * FROM import_productfootprint ORDER BY id, seq
+    ), inserted AS (
+        INSERT INTO productfootprint ({product_footprint_columns})
+        SELECT {product_footprint_columns} FROM chosen ORDER BY seq
+        ON CONFLICT (id) DO NOTHING
+        RETURNING pk, id
+    )
+    INSERT INTO import_productfootprint_pk (pk, seq)
+    SELECT inserted.pk, chosen.seq FROM inserted JOIN chosen USING (id)
+    """,
+    """
+    WITH inserted AS (
+        INSERT INTO carbonfootprint ({carbon_footprint_columns}, product_footprint_pk)
+        SELECT {carbon_footprint_columns}, footprint.pk
+        FROM import_carbonfootprint JOIN import_productfootprint_pk AS footprint USING (seq)
+        ORDER BY seq
+        RETURNING pk, product_footprint_pk
+    )
+    INSERT INTO import_carbonfootprint_pk (pk, seq)
+    SELECT inserted.pk, footprint.seq
+    FROM inserted JOIN import_productfootprint_pk AS footprint ON footprint.pk = inserted.product_footprint_pk
+    """,
+    # Rules and datasets are read back in primary key order, so they are inserted in order.
+    """
+    INSERT INTO productorsectorspecificrule ({rule_columns}, carbon_footprint_pk)
+    SELECT {rule_columns}, carbon_footprint.pk
+    FROM import_productorsectorspecificrule JOIN import_carbonfootprint_pk AS carbon_footprint USING (seq)
+    ORDER BY seq, ordinal
+    """,
+    """
+    INSERT INTO emissionfactordataset ({emission_factor_dataset_columns}, carbon_footprint_pk)
+    SELECT {emission_factor_dataset_columns}, carbon_footprint.pk
+    FROM import_emissionfactordataset JOIN import_carbonfootprint_pk AS carbon_footprint USING (seq)
+    ORDER BY seq, ordinal
+    """,
+]
+
+
+def _merge_sql() -> list[str]:
+    def columns(staging_table: _StagingTable) -> str:
+        return ", ".join(f'"{name}"' for name in staging_table.columns)
+
+    return [
+        statement.format(
+            product_footprint_columns=columns(_PRODUCT_FOOTPRINTS),
+            carbon_footprint_columns=columns(_CARBON_FOOTPRINTS),
+            rule_columns=columns(_RULES),
+            emission_factor_dataset_columns=columns(_EMISSION_FACTOR_DATASETS),
+        )
+        for statement in _MERGE_SQL
+    ]
+
+
+def import_footprints(
+    path: Path,
+    engine: Engine,
+    workers: int | None = None,
+    chunk_size: int = 1000,
+    dry_run: bool = False,
+) -> ImportReport:
+    """
+    Imports the footprints under `path`, see the module docstring.
+
+    Args:
+        path (Path): An NDJSON or JSON file, or a directory of them.
+        engine (Engine): The psycopg2 engine of the database to import into.
+        workers (int | None): The number of validation processes. Defaults to the
+            number of CPUs.
+        chunk_size (int): The number of footprints validated, and copied, at a time.
+        dry_run (bool): If True, validates, stages and merges, then rolls back.
+
+    Returns:
+        ImportReport: The numbers of footprints read, imported and skipped, and the
+            validation errors.
+    """
+    report = ImportReport()
+    valid = 0
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            cursor = connection.connection.cursor()
+            for staging_table in _STAGING_TABLES:
+                cursor.execute(staging_table.create_sql())
+
+            for chunk in _validated_chunks(path, workers or os.cpu_count() or 1, chunk_size):
+                report.read += chunk.valid + len(chunk.errors)
+                report.errors.extend(chunk.errors)
+                valid += chunk.valid
+                for staging_table in _STAGING_TABLES:
+                    if chunk.copy_text[staging_table.name]:
+                        cursor.copy_expert(staging_table.copy_sql(), io.StringIO(chunk.copy_text[staging_table.name]))
+
+            for statement in _merge_sql():
+                cursor.execute(statement)
+            imported = select(text("pk")).select_from(table("import_productfootprint_pk"))
+            connection.execute(update_documents(ProductFootprintModel.pk.in_(imported)))
+            report.imported = connection.execute(text("SELECT count(*) FROM import_productfootprint_pk")).scalar_one()
+            report.duplicates = valid - report.imported
+        except BaseException:
+            transaction.rollback()
+            raise
+        if dry_run:
+            transaction.rollback()
+        else:
+            transaction.commit()
+    return report
@@ -0,0 +1,148 @@
+"""
+This module maps ORM rows onto the PACT Pydantic schemas.
+
+The mapping between ORM attributes and schema fields is worked out once, at import
+time, by matching names case and underscore insensitively (`pcf_excluding_biogenic`
+matches `pCfExcludingBiogenic`), rather than being written out by hand per route.
+"""
+
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+
+from db.models.carbon_footprint import CarbonFootprintModel, EmissionFactorDatasetModel, ProductOrSectorSpecificRuleModel
+from db.models.product_footprint import ProductFootprint as ProductFootprintModel
+from schemas.carbon_footprint import CarbonFootprint, EmissionFactorDS, ProductOrSectorSpecificRule
+from schemas.product_footprint import ProductFootprint
+
+
+def _normalise(name: str) -> str:
+    return name.replace("_", "").lower()
+
+
+class ModelMapper:
+    """
+    Converts instances of an ORM model into instances of a Pydantic schema.
+
+    Attributes:
+        model (type): The SQLAlchemy model that is read from.
+        schema (type[BaseModel]): The Pydantic schema that is built.
+        fields (list[tuple]): The compiled `(field_name, attribute_name, nested_mapper, converter)`
+            entries, one per schema field that has a matching ORM attribute.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        schema: type[BaseModel],
+        nested: dict[str, "ModelMapper"] | None = None,
+        renames: dict[str, str] | None = None,
+    ):
+        """
+        Args:
+            model (type): The SQLAlchemy model to read from.
+            schema (type[BaseModel]): The Pydantic schema to build.
+            nested (dict[str, ModelMapper] | None): Mappers for relationship fields, keyed by schema field name.
+            renames (dict[str, str] | None): Explicit schema field to ORM attribute names, for fields
+                whose names do not match, e.g. `pcf` and `carbon_footprint`.
+        """
+        self.model = model
+        self.schema = schema
+        nested = nested or {}
+        renames = renames or {}
+
+        mapper = inspect(model)
+        attributes = {_normalise(attribute.key): attribute.key for attribute in mapper.attrs}
+
+        self.fields: list[tuple[str, str, "ModelMapper | None", Any]] = []
+        for field_name, field_info in schema.model_fields.items():
+            attribute_name = renames.get(field_name) or attributes.get(_normalise(field_name))
+            if attribute_name is None:
+                continue
+            converter = UUID if field_info.annotation is UUID else None
+            self.fields.append((field_name, attribute_name, nested.get(field_name), converter))
+
+    def to_dict(self, instance: Any) -> dict[str, Any]:
+        """
+        Reads the mapped attributes of an ORM instance into a dict of schema field values.
+
+        Args:
+            instance: The ORM instance to read.
+
+        Returns:
+            dict[str, Any]: The field values, with nested relationships as dicts too.
+        """
+        values = {}
+        for field_name, attribute_name, nested_mapper, _ in self.fields:
+            value = getattr(instance, attribute_name)
+            if nested_mapper is not None and value is not None:
+                if isinstance(value, list):
+                    value = [nested_mapper.to_dict(item) for item in value]
+                else:
+                    value = nested_mapper.to_dict(value)
+            values[field_name] = value
+        return values
+
+    def to_schema(self, instance: Any, trusted: bool = False) -> BaseModel:
+        """
+        Builds a schema instance from an ORM instance.
+
+        Args:
+            instance: The ORM instance to convert.
+            trusted (bool): When True the schema is built with `model_construct` and no
+                validation is run. Only use this for rows read back from our own database,
+                which were validated on the way in.
+
+        Returns:
+            BaseModel: The schema instance.
+        """
+        if not trusted:
+            return self.schema.model_validate(self.to_dict(instance))
+
+        values = {}
+        for field_name, attribute_name, nested_mapper, converter in self.fields:
+            value = getattr(instance, attribute_name)
+            if value is not None:
+                if nested_mapper is not None:
+                    if isinstance(value, list):
+                        value = [nested_mapper.to_schema(item, trusted=True) for item in value]
+                    else:
+                        value = nested_mapper.to_schema(value, trusted=True)
+                elif converter is not None and not isinstance(value, converter):
+                    value = converter(value)
+            values[field_name] = value
+        return self.schema.model_construct(**values)
+
+
+product_footprint_mapper = ModelMapper(
+    ProductFootprintModel,
+    ProductFootprint,
+    nested={
+        "pcf": ModelMapper(
+            CarbonFootprintModel,
+            CarbonFootprint,
+            nested={
+                "productOrSectorSpecificRules": ModelMapper(ProductOrSectorSpecificRuleModel, ProductOrSectorSpecificRule),
+                "secondaryEmissionFactorSources": ModelMapper(EmissionFactorDatasetModel, EmissionFactorDS),
+            },
+        ),
+    },
+    renames={"pcf": "carbon_footprint"},
+)
+
+
+def to_product_footprint_schema(product_footprint: ProductFootprintModel, trusted: bool = True) -> ProductFootprint:
+    """
+    Converts a product footprint row, with its carbon footprint, into a `ProductFootprint` schema.
+
+    Args:
+        product_footprint (ProductFootprintModel): The ORM row to convert.
+        trusted (bool): Skip validation, see `ModelMapper.to_schema`. Defaults to True as
+            footprints are validated on ingest.
+
+    Returns:
+        ProductFootprint: The PACT product footprint.
+    """
+    return product_footprint_mapper.to_schema(product_footprint, trusted=trusted)
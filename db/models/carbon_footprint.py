@@ -16,7 +16,7 @@ class ProductOrSectorSpecificRuleModel(Base):
     rule_names = Column(ARRAY(String), nullable=False)
     other_operator_name = Column(String, nullable=True)
 
-    carbon_footprint_pk = Column(Integer, ForeignKey('carbonfootprint.pk'))
+    carbon_footprint_pk = Column(Integer, ForeignKey('carbonfootprint.pk'), index=True)
     carbon_footprint = relationship(
         "CarbonFootprintModel", back_populates="product_or_sector_specific_rules", uselist=True
     )
@@ -29,7 +29,7 @@ class EmissionFactorDatasetModel(Base):
     name = Column(String, nullable=False)
     version = Column(String, nullable=False)
 
-    carbon_footprint_pk = Column(Integer, ForeignKey('carbonfootprint.pk'))
+    carbon_footprint_pk = Column(Integer, ForeignKey('carbonfootprint.pk'), index=True)
     carbon_footprint = relationship(
         "CarbonFootprintModel", back_populates="secondary_emission_factor_sources", uselist=True
     )
@@ -55,10 +55,10 @@ class CarbonFootprintModel(Base):
     cross_sectoral_standards_used = Column(ARRAY(Enum(CrossSectoralStandard)), nullable=False)
     biogenic_accounting_methodology = Column(Enum(BiogenicAccountingMethodology))
     boundary_processes_description = Column(String, nullable=False)
-    reference_period_start = Column(DateTime(timezone=True), nullable=False)
-    reference_period_end = Column(DateTime(timezone=True), nullable=False)
+    reference_period_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    reference_period_end = Column(DateTime(timezone=True), nullable=False, index=True)
     geography_country_subdivision = Column(String)
-    geography_country = Column(String(2))
+    geography_country = Column(String(2), index=True)
     geography_region_or_subregion = Column(Enum(RegionOrSubregion))
     exempted_emissions_percent = Column(Float, CheckConstraint('exempted_emissions_percent BETWEEN 0 and 5'))
     exempted_emissions_description = Column(String, nullable=False)
@@ -69,12 +69,14 @@ class CarbonFootprintModel(Base):
     primary_data_share = Column(Float)
     dqi = Column(JSONB)
     assurance = Column(JSONB)
-    product_footprint_pk = Column(Integer, ForeignKey('productfootprint.pk'), comment="The carbon footprint of the given product.")
+    product_footprint_pk = Column(Integer, ForeignKey('productfootprint.pk'), index=True, comment="The carbon footprint of the given product.")
     product_footprint = relationship(
         "ProductFootprint", back_populates="carbon_footprint")
     product_or_sector_specific_rules = relationship(
-        "ProductOrSectorSpecificRuleModel", back_populates="carbon_footprint"
+        "ProductOrSectorSpecificRuleModel", back_populates="carbon_footprint",
+        order_by="ProductOrSectorSpecificRuleModel.pk"
     )
     secondary_emission_factor_sources = relationship(
-        "EmissionFactorDatasetModel", back_populates="carbon_footprint"
+        "EmissionFactorDatasetModel", back_populates="carbon_footprint",
+        order_by="EmissionFactorDatasetModel.pk"
     )
@@ -1,12 +1,30 @@
-from sqlalchemy import Column, Integer, String, JSON, Enum, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import JSONB, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, JSON, Enum, ForeignKey, DateTime, LargeBinary, Index, Computed
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from db.base_class import Base
 from schemas.product_footprint import ProductFootprintStatus
 
 
+# The text search configuration of `ProductFootprint.search_vector`, queries have to use the same one.
+SEARCH_CONFIGURATION = "english"
+# Matches in the product name rank above those in the description, which rank above the comment.
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIGURATION}', coalesce(\"productNameCompany\", '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIGURATION}', coalesce(\"productDescription\", '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIGURATION}', coalesce(comment, '')), 'C')"
+)
+
+
 class ProductFootprint(Base):
+    # GIN indexes serve array containment, e.g. every footprint of a product or company.
+    __table_args__ = (
+        Index("ix_productfootprint_precedingPfIds", "precedingPfIds", postgresql_using="gin"),
+        Index("ix_productfootprint_companyIds", "companyIds", postgresql_using="gin"),
+        Index("ix_productfootprint_productIds", "productIds", postgresql_using="gin"),
+        Index("ix_productfootprint_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     pk = Column(Integer, primary_key=True, autoincrement=True)
     id = Column(String, index=True, unique=True, comment="The product footprint identifier.")
     # TODO: precedingPfIds needs to be improved in order to link to prior
@@ -14,8 +32,8 @@ class ProductFootprint(Base):
     precedingPfIds = Column(ARRAY(String), comment="non-empty set of preceding product footprint identifiers without duplicates.")
     specVersion = Column(String, comment="The version of the ProductFootprint data specification.")
     version = Column(Integer, comment="The version of the ProductFootprint.")
-    created = Column(DateTime(timezone=True), comment="The timestamp of the creation of the ProductFootprint.")
-    updated = Column(DateTime(timezone=True), nullable=True, comment="The timestamp of the ProductFootprint update.")
+    created = Column(DateTime(timezone=True), index=True, comment="The timestamp of the creation of the ProductFootprint.")
+    updated = Column(DateTime(timezone=True), nullable=True, index=True, comment="The timestamp of the ProductFootprint update.")
     status = Column(Enum(ProductFootprintStatus), comment="The status of the product footprint.")
     statusComment = Column(String, comment="If defined, the value should be a message explaining the reason for the current status.")
     validityPeriodStart = Column(DateTime(timezone=True), nullable=True, comment="If defined, the start of the validity period of the ProductFootprint.")
@@ -24,8 +42,12 @@ class ProductFootprint(Base):
     companyIds = Column(ARRAY(String), comment="The set of Uniform Resource Names (URN) identifying the ProductFootprint Data Owner.")
     productDescription = Column(String, comment="The free-form description of the product.")
     productIds = Column(ARRAY(String), comment="The set of ProductIds that uniquely identify the product.")
-    productCategoryCpc = Column(String, comment="A UN Product Classification Code (CPC) that the given product belongs to.")
+    productCategoryCpc = Column(String, index=True, comment="A UN Product Classification Code (CPC) that the given product belongs to.")
     productNameCompany = Column(String, comment="The trade name of the product.")
     comment = Column(String, comment="Additional information related to the product footprint.", nullable=False)
     carbon_footprint = relationship("CarbonFootprintModel", back_populates="product_footprint", uselist=False, cascade="all, delete-orphan")
     extensions = Column(JSONB, comment="If defined, 1 or more data model extensions associated with the ProductFootprint.")
+    # Deferred so that ORM reads, which rebuild the document themselves, do not pay to load it.
+    document = deferred(Column(LargeBinary, nullable=True, comment="The canonical PACT JSON of the ProductFootprint, written on ingest."))
+    # Generated by Postgres from the text fields, and only ever read by full-text searches.
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), comment="The full-text search vector of the product name, description and comment."))
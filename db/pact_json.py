@@ -0,0 +1,200 @@
+"""
+This module has Postgres build the PACT JSON document of a product footprint.
+
+The SQL expression is compiled once, at import time, from the field mapping in
+`db.mapper`, and renders every value exactly as Pydantic would serialise the
+`ProductFootprint` schema: compact separators, schema field order, enum values rather
+than names, floats in the shortest round trip form with a trailing `.0` for whole
+numbers, and timestamps in UTC with a `Z` suffix. Timestamps are rendered in UTC
+whatever the `TimeZone` of the session, as the engines in `db.session` read them. This
+lets the routes return the bytes produced by the database without building ORM objects
+or Pydantic models.
+
+A handful of helper functions are needed in the database for this, they are created
+alongside the tables by `Base.metadata.create_all` and by the Alembic migrations.
+"""
+
+import json
+from enum import Enum as PyEnum
+
+from sqlalchemy import DDL, Boolean, DateTime, Enum, Float, Integer, String, Text, event, func, literal_column, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.sql.dml import Update
+from sqlalchemy.sql.elements import ColumnElement
+
+from db.base_class import Base
+from db.mapper import ModelMapper, product_footprint_mapper
+from db.models.carbon_footprint import CarbonFootprintModel
+from db.models.product_footprint import ProductFootprint as ProductFootprintModel
+
+
+CREATE_FUNCTIONS_SQL = r"""
+CREATE OR REPLACE FUNCTION pact_json_float(value double precision) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT AS $$
+    SELECT CASE
+        WHEN value = 0 THEN CASE WHEN value::text = '-0' THEN '-0.0' ELSE '0.0' END
+        WHEN abs(value) >= 1e-5 AND abs(value) < 1e16 THEN
+            CASE WHEN position('.' IN value::text::numeric::text) = 0
+                THEN value::text::numeric::text || '.0'
+                ELSE value::text::numeric::text
+            END
+        ELSE regexp_replace(value::text, 'e\+?(-?)0*', 'e\1')
+    END
+$$;
+
+CREATE OR REPLACE FUNCTION pact_json_timestamp(value timestamptz, zulu boolean) RETURNS text
+LANGUAGE sql STABLE STRICT AS $$
+    SELECT '"' || to_char(value AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS')
+        || CASE WHEN to_char(value AT TIME ZONE 'UTC', 'US') = '000000' THEN '' ELSE '.' || to_char(value AT TIME ZONE 'UTC', 'US') END
+        || CASE WHEN zulu THEN 'Z' ELSE '+00:00' END
+        || '"'
+$$;
+
+CREATE OR REPLACE FUNCTION pact_json_compact(value jsonb) RETURNS text
+LANGUAGE plpgsql IMMUTABLE STRICT AS $$
+BEGIN
+    CASE jsonb_typeof(value)
+        WHEN 'object' THEN
+            RETURN '{' || coalesce((
+                SELECT string_agg(to_json(entry.key)::text || ':' || pact_json_compact(entry.item), ',' ORDER BY entry.ordinality)
+                FROM jsonb_each(value) WITH ORDINALITY AS entry(key, item, ordinality)
+            ), '') || '}';
+        WHEN 'array' THEN
+            RETURN '[' || coalesce((
+                SELECT string_agg(pact_json_compact(element.item), ',' ORDER BY element.ordinality)
+                FROM jsonb_array_elements(value) WITH ORDINALITY AS element(item, ordinality)
+            ), '') || ']';
+        WHEN 'number' THEN
+            IF value::text ~ '[.eE]' THEN
+                RETURN pact_json_float(value::text::double precision);
+            END IF;
+            RETURN value::text;
+        ELSE
+            RETURN value::text;
+    END CASE;
+END
+$$;
+"""
+
+DROP_FUNCTIONS_SQL = """
+DROP FUNCTION IF EXISTS pact_json_compact(jsonb);
+DROP FUNCTION IF EXISTS pact_json_timestamp(timestamptz, boolean);
+DROP FUNCTION IF EXISTS pact_json_float(double precision);
+"""
+
+event.listen(Base.metadata, "after_create", DDL(CREATE_FUNCTIONS_SQL))
+event.listen(Base.metadata, "before_drop", DDL(DROP_FUNCTIONS_SQL))
+
+
+_quote = postgresql.dialect().identifier_preparer.quote
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _enum_case(expression: str, enum_class: type[PyEnum]) -> str:
+    whens = " ".join(
+        f"WHEN {_sql_string(member.name)} THEN {_sql_string(json.dumps(member.value, ensure_ascii=False))}"
+        for member in enum_class
+    )
+    return f"CASE {expression}::text {whens} END"
+
+
+def _isoformat_fields(mapper: ModelMapper) -> set[str]:
+    # Fields with a custom serializer, which for our schemas means `datetime.isoformat()`.
+    fields = set()
+    for decorator in mapper.schema.__pydantic_decorators__.field_serializers.values():
+        fields.update(decorator.info.fields)
+    return fields
+
+
+def _value_sql(column, reference: str, isoformat: bool) -> str:
+    column_type = column.type
+    if isinstance(column_type, ARRAY):
+        if isinstance(column_type.item_type, Enum):
+            item = _enum_case("item.value", column_type.item_type.enum_class)
+            return (
+                f"CASE WHEN {reference} IS NULL THEN NULL ELSE '[' || coalesce(("
+                f"SELECT string_agg({item}, ',' ORDER BY item.ordinality) "
+                f"FROM unnest({reference}) WITH ORDINALITY AS item(value, ordinality)"
+                f"), '') || ']' END"
+            )
+        return f"array_to_json({reference})::text"
+    if isinstance(column_type, Enum):
+        return _enum_case(reference, column_type.enum_class)
+    if isinstance(column_type, JSONB):
+        return f"pact_json_compact({reference})"
+    if isinstance(column_type, DateTime):
+        return f"pact_json_timestamp({reference}, {'false' if isoformat else 'true'})"
+    if isinstance(column_type, Float):
+        return f"pact_json_float({reference})"
+    if isinstance(column_type, Boolean):
+        return f"CASE WHEN {reference} THEN 'true' WHEN NOT {reference} THEN 'false' END"
+    if isinstance(column_type, Integer):
+        return f"{reference}::text"
+    if isinstance(column_type, String):
+        return f"to_json({reference})::text"
+    raise TypeError(f"No JSON rendering for column type {column_type!r}")
+
+
+def _object_sql(mapper: ModelMapper, table: str) -> str:
+    """
+    Compiles the SQL that renders one row of `mapper.model`, referenced as `table`, as
+    the JSON object for `mapper.schema`.
+    """
+    model_mapper = mapper.model.__mapper__
+    isoformat_fields = _isoformat_fields(mapper)
+    parts = []
+    for field_name, attribute_name, nested_mapper, _ in mapper.fields:
+        if nested_mapper is None:
+            column = model_mapper.columns[attribute_name]
+            reference = f"{table}.{_quote(column.name)}"
+            value = _value_sql(column, reference, isoformat=field_name in isoformat_fields)
+        else:
+            relationship = model_mapper.relationships[attribute_name]
+            child_table = relationship.mapper.local_table.name
+            foreign_key = next(iter(relationship.remote_side))
+            if relationship.uselist:
+                value = (
+                    f"'[' || coalesce((SELECT string_agg({_object_sql(nested_mapper, child_table)}, ',' "
+                    f"ORDER BY {child_table}.pk) FROM {child_table} "
+                    f"WHERE {child_table}.{_quote(foreign_key.name)} = {table}.pk), '') || ']'"
+                )
+            else:
+                # One to one children are expected to be joined into the query under their table name.
+                value = f"CASE WHEN {child_table}.pk IS NULL THEN NULL ELSE {_object_sql(nested_mapper, child_table)} END"
+        parts.append(f"{_sql_string(json.dumps(field_name) + ':')} || coalesce({value}, 'null')")
+    return "'{' || " + " || ',' || ".join(parts) + " || '}'"
+
+
+product_footprint_json: ColumnElement = literal_column(
+    _object_sql(product_footprint_mapper, product_footprint_mapper.model.__tablename__), type_=Text
+)
+
+
+def update_documents(whereclause) -> Update:
+    """
+    Builds an UPDATE that renders the PACT JSON of the product footprints matching
+    `whereclause` and stores it, UTF-8 encoded, in their `document` column.
+
+    Args:
+        whereclause: A condition on `ProductFootprintModel` selecting the rows to update.
+
+    Returns:
+        Update: The statement, ready to execute.
+    """
+    rendered = (
+        select(ProductFootprintModel.pk, func.convert_to(product_footprint_json, "UTF8").label("document"))
+        .select_from(ProductFootprintModel)
+        .outerjoin(CarbonFootprintModel, CarbonFootprintModel.product_footprint_pk == ProductFootprintModel.pk)
+        .where(whereclause)
+        .subquery()
+    )
+    return (
+        update(ProductFootprintModel)
+        .where(ProductFootprintModel.pk == rendered.c.pk)
+        .values(document=rendered.c.document)
+        .execution_options(synchronize_session=False)
+    )
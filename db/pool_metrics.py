@@ -0,0 +1,129 @@
+"""
+This module instruments the database connection pools, so that they can be sized
+against the number of workers and threads that share them.
+
+The engines in `db.session` use the pool classes here, which time every checkout,
+including any wait for a connection to be returned to the pool, and count checkouts
+that had to open an overflow connection or timed out. `pool_metrics` reports these
+alongside the current state of the pool, and is served by the internal routes.
+"""
+
+import bisect
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+# The upper bounds, in seconds, of the buckets of the checkout wait histogram.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """
+    Counters for the checkouts of one pool. Thread safe.
+
+    Attributes:
+        checkouts (int): The number of connections checked out.
+        overflows (int): The number of checkouts that opened an overflow connection.
+        timeouts (int): The number of checkouts that timed out waiting for a connection.
+        wait_seconds (float): The total time spent checking connections out.
+        wait_buckets (list[int]): The number of checkouts per bucket of `WAIT_BUCKETS`,
+            with a last bucket for longer waits.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.overflows = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait: float, overflow: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.overflows += overflow
+            self._record_wait(wait)
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self._record_wait(wait)
+
+    def _record_wait(self, wait: float):
+        self.wait_seconds += wait
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, wait)] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the counters, with the wait histogram keyed by the upper bound of each bucket.
+        """
+        with self._lock:
+            histogram = {str(bound): count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)}
+            histogram["+Inf"] = self.wait_buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "overflows": self.overflows,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds,
+                "wait_seconds_histogram": histogram,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """
+    Records the checkouts of a `QueuePool` in its `metrics`, which are kept when the
+    pool is recreated, e.g. by `Engine.dispose`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        overflow = self._overflow
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        # The overflow counter starts at minus the pool size, and passes zero once
+        # connections beyond the pool size are opened.
+        self.metrics.record_checkout(time.perf_counter() - start, overflow=self._overflow > max(overflow, 0))
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_metrics(pool: Pool) -> dict:
+    """
+    Returns the configuration and current state of `pool`, and its checkout metrics if
+    it is instrumented.
+    """
+    metrics = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, _InstrumentedPoolMixin):
+        metrics.update(pool.metrics.stats())
+    return metrics
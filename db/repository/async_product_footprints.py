@@ -0,0 +1,271 @@
+"""
+This module has the async versions of the functions in `db.repository.product_footprints`,
+for use on an `AsyncSession` when `settings.DATABASE_ASYNC` is enabled.
+
+They share the models, eager loading options, caches and invalidation with the sync
+functions, and return the same values. As an `AsyncSession` cannot load relationships
+lazily, the "lazy" loading strategy is not supported here.
+"""
+
+from typing import AsyncIterator
+
+from sqlalchemy import exists, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from core.config import settings
+from db.cache_invalidation import broadcast_invalidation_async
+from db.models.product_footprint import ProductFootprint as ProductFootprintModel
+from db.pact_json import product_footprint_json, update_documents
+from db.repository.product_footprints import (
+    _eager_load_options, _insert_carbon_footprint_children_statements, _insert_carbon_footprints_statement,
+    _insert_product_footprints_statement, _inserted_product_footprints, build_product_footprint_model,
+    matching_search, product_footprint_cache, product_footprint_count, search_rank
+)
+from schemas.product_footprint import ProductFootprint as ProductFootprintSchema
+
+
+def _paginate(statement, limit: int | None, offset: int | None, after_pk: int | None, where=None):
+    statement = statement.order_by(ProductFootprintModel.pk)
+    if after_pk is not None:
+        statement = statement.where(ProductFootprintModel.pk > after_pk)
+    if where is not None:
+        statement = statement.where(where)
+    if offset:
+        statement = statement.offset(offset)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def _async_eager_load_options(loading_strategy: str | None = None) -> list:
+    loading_strategy = loading_strategy or settings.FOOTPRINT_LOADING_STRATEGY
+    if loading_strategy == "lazy":
+        raise ValueError("Lazy loading is not supported on an async session")
+    return _eager_load_options(loading_strategy)
+
+
+def _product_footprint_json_statement():
+    return (
+        select(ProductFootprintModel.pk, product_footprint_json.label("document"))
+        .select_from(ProductFootprintModel)
+        .outerjoin(ProductFootprintModel.carbon_footprint)
+    )
+
+
+async def create_new_product_footprint(product_footprint: ProductFootprintSchema, db: AsyncSession):
+    data_entry = build_product_footprint_model(product_footprint)
+    db.add(data_entry)
+    await db.flush()
+    await refresh_product_footprint_documents(db, [data_entry.pk])
+    await broadcast_invalidation_async(db, str(product_footprint.id))
+    await db.commit()
+    product_footprint_count.adjust(1)
+    product_footprint_cache.invalidate(str(product_footprint.id))
+    return data_entry
+
+
+async def insert_product_footprints(product_footprints: list[ProductFootprintSchema], db: AsyncSession) -> list[str]:
+    if not product_footprints:
+        return []
+    rows = (await db.execute(_insert_product_footprints_statement(product_footprints))).all()
+    if not rows:
+        return []
+
+    inserted = _inserted_product_footprints(product_footprints, rows)
+    rows = (await db.execute(_insert_carbon_footprints_statement(inserted))).all()
+    for statement in _insert_carbon_footprint_children_statements(inserted, rows):
+        await db.execute(statement)
+    await refresh_product_footprint_documents(db, list(inserted))
+    return [str(product_footprint.id) for product_footprint in inserted.values()]
+
+
+async def commit_inserted_product_footprints(ids: list[str], db: AsyncSession):
+    await db.commit()
+    product_footprint_count.adjust(len(ids))
+
+
+async def retrieve_product_footprint(id: str, db: AsyncSession, loading_strategy: str | None = None):
+    result = await db.execute(
+        select(ProductFootprintModel)
+        .options(*_async_eager_load_options(loading_strategy))
+        .where(ProductFootprintModel.id == id)
+        .limit(1)
+    )
+    # Joined eager loads of collections repeat the parent row, which `unique` folds back up.
+    return result.unique().scalars().first()
+
+
+async def retrieve_product_footprint_version(id: str, db: AsyncSession):
+    result = await db.execute(
+        select(ProductFootprintModel.id, ProductFootprintModel.version, ProductFootprintModel.updated)
+        .where(ProductFootprintModel.id == id)
+        .limit(1)
+    )
+    return result.first()
+
+
+async def list_product_footprints(
+    db: AsyncSession,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+    loading_strategy: str | None = None,
+) -> list[ProductFootprintModel] | None:
+    statement = select(ProductFootprintModel).options(*_async_eager_load_options(loading_strategy))
+    result = await db.execute(_paginate(statement, limit, offset, after_pk, where))
+    product_footprints = result.unique().scalars().all()
+    if len(product_footprints) == 0:
+        return None
+    return product_footprints
+
+
+async def search_product_footprints(
+    db: AsyncSession,
+    terms: str,
+    limit: int | None = None,
+    offset: int | None = None,
+    where: ColumnElement | None = None,
+    loading_strategy: str | None = None,
+) -> list[ProductFootprintModel] | None:
+    statement = (
+        select(ProductFootprintModel)
+        .options(*_async_eager_load_options(loading_strategy))
+        .where(matching_search(terms))
+        .order_by(search_rank(terms).desc(), ProductFootprintModel.pk)
+    )
+    if where is not None:
+        statement = statement.where(where)
+    if offset:
+        statement = statement.offset(offset)
+    if limit is not None:
+        statement = statement.limit(limit)
+    product_footprints = (await db.execute(statement)).unique().scalars().all()
+    if len(product_footprints) == 0:
+        return None
+    return product_footprints
+
+
+async def retrieve_product_footprint_json(id: str, db: AsyncSession) -> str | None:
+    result = await db.execute(_product_footprint_json_statement().where(ProductFootprintModel.id == id).limit(1))
+    row = result.first()
+    if row is None:
+        return None
+    return row.document
+
+
+async def list_product_footprints_json(
+    db: AsyncSession,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+) -> list[tuple[int, str]] | None:
+    result = await db.execute(_paginate(_product_footprint_json_statement(), limit, offset, after_pk, where))
+    rows = result.all()
+    if len(rows) == 0:
+        return None
+    return [(row.pk, row.document) for row in rows]
+
+
+async def refresh_product_footprint_documents(db: AsyncSession, pks: list[int]):
+    await db.execute(update_documents(ProductFootprintModel.pk.in_(pks)))
+
+
+async def retrieve_product_footprint_document(id: str, db: AsyncSession) -> str | None:
+    result = await db.execute(
+        select(ProductFootprintModel.document).where(ProductFootprintModel.id == id).limit(1)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    if row.document is None:
+        return await retrieve_product_footprint_json(id=id, db=db)
+    return bytes(row.document).decode()
+
+
+async def list_product_footprint_documents(
+    db: AsyncSession,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+) -> list[tuple[int, str]] | None:
+    statement = select(ProductFootprintModel.pk, ProductFootprintModel.document)
+    rows = (await db.execute(_paginate(statement, limit, offset, after_pk, where))).all()
+    if len(rows) == 0:
+        return None
+
+    missing = [row.pk for row in rows if row.document is None]
+    rendered = {}
+    if missing:
+        result = await db.execute(_product_footprint_json_statement().where(ProductFootprintModel.pk.in_(missing)))
+        rendered = dict(result.all())
+    return [
+        (row.pk, bytes(row.document).decode() if row.document is not None else rendered[row.pk])
+        for row in rows
+    ]
+
+
+async def stream_product_footprint_documents(
+    db: AsyncSession,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+    batch_size: int | None = None,
+) -> AsyncIterator[str]:
+    statement = _paginate(select(ProductFootprintModel.pk, ProductFootprintModel.document), limit, offset, after_pk, where)
+    result = await db.stream(
+        statement.execution_options(yield_per=batch_size or settings.FOOTPRINT_EXPORT_BATCH_SIZE)
+    )
+    async for row in result:
+        if row.document is None:
+            yield await _retrieve_product_footprint_json_by_pk(row.pk, db)
+        else:
+            yield bytes(row.document).decode()
+
+
+async def retrieve_page_bounds(
+    db: AsyncSession,
+    limit: int,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+) -> tuple[int, int | None, bool]:
+    page = _paginate(select(ProductFootprintModel.pk), limit, offset, after_pk, where).subquery()
+    rows, last_pk = (await db.execute(select(func.count(), func.max(page.c.pk)))).one()
+    has_more = False
+    if rows == limit:
+        following = exists().where(ProductFootprintModel.pk > last_pk)
+        if where is not None:
+            following = following.where(where)
+        has_more = (await db.execute(select(following))).scalar()
+    return rows, last_pk, has_more
+
+
+async def _retrieve_product_footprint_json_by_pk(pk: int, db: AsyncSession) -> str:
+    result = await db.execute(_product_footprint_json_statement().where(ProductFootprintModel.pk == pk))
+    return result.one().document
+
+
+async def count_product_footprints(db: AsyncSession, cached: bool = False, where: ColumnElement | None = None) -> int:
+    if cached and where is None:
+        return await product_footprint_count.get_async(lambda: count_product_footprints(db))
+    statement = select(func.count()).select_from(ProductFootprintModel)
+    if where is not None:
+        statement = statement.where(where)
+    result = await db.execute(statement)
+    return result.scalar_one()
+
+
+async def estimate_product_footprints(db: AsyncSession) -> int:
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": ProductFootprintModel.__tablename__},
+    )
+    estimate = result.scalar()
+    if estimate is None or estimate < 0:
+        return await count_product_footprints(db)
+    return estimate
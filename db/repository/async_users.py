@@ -0,0 +1,155 @@
+"""
+This module has the async versions of the functions in `db.repository.users`, for use
+on an `AsyncSession` when `settings.DATABASE_ASYNC` is enabled.
+
+Password hashing is CPU bound, so it runs in the password hashing pool, see
+`core.hashing`, rather than on the event loop.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.authorization import remember_user_claims
+from core.credential_cache import verified_credentials, verify_credentials_async
+from core.hashing import Hasher
+from core.logger import logger, sampled_logger
+from db.models.user import User
+from schemas.user import UserCreate
+
+
+# User lookups run on every token request.
+lookup_logger = sampled_logger(__name__)
+
+
+async def _create_user(user: UserCreate, db: AsyncSession, is_superuser: bool) -> User:
+    existing_user = await retrieve_user_by_email(email=user.email, db=db)
+    if existing_user:
+        logger.error("A user with email {email} already exists", email=user.email)
+        raise ValueError("A user with this email already exists")
+
+    existing_user = await retrieve_user_by_username(username=user.username, db=db)
+    if existing_user:
+        logger.error("A user with username {username} already exists", username=user.username)
+        raise ValueError("A user with this username already exists")
+
+    hashed_password = await Hasher.get_password_hash_async(password=user.password)
+    user = User(
+        username=user.username,
+        email=user.email,
+        hashed_password=hashed_password,
+        is_active=True,
+        is_superuser=is_superuser,
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def create_new_user(user: UserCreate, db: AsyncSession) -> User:
+    """
+    Creates a new user and adds it to the database.
+
+    Raises:
+        ValueError: If a user with the same email or username already exists.
+    """
+    logger.info("Creating a new user with email {email}", email=user.email)
+    user = await _create_user(user, db, is_superuser=False)
+    logger.success("New user created with email {email}", email=user.email)
+    return user
+
+
+async def create_new_superuser(user: UserCreate, db: AsyncSession) -> User:
+    """
+    Creates a new superuser and adds it to the database.
+
+    Raises:
+        ValueError: If a user with the same email or username already exists.
+    """
+    logger.info("Creating a new superuser with email {email}", email=user.email)
+    user = await _create_user(user, db, is_superuser=True)
+    logger.success("New superuser created with email {email}", email=user.email)
+    return user
+
+
+async def _retrieve_user(db: AsyncSession, *criteria) -> User | None:
+    result = await db.execute(select(User).where(*criteria).limit(1))
+    return result.scalars().first()
+
+
+async def retrieve_user_by_id(*, db: AsyncSession, user_id: int) -> User | None:
+    """
+    Retrieves a user from the database by their ID, or None if no user was found.
+    """
+    lookup_logger.debug("Retrieving user with ID {user_id}", user_id=user_id)
+    return await _retrieve_user(db, User.id == user_id)
+
+
+async def retrieve_user_by_email(*, db: AsyncSession, email: str) -> User | None:
+    """
+    Retrieves a user from the database by their email, or None if no user was found.
+    """
+    lookup_logger.debug("Retrieving user with email {email}", email=email)
+    return await _retrieve_user(db, User.email == email)
+
+
+async def retrieve_user_by_username(*, db: AsyncSession, username: str) -> User | None:
+    """
+    Retrieves a user from the database by their username, or None if no user was found.
+    """
+    lookup_logger.debug("Retrieving user with username {username}", username=username)
+    return await _retrieve_user(db, User.username == username)
+
+
+async def update_user(
+    *, db: AsyncSession, user_id: int, is_active: bool | None = None, is_superuser: bool | None = None
+) -> User | None:
+    """
+    Activates or deactivates a user, or grants or revokes superuser rights, see
+    `db.repository.users.update_user`.
+    """
+    user = await retrieve_user_by_id(db=db, user_id=user_id)
+    if user is None:
+        return None
+    if is_active is not None:
+        user.is_active = is_active
+    if is_superuser is not None:
+        user.is_superuser = is_superuser
+    await db.commit()
+    await db.refresh(user)
+    remember_user_claims(user)
+    if not user.is_active:
+        verified_credentials.forget_user(user.id)
+    logger.success("User with ID {user_id} updated", user_id=user_id)
+    return user
+
+
+async def update_user_password(*, db: AsyncSession, user_id: int, password: str) -> User | None:
+    """
+    Changes the password of a user, see `db.repository.users.update_user_password`.
+    """
+    user = await retrieve_user_by_id(db=db, user_id=user_id)
+    if user is None:
+        return None
+    user.hashed_password = await Hasher.get_password_hash_async(password=password)
+    await db.commit()
+    await db.refresh(user)
+    verified_credentials.forget_user(user.id)
+    logger.success("Password of user with ID {user_id} changed", user_id=user_id)
+    return user
+
+
+async def authenticate_user(username: str, password: str, db: AsyncSession) -> User | None:
+    """
+    Authenticates a user by their username and password.
+
+    Returns:
+        User: The authenticated user if the credentials are valid and the user is
+            active, otherwise None.
+    """
+    user = await retrieve_user_by_email(email=username, db=db)
+    if not user or not user.is_active:
+        return None
+    if not await verify_credentials_async(username, password, user):
+        return None
+    return user
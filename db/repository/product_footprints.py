@@ -1,39 +1,68 @@
 import pprint
+from typing import Iterator
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, literal_column, text
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.sql.elements import ColumnElement
 
-from db.models.product_footprint import ProductFootprint as ProductFootprintModel
+from core.cache import CachedCount
+from core.cache_backends import create_cache_backend
+from core.config import settings
+from db.bulk_insert import RecordsetInsert
+from db.cache_invalidation import broadcast_invalidation
+from db.models.product_footprint import SEARCH_CONFIGURATION, ProductFootprint as ProductFootprintModel
 from db.models.carbon_footprint import CarbonFootprintModel, ProductOrSectorSpecificRuleModel, EmissionFactorDatasetModel
+from db.pact_json import product_footprint_json, update_documents
+from schemas.carbon_footprint import CarbonFootprint as CarbonFootprintSchema
 from schemas.product_footprint import ProductFootprint as ProductFootprintSchema
 
 
 pp = pprint.PrettyPrinter(depth=4)
+product_footprint_count = CachedCount(ttl=settings.FOOTPRINT_COUNT_TTL)
+# Serialised single footprint responses, keyed by footprint id, see `read_product_footprint`.
+product_footprint_cache = create_cache_backend()
 
+_LOADERS = {
+    "selectin": selectinload,
+    "joined": joinedload,
+}
 
-def create_new_product_footprint(product_footprint: ProductFootprintSchema, db: Session):
-    # TODO: Log this action
 
-    product_or_sector_specific_rules: list[ProductOrSectorSpecificRuleModel] = []
-    for each in product_footprint.pcf.productOrSectorSpecificRules:
-        product_or_sector_specific_rules.append(
-            ProductOrSectorSpecificRuleModel(
-                operator=each.operator,
-                rule_names=each.ruleNames,
-                other_operator_name=each.otherOperatorName
-            )
-        )
+def _eager_load_options(loading_strategy: str | None = None) -> list:
+    """
+    Builds the loader options that pull in the carbon footprint of a product footprint
+    along with its rules and emission factor datasets, so that building a response does
+    not fire one lazy load per relationship per footprint.
+
+    Args:
+        loading_strategy (str | None): One of "selectin", "joined" or "lazy". Defaults to
+            `settings.FOOTPRINT_LOADING_STRATEGY`.
 
-    secondary_emission_factor_sources: list[EmissionFactorDatasetModel] = []
-    for each in product_footprint.pcf.secondaryEmissionFactorSources:
-        secondary_emission_factor_sources.append(
-            EmissionFactorDatasetModel(
-                name=each.name,
-                version=each.version
-            )
+    Returns:
+        list: The loader options to pass to `Query.options`.
+
+    Raises:
+        ValueError: If the loading strategy is not known.
+    """
+    loading_strategy = loading_strategy or settings.FOOTPRINT_LOADING_STRATEGY
+    if loading_strategy == "lazy":
+        return []
+    if loading_strategy not in _LOADERS:
+        raise ValueError(f"Unknown loading strategy: {loading_strategy}")
+
+    loader = _LOADERS[loading_strategy]
+    carbon_footprint = loader(ProductFootprintModel.carbon_footprint)
+    return [
+        carbon_footprint.options(
+            loader(CarbonFootprintModel.product_or_sector_specific_rules),
+            loader(CarbonFootprintModel.secondary_emission_factor_sources),
         )
+    ]
+
 
-    data_entry = ProductFootprintModel(
-        id = product_footprint.id,
+def _product_footprint_values(product_footprint: ProductFootprintSchema) -> dict:
+    return dict(
+        id = str(product_footprint.id),
         precedingPfIds = product_footprint.precedingPfIds,
         specVersion = product_footprint.specVersion,
         version = product_footprint.version,
@@ -50,41 +79,80 @@ def create_new_product_footprint(product_footprint: ProductFootprintSchema, db:
         productCategoryCpc = product_footprint.productCategoryCpc,
         productNameCompany = product_footprint.productNameCompany,
         comment = product_footprint.comment,
-        carbon_footprint = CarbonFootprintModel(
-            declared_unit=product_footprint.pcf.declaredUnit,
-            unitary_product_amount=product_footprint.pcf.unitaryProductAmount,
-            pcf_excluding_biogenic=product_footprint.pcf.pCfExcludingBiogenic,
-            pcf_including_biogenic=product_footprint.pcf.pCfIncludingBiogenic,
-            fossil_ghg_emissions=product_footprint.pcf.fossilGhgEmissions,
-            fossil_carbon_content=product_footprint.pcf.fossilCarbonContent,
-            biogenic_carbon_content=product_footprint.pcf.biogenicCarbonContent,
-            dluc_ghg_emissions=product_footprint.pcf.dLucGhgEmissions,
-            land_management_ghg_emissions=product_footprint.pcf.landManagementGhgEmissions,
-            other_biogenic_ghg_emissions=product_footprint.pcf.otherBiogenicGhgEmissions,
-            iluc_ghg_emissions=product_footprint.pcf.iLucGhgEmissions,
-            biogenic_carbon_withdrawal=product_footprint.pcf.biogenicCarbonWithdrawal,
-            aircraft_ghg_emissions=product_footprint.pcf.aircraftGhgEmissions,
-            characterization_factors=product_footprint.pcf.characterizationFactors,
-            cross_sectoral_standards_used=product_footprint.pcf.crossSectoralStandardsUsed,
-            product_or_sector_specific_rules=product_or_sector_specific_rules,
-            biogenic_accounting_methodology=product_footprint.pcf.biogenicAccountingMethodology,
-            boundary_processes_description=product_footprint.pcf.boundaryProcessesDescription,
-            reference_period_start=product_footprint.pcf.referencePeriodStart,
-            reference_period_end=product_footprint.pcf.referencePeriodEnd,
-            geography_region_or_subregion=product_footprint.pcf.geographyRegionOrSubregion,
-            secondary_emission_factor_sources=secondary_emission_factor_sources,
-            exempted_emissions_percent=product_footprint.pcf.exemptedEmissionsPercent,
-            exempted_emissions_description=product_footprint.pcf.exemptedEmissionsDescription,
-            packaging_emissions_included=product_footprint.pcf.packagingEmissionsIncluded,
-            packaging_ghg_emissions=product_footprint.pcf.packagingGhgEmissions,
-            allocation_rules_description=product_footprint.pcf.allocationRulesDescription,
-            uncertainty_assessment_description=product_footprint.pcf.uncertaintyAssessmentDescription,
-            primary_data_share=product_footprint.pcf.primaryDataShare,
-            dqi=product_footprint.pcf.dqi,
-            assurance=product_footprint.pcf.assurance
-        ),
         extensions = product_footprint.extensions
     )
+
+
+def _carbon_footprint_values(pcf: CarbonFootprintSchema) -> dict:
+    return dict(
+        declared_unit=pcf.declaredUnit,
+        unitary_product_amount=pcf.unitaryProductAmount,
+        pcf_excluding_biogenic=pcf.pCfExcludingBiogenic,
+        pcf_including_biogenic=pcf.pCfIncludingBiogenic,
+        fossil_ghg_emissions=pcf.fossilGhgEmissions,
+        fossil_carbon_content=pcf.fossilCarbonContent,
+        biogenic_carbon_content=pcf.biogenicCarbonContent,
+        dluc_ghg_emissions=pcf.dLucGhgEmissions,
+        land_management_ghg_emissions=pcf.landManagementGhgEmissions,
+        other_biogenic_ghg_emissions=pcf.otherBiogenicGhgEmissions,
+        iluc_ghg_emissions=pcf.iLucGhgEmissions,
+        biogenic_carbon_withdrawal=pcf.biogenicCarbonWithdrawal,
+        aircraft_ghg_emissions=pcf.aircraftGhgEmissions,
+        characterization_factors=pcf.characterizationFactors,
+        cross_sectoral_standards_used=pcf.crossSectoralStandardsUsed,
+        biogenic_accounting_methodology=pcf.biogenicAccountingMethodology,
+        boundary_processes_description=pcf.boundaryProcessesDescription,
+        reference_period_start=pcf.referencePeriodStart,
+        reference_period_end=pcf.referencePeriodEnd,
+        geography_country_subdivision=pcf.geographyCountrySubdivision,
+        geography_country=pcf.geographyCountry,
+        geography_region_or_subregion=pcf.geographyRegionOrSubregion,
+        exempted_emissions_percent=pcf.exemptedEmissionsPercent,
+        exempted_emissions_description=pcf.exemptedEmissionsDescription,
+        packaging_emissions_included=pcf.packagingEmissionsIncluded,
+        packaging_ghg_emissions=pcf.packagingGhgEmissions,
+        allocation_rules_description=pcf.allocationRulesDescription,
+        uncertainty_assessment_description=pcf.uncertaintyAssessmentDescription,
+        primary_data_share=pcf.primaryDataShare,
+        dqi=pcf.dqi,
+        assurance=pcf.assurance
+    )
+
+
+def _product_or_sector_specific_rule_values(rule) -> dict:
+    return dict(operator=rule.operator, rule_names=rule.ruleNames, other_operator_name=rule.otherOperatorName)
+
+
+def _emission_factor_dataset_values(dataset) -> dict:
+    return dict(name=dataset.name, version=dataset.version)
+
+
+def build_product_footprint_model(product_footprint: ProductFootprintSchema) -> ProductFootprintModel:
+    """
+    Builds an unsaved ORM product footprint, with its carbon footprint and child rows,
+    from a validated `ProductFootprint` schema.
+    """
+    pcf = product_footprint.pcf
+    return ProductFootprintModel(
+        **_product_footprint_values(product_footprint),
+        carbon_footprint=CarbonFootprintModel(
+            **_carbon_footprint_values(pcf),
+            product_or_sector_specific_rules=[
+                ProductOrSectorSpecificRuleModel(**_product_or_sector_specific_rule_values(rule))
+                for rule in pcf.productOrSectorSpecificRules
+            ],
+            secondary_emission_factor_sources=[
+                EmissionFactorDatasetModel(**_emission_factor_dataset_values(dataset))
+                for dataset in pcf.secondaryEmissionFactorSources
+            ],
+        ),
+    )
+
+
+def create_new_product_footprint(product_footprint: ProductFootprintSchema, db: Session):
+    # TODO: Log this action
+    data_entry = build_product_footprint_model(product_footprint)
+
     # product_footprint_dict = product_footprint.model_dump()
     # # TODO: This is extremely ugly, we should be using some of the internal functionality
     # #      of pydantic here instead of mutating and casting the UUID id field.
@@ -93,39 +161,491 @@ def create_new_product_footprint(product_footprint: ProductFootprintSchema, db:
     # product_footprint_object = ProductFootprint(**product_footprint_dict)
 
     db.add(data_entry)
+    db.flush()
+    # Written in the same transaction as the row itself, so a stored footprint always has its document.
+    refresh_product_footprint_documents(db, [data_entry.pk])
+    broadcast_invalidation(db, str(product_footprint.id))
     db.commit()
+    product_footprint_count.adjust(1)
+    product_footprint_cache.invalidate(str(product_footprint.id))
     db.refresh(data_entry)
     return data_entry
 
 
-def retrieve_product_footprint(id: str, db: Session):
+def _insertable_columns(model) -> list[str]:
+    return [
+        column.name for column in model.__table__.columns
+        if column.name not in ("pk", "document") and column.computed is None
+    ]
+
+
+# Bulk loads send each batch as a single JSON parameter, see `db.bulk_insert`.
+_product_footprint_insert = RecordsetInsert(
+    ProductFootprintModel.__table__,
+    _insertable_columns(ProductFootprintModel),
+    returning=["pk", "id"],
+    on_conflict_do_nothing=["id"],
+)
+_carbon_footprint_insert = RecordsetInsert(
+    CarbonFootprintModel.__table__,
+    _insertable_columns(CarbonFootprintModel),
+    returning=["pk", "product_footprint_pk"],
+)
+_product_or_sector_specific_rule_insert = RecordsetInsert(
+    ProductOrSectorSpecificRuleModel.__table__, _insertable_columns(ProductOrSectorSpecificRuleModel)
+)
+_emission_factor_dataset_insert = RecordsetInsert(
+    EmissionFactorDatasetModel.__table__, _insertable_columns(EmissionFactorDatasetModel)
+)
+
+
+def _insert_product_footprints_statement(product_footprints: list[ProductFootprintSchema]):
+    return _product_footprint_insert.statement([_product_footprint_values(each) for each in product_footprints])
+
+
+def _inserted_product_footprints(product_footprints: list[ProductFootprintSchema], rows) -> dict[int, ProductFootprintSchema]:
+    """
+    Matches the rows returned by `_insert_product_footprints_statement` to the footprints
+    they were inserted from, by primary key. Where an id is repeated, the first
+    occurrence is the one that was inserted.
+    """
+    pks = {row.id: row.pk for row in rows}
+    inserted = {}
+    for product_footprint in product_footprints:
+        pk = pks.pop(str(product_footprint.id), None)
+        if pk is not None:
+            inserted[pk] = product_footprint
+    return inserted
+
+
+def _insert_carbon_footprints_statement(inserted: dict[int, ProductFootprintSchema]):
+    return _carbon_footprint_insert.statement([
+        {**_carbon_footprint_values(product_footprint.pcf), "product_footprint_pk": pk}
+        for pk, product_footprint in inserted.items()
+    ])
+
+
+def _insert_carbon_footprint_children_statements(inserted: dict[int, ProductFootprintSchema], rows) -> list:
+    """
+    Builds the inserts of the rules and emission factor datasets of the carbon footprints
+    returned by `_insert_carbon_footprints_statement`.
+    """
+    rules, emission_factor_datasets = [], []
+    for row in rows:
+        pcf = inserted[row.product_footprint_pk].pcf
+        for rule in pcf.productOrSectorSpecificRules:
+            rules.append({**_product_or_sector_specific_rule_values(rule), "carbon_footprint_pk": row.pk})
+        for dataset in pcf.secondaryEmissionFactorSources:
+            emission_factor_datasets.append({**_emission_factor_dataset_values(dataset), "carbon_footprint_pk": row.pk})
+
+    statements = []
+    if rules:
+        statements.append(_product_or_sector_specific_rule_insert.statement(rules))
+    if emission_factor_datasets:
+        statements.append(_emission_factor_dataset_insert.statement(emission_factor_datasets))
+    return statements
+
+
+def insert_product_footprints(product_footprints: list[ProductFootprintSchema], db: Session) -> list[str]:
+    """
+    Inserts a batch of product footprints, with their carbon footprints, rules, emission
+    factor datasets and documents, in one statement per table. Footprints whose id is
+    already stored, or repeated in the batch, are skipped.
+
+    Does not commit, so that a bulk load can insert many batches in one transaction;
+    finish it with `commit_inserted_product_footprints`.
+
+    Returns:
+        list[str]: The ids of the footprints that were inserted.
+    """
+    if not product_footprints:
+        return []
+    rows = db.execute(_insert_product_footprints_statement(product_footprints)).all()
+    if not rows:
+        return []
+
+    inserted = _inserted_product_footprints(product_footprints, rows)
+    rows = db.execute(_insert_carbon_footprints_statement(inserted)).all()
+    for statement in _insert_carbon_footprint_children_statements(inserted, rows):
+        db.execute(statement)
+    refresh_product_footprint_documents(db, list(inserted))
+    return [str(product_footprint.id) for product_footprint in inserted.values()]
+
+
+def commit_inserted_product_footprints(ids: list[str], db: Session):
+    """
+    Commits the footprints inserted by `insert_product_footprints`.
+    """
+    # Only ids that were not stored are inserted, and nothing is cached for those, so
+    # unlike a single create there is nothing to invalidate.
+    db.commit()
+    product_footprint_count.adjust(len(ids))
+
+
+def retrieve_product_footprint(id: str, db: Session, loading_strategy: str | None = None):
     # TODO: I suspect another Pydantic field here to validate that a UUID formatted
     #   string is being passed here would be a winner, improve input validation
-    item = db.query(ProductFootprintModel).filter(ProductFootprintModel.id == id).first()
+    item = (
+        db.query(ProductFootprintModel)
+        .options(*_eager_load_options(loading_strategy))
+        .filter(ProductFootprintModel.id == id)
+        .first()
+    )
     return item
 
 
-def list_product_footprints(db: Session) -> list[ProductFootprintModel] | None:
-    product_footprints = db.query(ProductFootprintModel).all()
+def retrieve_product_footprint_version(id: str, db: Session):
+    """
+    Retrieves the `id`, `version` and `updated` of a product footprint, the fields its
+    ETag is derived from, with a lookup on the unique `id` index that does not touch
+    the carbon footprint tables.
+
+    Returns:
+        Row | None: The row, or None if there is no footprint with this id.
+    """
+    return (
+        db.query(ProductFootprintModel.id, ProductFootprintModel.version, ProductFootprintModel.updated)
+        .filter(ProductFootprintModel.id == id)
+        .first()
+    )
+
+
+def with_product_id(product_id: str) -> ColumnElement:
+    """
+    Matches the footprints of a product, i.e. those whose `productIds` contain
+    `product_id`, as a `where` clause for the list functions.
+
+    Array containment, unlike `= ANY(...)`, is answered from the GIN index on
+    `productIds`, so the lookup does not scan the table.
+    """
+    return ProductFootprintModel.productIds.contains([product_id])
+
+
+def with_company_id(company_id: str) -> ColumnElement:
+    """
+    Matches the footprints owned by a company, i.e. those whose `companyIds` contain
+    `company_id`, as a `where` clause for the list functions.
+    """
+    return ProductFootprintModel.companyIds.contains([company_id])
+
+
+def list_product_footprints(
+    db: Session,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+    loading_strategy: str | None = None,
+) -> list[ProductFootprintModel] | None:
+    """
+    Lists product footprints ordered by primary key, applying `limit` and `offset`
+    in SQL so that only the requested page is loaded from the database.
+
+    Passing `after_pk` switches to keyset pagination: only footprints with a primary
+    key greater than `after_pk` are returned, which keeps the cost of a page constant
+    however deep into the table it is.
+
+    Passing `where`, e.g. a clause compiled by `db.footprint_filter`, lists only the
+    footprints that match it.
+
+    The carbon footprint and its child rows are eager loaded according to
+    `loading_strategy`, so the number of queries per page does not grow with its size.
+    """
+    query = (
+        db.query(ProductFootprintModel)
+        .options(*_eager_load_options(loading_strategy))
+        .order_by(ProductFootprintModel.pk)
+    )
+    if after_pk is not None:
+        query = query.filter(ProductFootprintModel.pk > after_pk)
+    if where is not None:
+        query = query.filter(where)
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    product_footprints = query.all()
+    if len(product_footprints) == 0:
+        return None
+    return product_footprints
+
+
+def _search_query(terms: str) -> ColumnElement:
+    # Web search syntax never fails to parse, e.g. `"solar panel" -frame`. The configuration
+    # is a regconfig literal, as asyncpg would otherwise send it as a varchar.
+    return func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIGURATION}'::regconfig"), terms)
+
+
+def matching_search(terms: str) -> ColumnElement:
+    """
+    Matches the footprints whose product name, description or comment contain the search
+    `terms`, as a `where` clause answered from the GIN index on `search_vector`.
+    """
+    return ProductFootprintModel.search_vector.op("@@")(_search_query(terms))
+
+
+def search_rank(terms: str) -> ColumnElement:
+    """
+    How well a footprint matches the search `terms`, matches in the product name ranking
+    above those in the description, which rank above those in the comment.
+    """
+    return func.ts_rank(ProductFootprintModel.search_vector, _search_query(terms))
+
+
+def search_product_footprints(
+    db: Session,
+    terms: str,
+    limit: int | None = None,
+    offset: int | None = None,
+    where: ColumnElement | None = None,
+    loading_strategy: str | None = None,
+) -> list[ProductFootprintModel] | None:
+    """
+    Lists the product footprints matching the search `terms`, best match first, and
+    paginated with `limit` and `offset` like `list_product_footprints`.
+
+    Passing `where` narrows the search down, e.g. to a `$filter`. Only the matching
+    footprints are ranked, so a search costs about the same however large the table is.
+    """
+    query = (
+        db.query(ProductFootprintModel)
+        .options(*_eager_load_options(loading_strategy))
+        .filter(matching_search(terms))
+        .order_by(search_rank(terms).desc(), ProductFootprintModel.pk)
+    )
+    if where is not None:
+        query = query.filter(where)
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    product_footprints = query.all()
     if len(product_footprints) == 0:
         return None
     return product_footprints
 
 
-def count_product_footprints(db: Session):
-    count = db.query(ProductFootprintModel).count()
+def _product_footprint_json_query(db: Session):
+    return (
+        db.query(ProductFootprintModel.pk, product_footprint_json.label("document"))
+        .select_from(ProductFootprintModel)
+        .outerjoin(ProductFootprintModel.carbon_footprint)
+    )
+
+
+def retrieve_product_footprint_json(id: str, db: Session) -> str | None:
+    """
+    Retrieves a product footprint as its PACT JSON document, rendered by Postgres in a
+    single query, see `db.pact_json`.
+    """
+    row = _product_footprint_json_query(db).filter(ProductFootprintModel.id == id).first()
+    if row is None:
+        return None
+    return row.document
+
+
+def list_product_footprints_json(
+    db: Session,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+) -> list[tuple[int, str]] | None:
+    """
+    Lists product footprints as `(pk, document)` pairs, where the document is the PACT
+    JSON rendered by Postgres. Paginates the same way as `list_product_footprints`.
+    """
+    query = _product_footprint_json_query(db).order_by(ProductFootprintModel.pk)
+    if after_pk is not None:
+        query = query.filter(ProductFootprintModel.pk > after_pk)
+    if where is not None:
+        query = query.filter(where)
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = query.all()
+    if len(rows) == 0:
+        return None
+    return [(row.pk, row.document) for row in rows]
+
+
+def refresh_product_footprint_documents(db: Session, pks: list[int]):
+    """
+    Re-renders the stored canonical PACT JSON `document` of the given product footprints
+    from their current rows. Must be called by every write path, before it commits.
+    """
+    db.execute(update_documents(ProductFootprintModel.pk.in_(pks)))
+
+
+def retrieve_product_footprint_document(id: str, db: Session) -> str | None:
+    """
+    Retrieves the stored canonical PACT JSON of a product footprint, reading only the
+    `productfootprint` row. Rows without a stored document, e.g. ones written before
+    the column existed and not backfilled yet, are rendered on the fly instead.
+    """
+    row = (
+        db.query(ProductFootprintModel.document)
+        .filter(ProductFootprintModel.id == id)
+        .first()
+    )
+    if row is None:
+        return None
+    if row.document is None:
+        return retrieve_product_footprint_json(id=id, db=db)
+    return bytes(row.document).decode()
+
+
+def list_product_footprint_documents(
+    db: Session,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+) -> list[tuple[int, str]] | None:
+    """
+    Lists the stored canonical PACT JSON of product footprints as `(pk, document)` pairs,
+    paginated the same way as `list_product_footprints`. Any documents that are missing
+    are rendered in one extra query.
+    """
+    query = db.query(ProductFootprintModel.pk, ProductFootprintModel.document).order_by(ProductFootprintModel.pk)
+    if after_pk is not None:
+        query = query.filter(ProductFootprintModel.pk > after_pk)
+    if where is not None:
+        query = query.filter(where)
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = query.all()
+    if len(rows) == 0:
+        return None
+
+    missing = [row.pk for row in rows if row.document is None]
+    rendered = {}
+    if missing:
+        rendered = dict(
+            _product_footprint_json_query(db).filter(ProductFootprintModel.pk.in_(missing)).all()
+        )
+    return [
+        (row.pk, bytes(row.document).decode() if row.document is not None else rendered[row.pk])
+        for row in rows
+    ]
+
+
+def stream_product_footprint_documents(
+    db: Session,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+    batch_size: int | None = None,
+) -> Iterator[str]:
+    """
+    Yields the stored canonical PACT JSON of product footprints, in primary key order,
+    for a full export or a streamed page. Paginates the same way as
+    `list_product_footprints`, without a `limit` every footprint is yielded.
+
+    The rows are read through a server-side cursor `batch_size` at a time, so memory
+    use stays flat however many footprints there are. Any documents that are missing
+    are rendered on the fly.
+    """
+    query = db.query(ProductFootprintModel.pk, ProductFootprintModel.document).order_by(ProductFootprintModel.pk)
+    if after_pk is not None:
+        query = query.filter(ProductFootprintModel.pk > after_pk)
+    if where is not None:
+        query = query.filter(where)
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    for row in query.yield_per(batch_size or settings.FOOTPRINT_EXPORT_BATCH_SIZE):
+        if row.document is None:
+            yield _product_footprint_json_query(db).filter(ProductFootprintModel.pk == row.pk).one().document
+        else:
+            yield bytes(row.document).decode()
+
+
+def retrieve_page_bounds(
+    db: Session,
+    limit: int,
+    offset: int | None = None,
+    after_pk: int | None = None,
+    where: ColumnElement | None = None,
+) -> tuple[int, int | None, bool]:
+    """
+    Works out the extent of a page of product footprints, paginated the same way as
+    `list_product_footprints`, from the primary key index alone, so that a page can be
+    linked to the next one before it is streamed.
+
+    Returns:
+        tuple[int, int | None, bool]: The number of footprints on the page, the primary
+            key of the last one, and whether any footprint comes after it.
+    """
+    query = db.query(ProductFootprintModel.pk).order_by(ProductFootprintModel.pk)
+    if after_pk is not None:
+        query = query.filter(ProductFootprintModel.pk > after_pk)
+    if where is not None:
+        query = query.filter(where)
+    if offset:
+        query = query.offset(offset)
+    page = query.limit(limit).subquery()
+    rows, last_pk = db.query(func.count(), func.max(page.c.pk)).one()
+    has_more = False
+    if rows == limit:
+        following = exists().where(ProductFootprintModel.pk > last_pk)
+        if where is not None:
+            following = following.where(where)
+        has_more = db.query(following).scalar()
+    return rows, last_pk, has_more
+
+
+def count_product_footprints(db: Session, cached: bool = False, where: ColumnElement | None = None) -> int:
+    """
+    Counts the product footprints in the database, or those matching `where`.
+
+    With `cached=True` the count comes from `product_footprint_count`, which create and
+    delete keep up to date and which is only recounted once its TTL has passed. Counts
+    of the footprints matching `where` are never cached.
+    """
+    if cached and where is None:
+        return product_footprint_count.get(lambda: count_product_footprints(db))
+    query = db.query(ProductFootprintModel)
+    if where is not None:
+        query = query.filter(where)
+    count = query.count()
     return count
 
 
+def estimate_product_footprints(db: Session) -> int:
+    """
+    Estimates the number of product footprints from the Postgres planner statistics
+    in `pg_class.reltuples`, which costs the same however large the table is.
+
+    Falls back to an exact count if the table has never been vacuumed or analyzed.
+    """
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": ProductFootprintModel.__tablename__},
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return count_product_footprints(db)
+    return estimate
+
+
 def update_product_footprint_by_id(id: int, product_footprint: ProductFootprintSchema, db: Session, owner_id):
     existing_product_footprint = db.query(ProductFootprintModel).filter(ProductFootprintModel.id == id)
-    if not existing_product_footprint.first():
+    existing_row = existing_product_footprint.first()
+    if not existing_row:
         return 0
     product_footprint.__dict__.update(
         owner_id=owner_id
     )  # update dictionary with new key value of owner_id
     existing_product_footprint.update(product_footprint.__dict__)
+    refresh_product_footprint_documents(db, [existing_row.pk])
+    broadcast_invalidation(db, id)
     db.commit()
+    product_footprint_cache.invalidate(id)
     return 1
 
 
@@ -134,5 +654,8 @@ def delete_product_footprint_by_id(id: int, db: Session, owner_id):
     if not existing_product_footprint.first():
         return 0
     existing_product_footprint.delete(synchronize_session=False)
+    broadcast_invalidation(db, id)
     db.commit()
+    product_footprint_count.adjust(-1)
+    product_footprint_cache.invalidate(id)
     return 1
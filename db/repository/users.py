@@ -3,13 +3,20 @@ This module contains functions for creating and retrieving users from the databa
 """
 
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from core.authorization import remember_user_claims
+from core.credential_cache import verified_credentials, verify_credentials, verify_credentials_async
 from core.hashing import Hasher
-from core.logger import logger
+from core.logger import logger, sampled_logger
 from db.models.user import User
 from schemas.user import UserCreate
 
 
+# User lookups run on every token request.
+lookup_logger = sampled_logger(__name__)
+
+
 def create_new_user(user: UserCreate, db: Session) -> User:
     """
     Creates a new user and adds it to the database.
@@ -24,16 +31,16 @@ def create_new_user(user: UserCreate, db: Session) -> User:
     Raises:
         ValueError: If a user with the same email or username already exists.
     """
-    logger.info(f"Creating a new user with email {user.email}")
+    logger.info("Creating a new user with email {email}", email=user.email)
 
     existing_user = db.query(User).filter(User.email == user.email).first()
     if existing_user:
-        logger.error(f"A user with email {user.email} already exists")
+        logger.error("A user with email {email} already exists", email=user.email)
         raise ValueError("A user with this email already exists")
 
     existing_user = db.query(User).filter(User.username == user.username).first()
     if existing_user:
-        logger.error(f"A user with username {user.username} already exists")
+        logger.error("A user with username {username} already exists", username=user.username)
         raise ValueError("A user with this username already exists")
 
     user = User(
@@ -43,12 +50,12 @@ def create_new_user(user: UserCreate, db: Session) -> User:
         is_active=True,
         is_superuser=False,
     )
-    logger.debug(f"Adding user {user.email} to the database")
+    logger.debug("Adding user {email} to the database", email=user.email)
     db.add(user)
     db.commit()
     db.refresh(user)
-    logger.debug(f"Added user {user} to the database")
-    logger.success(f"New superuser created with email {user.email}")
+    logger.debug("Added user {email} to the database", email=user.email)
+    logger.success("New user created with email {email}", email=user.email)
     return user
 
 
@@ -66,16 +73,16 @@ def create_new_superuser(user: UserCreate, db: Session) -> User:
     Raises:
         ValueError: If a user with the same email or username already exists.
     """
-    logger.info(f"Creating a new superuser with email {user.email}")
+    logger.info("Creating a new superuser with email {email}", email=user.email)
 
     existing_user = db.query(User).filter(User.email == user.email).first()
     if existing_user:
-        logger.error(f"A user with email {user.email} already exists")
+        logger.error("A user with email {email} already exists", email=user.email)
         raise ValueError("A user with this email already exists")
 
     existing_user = db.query(User).filter(User.username == user.username).first()
     if existing_user:
-        logger.error(f"A user with username {user.username} already exists")
+        logger.error("A user with username {username} already exists", username=user.username)
         raise ValueError("A user with this username already exists")
 
     user = User(
@@ -85,12 +92,12 @@ def create_new_superuser(user: UserCreate, db: Session) -> User:
         is_active=True,
         is_superuser=True,
     )
-    logger.debug(f"Adding superuser {user.email} to the database")
+    logger.debug("Adding superuser {email} to the database", email=user.email)
     db.add(user)
     db.commit()
     db.refresh(user)
-    logger.debug(f"Added superuser {user} to the database")
-    logger.success(f"New superuser created with email {user.email}")
+    logger.debug("Added superuser {email} to the database", email=user.email)
+    logger.success("New superuser created with email {email}", email=user.email)
     return user
 
 
@@ -105,12 +112,11 @@ def retrieve_user_by_id(*, db: Session, user_id: int) -> User | None:
     Returns:
         User: The retrieved user, or None if no user was found.
     """
-    logger.info(f"Retrieving user with ID {user_id}")
     item = db.query(User).filter(User.id == user_id).first()
     if item:
-        logger.success(f"User with ID {user_id} retrieved successfully")
+        lookup_logger.debug("Retrieved user with ID {user_id}", user_id=user_id)
     else:
-        logger.warning(f"No user with ID {user_id} found")
+        logger.warning("No user with ID {user_id} found", user_id=user_id)
     return item
 
 
@@ -125,12 +131,11 @@ def retrieve_user_by_email(*, db: Session, email: str) -> User | None:
     Returns:
         User: The retrieved user, or None if no user was found.
     """
-    logger.info(f"Retrieving user with email {email}")
     item = db.query(User).filter(User.email == email).first()
     if item:
-        logger.success(f"User with email {email} retrieved successfully")
+        lookup_logger.debug("Retrieved user with email {email}", email=email)
     else:
-        logger.warning(f"No user with email {email} found")
+        logger.warning("No user with email {email} found", email=email)
     return item
 
 
@@ -145,30 +150,105 @@ def retrieve_user_by_username(*, db: Session, username: str) -> User | None:
     Returns:
         User: The retrieved user, or None if no user was found.
     """
-    logger.info(f"Retrieving user with username {username}")
     item = db.query(User).filter(User.username == username).first()
     if item:
-        logger.success(f"User with username {username} retrieved successfully")
+        lookup_logger.debug("Retrieved user with username {username}", username=username)
     else:
-        logger.warning(f"No user with username {username} found")
+        logger.warning("No user with username {username} found", username=username)
     return item
 
 
+def update_user(*, db: Session, user_id: int, is_active: bool | None = None, is_superuser: bool | None = None) -> User | None:
+    """
+    Activates or deactivates a user, or grants or revokes superuser rights, and records
+    the user's new claims so that tokens issued before the change stop granting them.
+
+    Args:
+        db (Session): The database session to use.
+        user_id (int): The ID of the user to update.
+        is_active (bool | None): Whether the user is active, unchanged if None.
+        is_superuser (bool | None): Whether the user is a superuser, unchanged if None.
+
+    Returns:
+        User: The updated user, or None if no user was found.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        logger.warning("No user with ID {user_id} found", user_id=user_id)
+        return None
+    if is_active is not None:
+        user.is_active = is_active
+    if is_superuser is not None:
+        user.is_superuser = is_superuser
+    db.commit()
+    db.refresh(user)
+    remember_user_claims(user)
+    if not user.is_active:
+        verified_credentials.forget_user(user.id)
+    logger.success("User with ID {user_id} updated", user_id=user_id)
+    return user
+
+
+def update_user_password(*, db: Session, user_id: int, password: str) -> User | None:
+    """
+    Changes the password of a user, and forgets any client secret verified against the
+    previous one, see `core.credential_cache`.
+
+    Args:
+        db (Session): The database session to use.
+        user_id (int): The ID of the user to update.
+        password (str): The new password, in plain text.
+
+    Returns:
+        User: The updated user, or None if no user was found.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        logger.warning("No user with ID {user_id} found", user_id=user_id)
+        return None
+    user.hashed_password = Hasher.get_password_hash(password=password)
+    db.commit()
+    db.refresh(user)
+    verified_credentials.forget_user(user.id)
+    logger.success("Password of user with ID {user_id} changed", user_id=user_id)
+    return user
+
+
 def authenticate_user(username: str, password: str, db: Session) -> User | None:
     """
     Authenticates a user by their username and password.
 
+    A password that was verified recently, against the user's current password hash, is
+    not verified with bcrypt again, see `core.credential_cache`.
+
     Args:
         username (str): The username of the user to authenticate.
         password (str): The password of the user to authenticate.
         db (Session): The database session to use.
 
     Returns:
-        User: The authenticated user if the credentials are valid, otherwise None.
+        User: The authenticated user if the credentials are valid and the user is
+            active, otherwise None.
     """
     user = retrieve_user_by_email(email=username, db=db)
-    if not user:
+    if not user or not user.is_active:
+        return None
+    if not verify_credentials(username, password, user):
+        return None
+    return user
+
+
+async def authenticate_user_async(username: str, password: str, db: Session) -> User | None:
+    """
+    Like `authenticate_user`, for async routes. The user is looked up on the thread pool
+    and the password verified in the password hashing pool, see `core.hashing`.
+
+    Raises:
+        PasswordHashingBusyError: If the password hashing pool's queue is full.
+    """
+    user = await run_in_threadpool(retrieve_user_by_email, email=username, db=db)
+    if not user or not user.is_active:
         return None
-    if not Hasher.verify_password(plain_password=password, hashed_password=user.hashed_password):
+    if not await verify_credentials_async(username, password, user):
         return None
     return user
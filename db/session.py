@@ -1,11 +1,14 @@
 import json
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 import pydantic.json
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from core.config import settings
+from db.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
 
 
 def _custom_json_serializer(*args, **kwargs) -> str:
@@ -15,8 +18,29 @@ def _custom_json_serializer(*args, **kwargs) -> str:
     return json.dumps(*args, default=pydantic.json.pydantic_encoder, **kwargs)
 
 
+def _pool_options() -> dict:
+    """
+    The connection pool options of `settings`, shared by the sync and async engines.
+    """
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    }
+
+
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(SQLALCHEMY_DATABASE_URL, json_serializer=_custom_json_serializer)
+# Sessions run in UTC, so that psycopg2 reads timestamps in UTC as asyncpg does, and the
+# Python serializer renders them as `db.pact_json` does.
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"options": "-c timezone=UTC"},
+    json_serializer=_custom_json_serializer,
+    poolclass=InstrumentedQueuePool,
+    **_pool_options(),
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -27,3 +51,39 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+AsyncSessionLocal = sessionmaker(class_=AsyncSession, autocommit=False, autoflush=False, expire_on_commit=False)
+_async_engine: AsyncEngine | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Returns the asyncpg engine for `settings.DATABASE_URL`, creating it on first use so
+    that asyncpg is only needed when `settings.DATABASE_ASYNC` is enabled.
+    """
+    global _async_engine
+    if _async_engine is None:
+        url = make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
+        _async_engine = create_async_engine(
+            url,
+            json_serializer=_custom_json_serializer,
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            **_pool_options(),
+        )
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """
+    Closes the connections of the asyncpg engine, if it was created.
+    """
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -0,0 +1,37 @@
+"""
+Exports every PACT footprint as NDJSON, one document per line, to a file or stdout,
+reading through a server-side cursor so that memory use stays flat.
+
+Usage:
+    python export_footprints.py --output footprints.ndjson
+"""
+import argparse
+import sys
+
+from db.repository.product_footprints import stream_product_footprint_documents
+from db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every PACT footprint as NDJSON")
+    parser.add_argument("--output", default="-", help="The file to write, or - for stdout")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows fetched per round trip")
+
+    args = parser.parse_args()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    exported = 0
+    try:
+        with SessionLocal() as db:
+            for document in stream_product_footprint_documents(db, batch_size=args.batch_size):
+                output.write(document)
+                output.write("\n")
+                exported += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"exported {exported}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
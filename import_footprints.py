@@ -0,0 +1,48 @@
+"""
+Imports PACT footprints in bulk, from an NDJSON or JSON file or a directory of them,
+see `db.footprint_import`.
+
+Usage:
+    python import_footprints.py footprints.ndjson --errors errors.ndjson
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from db.footprint_import import import_footprints
+from db.session import engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import PACT footprints in bulk")
+    parser.add_argument("path", type=Path, help="An NDJSON or JSON file, or a directory of them")
+    parser.add_argument("--workers", type=int, default=None, help="Validation processes, defaults to the CPU count")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Footprints validated per task")
+    parser.add_argument("--errors", type=Path, default=None, help="Write the invalid footprints' errors here, as NDJSON")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and merge, then roll back")
+
+    args = parser.parse_args()
+    if not args.path.exists():
+        parser.error(f"{args.path} does not exist")
+
+    report = import_footprints(
+        args.path, engine, workers=args.workers, chunk_size=args.chunk_size, dry_run=args.dry_run
+    )
+
+    if args.errors is not None:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            for error in report.errors:
+                f.write(json.dumps(error) + "\n")
+    else:
+        for error in report.errors:
+            print(json.dumps(error), file=sys.stderr)
+
+    print(
+        f"read {report.read}, imported {report.imported}, duplicates {report.duplicates}, "
+        f"invalid {len(report.errors)}{' (dry run, rolled back)' if args.dry_run else ''}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import jwt
+from authx import TokenPayload
+
+from core.auth_config import get_authx_security
+from core.authorization import (
+    SUPERUSER, UserClaims, create_user_access_token, has_role, remember_user_claims, user_claims, user_claims_cache
+)
+from db.models.user import User
+
+
+def _decoded_token(user: User) -> TokenPayload:
+    security = get_authx_security()
+    token = create_user_access_token(security, user)
+    return TokenPayload(**jwt.decode(token, security.config.JWT_SECRET_KEY, algorithms=["HS256"]))
+
+
+def test_user_claims():
+    assert user_claims(User(id=1, is_active=True, is_superuser=True)) == UserClaims(True, frozenset({SUPERUSER}))
+    assert user_claims(User(id=1, is_active=False, is_superuser=False)) == UserClaims(False, frozenset())
+
+
+def test_create_user_access_token_embeds_roles():
+    token = _decoded_token(User(id=7, is_active=True, is_superuser=True))
+
+    assert token.sub == "7"
+    assert token.type == "access"
+    assert token.roles == [SUPERUSER]
+    assert round(token.exp - token.iat) == 120
+
+
+def test_has_role_from_token_claims():
+    user_claims_cache.clear()
+
+    assert has_role(_decoded_token(User(id=7, is_active=True, is_superuser=True)), SUPERUSER)
+    assert not has_role(_decoded_token(User(id=8, is_active=True, is_superuser=False)), SUPERUSER)
+    assert not has_role(TokenPayload(sub="9"), SUPERUSER)
+
+
+def test_has_role_prefers_remembered_claims():
+    user_claims_cache.clear()
+    superuser = User(id=7, is_active=True, is_superuser=True)
+    token = _decoded_token(superuser)
+
+    remember_user_claims(User(id=7, is_active=True, is_superuser=False))
+    assert not has_role(token, SUPERUSER)
+
+    remember_user_claims(User(id=7, is_active=False, is_superuser=True))
+    assert not has_role(token, SUPERUSER)
+
+    remember_user_claims(superuser)
+    assert has_role(token, SUPERUSER)
+    user_claims_cache.clear()
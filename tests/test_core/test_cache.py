@@ -0,0 +1,120 @@
+from core.cache import CachedCount, LRUCache
+
+
+def test_cached_count_loads_once_within_ttl():
+    loads = []
+    count = CachedCount(ttl=60)
+
+    assert count.get(lambda: loads.append(1) or 5) == 5
+    assert count.get(lambda: loads.append(1) or 7) == 5
+    assert len(loads) == 1
+
+
+def test_cached_count_adjust_updates_cached_value():
+    count = CachedCount(ttl=60)
+    count.get(lambda: 5)
+
+    count.adjust(2)
+    count.adjust(-1)
+
+    assert count.get(lambda: 0) == 6
+
+
+def test_cached_count_adjust_without_cached_value_is_ignored():
+    count = CachedCount(ttl=60)
+
+    count.adjust(3)
+
+    assert count.get(lambda: 1) == 1
+
+
+def test_cached_count_reloads_after_ttl():
+    count = CachedCount(ttl=0)
+    count.get(lambda: 5)
+
+    assert count.get(lambda: 9) == 9
+
+
+def test_cached_count_invalidate_forces_reload():
+    count = CachedCount(ttl=60)
+    count.get(lambda: 5)
+
+    count.invalidate()
+
+    assert count.get(lambda: 9) == 9
+
+
+def test_lru_cache_counts_hits_and_misses():
+    cache = LRUCache(max_bytes=100, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", b"value", size=5)
+
+    assert cache.get("a") == b"value"
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1, "bytes": 5}
+
+
+def test_lru_cache_evicts_least_recently_used_to_stay_within_max_bytes():
+    cache = LRUCache(max_bytes=10, ttl=60)
+    cache.set("a", b"aaaa", size=4)
+    cache.set("b", b"bbbb", size=4)
+    cache.get("a")
+
+    cache.set("c", b"cccc", size=4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.evictions == 1
+    assert cache.stats()["bytes"] == 8
+
+
+def test_lru_cache_replacing_an_entry_updates_its_size():
+    cache = LRUCache(max_bytes=10, ttl=60)
+    cache.set("a", b"aaaa", size=4)
+
+    cache.set("a", b"aaaaaaaa", size=8)
+
+    assert cache.get("a") == b"aaaaaaaa"
+    assert cache.stats()["bytes"] == 8
+    assert cache.evictions == 0
+
+
+def test_lru_cache_does_not_store_values_larger_than_max_bytes():
+    cache = LRUCache(max_bytes=4, ttl=60)
+
+    cache.set("a", b"aaaaa", size=5)
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_cache_disabled_with_zero_max_bytes():
+    cache = LRUCache(max_bytes=0, ttl=60)
+
+    cache.set("a", b"a", size=1)
+
+    assert cache.get("a") is None
+
+
+def test_lru_cache_expires_entries_after_ttl():
+    cache = LRUCache(max_bytes=100, ttl=0)
+    cache.set("a", b"aaaa", size=4)
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_lru_cache_invalidate_and_clear():
+    cache = LRUCache(max_bytes=100, ttl=60)
+    cache.set("a", b"aaaa", size=4)
+    cache.set("b", b"bbbb", size=4)
+
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.get("b") == b"bbbb"
+
+    cache.clear()
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 0
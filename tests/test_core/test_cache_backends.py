@@ -0,0 +1,196 @@
+import os
+import socketserver
+import threading
+import time
+
+import pytest
+
+from core.cache_backends import (
+    DisabledCacheBackend, FileCacheBackend, MemcachedCacheBackend, MemoryCacheBackend, create_cache_backend
+)
+
+
+class MemcachedStandIn(socketserver.ThreadingTCPServer):
+    """
+    A minimal in-memory server for the get, set, delete and flush_all commands of the
+    memcached text protocol.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MemcachedHandler)
+        self.entries: dict[bytes, tuple[bytes, float]] = {}
+        self.lock = threading.Lock()
+
+
+class MemcachedHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        while line := self.rfile.readline():
+            command, *arguments = line.split()
+            with server.lock:
+                if command == b"get":
+                    value, expires_at = server.entries.get(arguments[0], (None, 0))
+                    if value is not None and expires_at > time.time():
+                        self.wfile.write(b"VALUE %s 0 %d\r\n%s\r\n" % (arguments[0], len(value), value))
+                    self.wfile.write(b"END\r\n")
+                elif command == b"set":
+                    value = self.rfile.read(int(arguments[3]) + 2)[:-2]
+                    server.entries[arguments[0]] = (value, time.time() + int(arguments[2]))
+                    self.wfile.write(b"STORED\r\n")
+                elif command == b"delete":
+                    found = server.entries.pop(arguments[0], None) is not None
+                    self.wfile.write(b"DELETED\r\n" if found else b"NOT_FOUND\r\n")
+                elif command == b"flush_all":
+                    server.entries.clear()
+                    self.wfile.write(b"OK\r\n")
+
+
+@pytest.fixture
+def memcached_server():
+    server = MemcachedStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "file", "memcached"])
+def make_backend(request, tmp_path, memcached_server):
+    def make(ttl=60):
+        if request.param == "memory":
+            return MemoryCacheBackend(max_bytes=1024, ttl=ttl)
+        if request.param == "file":
+            return FileCacheBackend(directory=str(tmp_path), max_bytes=1024, ttl=ttl)
+        return MemcachedCacheBackend(host="127.0.0.1", port=memcached_server.server_address[1], ttl=ttl)
+    return make
+
+
+def test_cache_backend_set_get_and_invalidate(make_backend):
+    cache = make_backend()
+
+    assert cache.get("3fa85f64-5717-4562-b3fc-2c963f66afa6") is None
+    cache.set("3fa85f64-5717-4562-b3fc-2c963f66afa6", b'"etag"\n{"data":{}}')
+    assert cache.get("3fa85f64-5717-4562-b3fc-2c963f66afa6") == b'"etag"\n{"data":{}}'
+
+    cache.invalidate("3fa85f64-5717-4562-b3fc-2c963f66afa6")
+    cache.invalidate("never-cached")
+    assert cache.get("3fa85f64-5717-4562-b3fc-2c963f66afa6") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_backend_keys_need_not_be_safe_names(make_backend):
+    cache = make_backend()
+
+    cache.set("../with spaces\r\nand/slashes", b"value")
+
+    assert cache.get("../with spaces\r\nand/slashes") == b"value"
+
+
+def test_cache_backend_clear(make_backend):
+    cache = make_backend()
+    cache.set("a", b"a")
+    cache.set("b", b"b")
+
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_cache_backend_is_shared_between_workers(make_backend, request):
+    if request.node.callspec.params["make_backend"] == "memory":
+        pytest.skip("Memory caches are per process and rely on broadcast invalidation")
+    worker1, worker2 = make_backend(), make_backend()
+
+    worker1.set("a", b"value")
+    assert worker2.get("a") == b"value"
+
+    worker2.invalidate("a")
+    assert worker1.get("a") is None
+
+
+def test_file_cache_backend_expires_entries(tmp_path):
+    cache = FileCacheBackend(directory=str(tmp_path), max_bytes=1024, ttl=0)
+
+    cache.set("a", b"value")
+
+    assert cache.get("a") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_file_cache_backend_prunes_least_recently_used(tmp_path):
+    cache = FileCacheBackend(directory=str(tmp_path), max_bytes=100, ttl=60, prune_interval=3)
+    cache.set("a", b"a" * 30)
+    time.sleep(0.01)
+    cache.set("b", b"b" * 30)
+    time.sleep(0.01)
+    cache.get("a")
+
+    cache.set("c", b"c" * 30)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" * 30
+    assert cache.get("c") == b"c" * 30
+
+
+@pytest.mark.parametrize("unavailable", [
+    pytest.param(
+        lambda directory: directory.chmod(0o500), id="read-only",
+        marks=pytest.mark.skipif(os.geteuid() == 0, reason="root writes to read-only directories"),
+    ),
+    pytest.param(lambda directory: directory.rmdir(), id="removed"),
+])
+def test_file_cache_backend_unavailable_directory_is_a_miss(tmp_path, unavailable):
+    directory = tmp_path / "cache"
+    cache = FileCacheBackend(directory=str(directory), max_bytes=1024, ttl=60, prune_interval=1)
+    unavailable(directory)
+    try:
+        cache.set("a", b"value")
+        cache.clear()
+
+        assert cache.get("a") is None
+    finally:
+        if directory.exists():
+            directory.chmod(0o700)
+
+
+def test_memcached_cache_backend_unavailable_server_is_a_miss(memcached_server):
+    port = memcached_server.server_address[1]
+    memcached_server.shutdown()
+    memcached_server.server_close()
+    cache = MemcachedCacheBackend(host="127.0.0.1", port=port, ttl=60)
+
+    cache.set("a", b"value")
+    cache.invalidate("a")
+
+    assert cache.get("a") is None
+
+
+def test_create_cache_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_CACHE_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_CACHE_SERVER", "cache.internal:11212")
+
+    assert isinstance(create_cache_backend("memory"), MemoryCacheBackend)
+    assert isinstance(create_cache_backend("file"), FileCacheBackend)
+    memcached = create_cache_backend("memcached")
+    assert (memcached.host, memcached.port) == ("cache.internal", 11212)
+    with pytest.raises(ValueError):
+        create_cache_backend("redis")
+
+
+@pytest.mark.parametrize("backend", ["memory", "file", "memcached"])
+def test_create_cache_backend_disabled(monkeypatch, tmp_path, backend):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_CACHE_DIRECTORY", str(tmp_path / "cache"))
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_CACHE_MAX_BYTES", 0)
+
+    cache = create_cache_backend(backend)
+    cache.set("a", b"value")
+
+    assert isinstance(cache, DisabledCacheBackend)
+    assert cache.get("a") is None
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,75 @@
+from core.credential_cache import VerifiedCredentialCache
+from db.models.user import User
+
+
+def _user(id=1, hashed_password="hash"):
+    return User(id=id, hashed_password=hashed_password)
+
+
+def test_verified_after_remember():
+    cache = VerifiedCredentialCache(max_entries=10, ttl=60)
+    user = _user()
+
+    assert cache.verified("client", "secret", user) is False
+    cache.remember("client", "secret", user)
+
+    assert cache.verified("client", "secret", user) is True
+    assert cache.verified("client", "other secret", user) is False
+    assert cache.verified("clientsecret", "", user) is False
+    assert cache.stats() == {"hits": 1, "misses": 3, "entries": 1}
+
+
+def test_not_verified_against_another_password_or_user():
+    cache = VerifiedCredentialCache(max_entries=10, ttl=60)
+    cache.remember("client", "secret", _user())
+
+    assert cache.verified("client", "secret", _user(id=2)) is False
+    cache.remember("client", "secret", _user())
+    assert cache.verified("client", "secret", _user(hashed_password="new hash")) is False
+    # A mismatch drops the entry.
+    assert cache.verified("client", "secret", _user()) is False
+
+
+def test_entries_expire():
+    cache = VerifiedCredentialCache(max_entries=10, ttl=0)
+    cache.remember("client", "secret", _user())
+
+    assert cache.verified("client", "secret", _user()) is False
+    assert cache.stats()["entries"] == 0
+
+
+def test_forget_user():
+    cache = VerifiedCredentialCache(max_entries=10, ttl=60)
+    cache.remember("client", "secret", _user())
+    cache.remember("client", "old secret", _user())
+    cache.remember("other client", "secret", _user(id=2))
+
+    cache.forget_user(1)
+
+    assert cache.verified("client", "secret", _user()) is False
+    assert cache.verified("client", "old secret", _user()) is False
+    assert cache.verified("other client", "secret", _user(id=2)) is True
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = VerifiedCredentialCache(max_entries=2, ttl=60)
+    for id in (1, 2):
+        cache.remember(f"client {id}", "secret", _user(id=id))
+    cache.verified("client 1", "secret", _user(id=1))
+
+    cache.remember("client 3", "secret", _user(id=3))
+
+    assert cache.verified("client 1", "secret", _user(id=1)) is True
+    assert cache.verified("client 2", "secret", _user(id=2)) is False
+    assert cache.verified("client 3", "secret", _user(id=3)) is True
+
+
+def test_disabled_cache():
+    cache = VerifiedCredentialCache(max_entries=0, ttl=60)
+    cache.remember("client", "secret", _user())
+
+    assert cache.verified("client", "secret", _user()) is False
+
+
+def test_keys_differ_between_caches():
+    assert VerifiedCredentialCache(10, 60)._digest("client", "secret") != VerifiedCredentialCache(10, 60)._digest("client", "secret")
@@ -2,7 +2,7 @@ import json
 
 from core.error_responses import (
     AccessDeniedError, BadRequestError, NoSuchFootprintError,
-    NotImplementedError, TokenExpiredError, InternalError, DuplicateEntryError
+    NotImplementedError, TokenExpiredError, InternalError, DuplicateEntryError, ServiceUnavailableError, TooManyRequestsError
 )
 
 
@@ -61,3 +61,23 @@ def test_error_response_to_json_response():
     assert json.loads(json_response.body.decode("utf-8"))["message"] == error.message
     assert json.loads(json_response.body.decode("utf-8"))["code"] == error.code
     assert json_response.status_code == error.status_code
+
+
+def test_service_unavailable_error():
+    error = ServiceUnavailableError(retry_after=2)
+    assert error.code == "ServiceUnavailable"
+    assert error.status_code == 503
+
+    response = error.to_json_response()
+    assert response.headers["Retry-After"] == "2"
+    assert json.loads(response.body) == {"message": "The service is busy, try again later", "code": "ServiceUnavailable"}
+
+
+def test_too_many_requests_error():
+    error = TooManyRequestsError(retry_after=3)
+    assert error.code == "TooManyRequests"
+    assert error.status_code == 429
+
+    response = error.to_json_response()
+    assert response.headers["Retry-After"] == "3"
+    assert json.loads(response.body) == {"message": "Too many requests, try again later", "code": "TooManyRequests"}
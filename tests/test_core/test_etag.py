@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from core.etag import footprint_etag, if_none_match
+
+
+UPDATED = datetime(2023, 7, 1, tzinfo=timezone.utc)
+
+
+def test_footprint_etag_is_strong_and_stable():
+    etag = footprint_etag("3fa85f64-5717-4562-b3fc-2c963f66afa6", 1, UPDATED)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert not etag.startswith("W/")
+    assert etag == footprint_etag("3fa85f64-5717-4562-b3fc-2c963f66afa6", 1, UPDATED)
+
+
+@pytest.mark.parametrize("version, updated", [
+    (2, UPDATED),
+    (1, datetime(2023, 7, 2, tzinfo=timezone.utc)),
+    (1, None),
+])
+def test_footprint_etag_changes_with_version_and_updated(version, updated):
+    etag = footprint_etag("3fa85f64-5717-4562-b3fc-2c963f66afa6", 1, UPDATED)
+
+    assert footprint_etag("3fa85f64-5717-4562-b3fc-2c963f66afa6", version, updated) != etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+    ('abc', False),
+])
+def test_if_none_match(header, expected):
+    assert if_none_match(header, '"abc"') is expected
@@ -1,4 +1,8 @@
-from core.hashing import Hasher
+import asyncio
+
+import pytest
+
+from core.hashing import Hasher, PasswordHashingBusyError, PasswordHashingPool
 
 
 def test_hashing_and_verification():
@@ -19,3 +23,53 @@ def test_hash_salting():
     hash1 = Hasher.get_password_hash(password=password)
     hash2 = Hasher.get_password_hash(password=password)
     assert hash1 != hash2  # Different hashes due to salting
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_password_hashing_pool_runs_jobs():
+    pool = PasswordHashingPool(workers=1, queue_limit=1)
+    hashed_password = await pool.run(Hasher.get_password_hash, password="mysecurepassword")
+
+    assert await pool.run(Hasher.verify_password, plain_password="mysecurepassword", hashed_password=hashed_password)
+    assert not await pool.run(Hasher.verify_password, plain_password="wrong", hashed_password=hashed_password)
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["in_flight"], stats["queued"]) == (3, 0, 0, 0)
+    assert sum(stats["wait_seconds_histogram"].values()) == 3
+
+
+@pytest.mark.anyio
+async def test_password_hashing_pool_turns_jobs_away_when_full():
+    pool = PasswordHashingPool(workers=1, queue_limit=1)
+    running = asyncio.create_task(pool.run(Hasher.get_password_hash, password="first"))
+    queued = asyncio.create_task(pool.run(Hasher.get_password_hash, password="second"))
+    await asyncio.sleep(0)
+
+    assert pool.stats()["queued"] == 1
+    with pytest.raises(PasswordHashingBusyError):
+        await pool.run(Hasher.get_password_hash, password="third")
+
+    await asyncio.gather(running, queued)
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+@pytest.mark.anyio
+async def test_password_hashing_pool_without_workers_uses_threads():
+    pool = PasswordHashingPool(workers=0, queue_limit=0)
+
+    assert Hasher.verify_password(
+        plain_password="password", hashed_password=await pool.run(Hasher.get_password_hash, password="password")
+    )
+    assert pool._executor is None
+
+
+@pytest.mark.anyio
+async def test_hasher_async_api():
+    hashed_password = await Hasher.get_password_hash_async(password="mysecurepassword")
+
+    assert await Hasher.verify_password_async(plain_password="mysecurepassword", hashed_password=hashed_password)
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from loguru import logger
+
+from core.logger import SampledLogger, _sampling_rates, sampled_logger
+
+
+@pytest.fixture
+def records():
+    records = []
+    handler_id = logger.add(records.append, level="DEBUG", format="{message}")
+    yield records
+    logger.remove(handler_id)
+
+
+def test_sampled_logger_passes_on_one_in_every(records):
+    sampled = SampledLogger("tests", every=3)
+    for index in range(7):
+        sampled.debug("Line {index}", index=index)
+
+    assert [record.record["message"] for record in records] == ["Line 0", "Line 3", "Line 6"]
+    assert records[0].record["extra"] == {"index": 0, "sampled_every": 3}
+
+
+def test_sampled_logger_drops_every_line_when_disabled(records):
+    sampled = SampledLogger("tests", every=0)
+    sampled.debug("Line {index}", index=0)
+
+    assert records == []
+
+
+def test_sampled_logger_counts_per_logger(records):
+    first, second = SampledLogger("first", every=2), SampledLogger("second", every=2)
+    first.debug("first")
+    second.debug("second")
+
+    assert [record.record["message"] for record in records] == ["first", "second"]
+
+
+def test_sampled_logger_reports_the_caller(records):
+    SampledLogger("tests", every=1).debug("Line")
+
+    assert records[0].record["function"] == "test_sampled_logger_reports_the_caller"
+
+
+def test_sampled_logger_configuration(monkeypatch):
+    monkeypatch.setattr("core.logger.DEBUG_ENABLED", True)
+    monkeypatch.setattr("core.logger._SAMPLING_RATES", {"db.repository.users": 10})
+    monkeypatch.setattr("core.logger.settings.LOG_DEBUG_SAMPLE_EVERY", 100)
+
+    assert sampled_logger("db.repository.users").every == 10
+    assert sampled_logger("core.pagination").every == 100
+
+    monkeypatch.setattr("core.logger.DEBUG_ENABLED", False)
+    assert sampled_logger("db.repository.users").every == 0
+
+
+def test_sampling_rates():
+    assert _sampling_rates("") == {}
+    assert _sampling_rates("db.repository.users=10, core.pagination = 100,") == {
+        "db.repository.users": 10, "core.pagination": 100
+    }
+
+
+def test_messages_are_formatted_lazily():
+    class Unformattable:
+        def __format__(self, format_spec):
+            raise AssertionError("a line below the level of every sink is not formatted")
+
+    logger.trace("Value {value}", value=Unformattable())
+
+
+def test_fields_are_written_as_json():
+    lines = []
+    handler_id = logger.add(lines.append, level="INFO", serialize=True)
+    try:
+        logger.info("Retrieving user with email {email}", email="user@example.com")
+    finally:
+        logger.remove(handler_id)
+
+    record = json.loads(lines[0])["record"]
+    assert record["message"] == "Retrieving user with email user@example.com"
+    assert record["extra"] == {"email": "user@example.com"}
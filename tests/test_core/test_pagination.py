@@ -0,0 +1,50 @@
+import pytest
+
+from core.config import settings
+from core.pagination import (
+    JSONAPIPage, JSONAPIParams, decode_cursor, encode_cursor, render_json_page, stream_json_page
+)
+
+
+def test_jsonapi_params_defaults_to_default_page_size():
+    raw_params = JSONAPIParams(limit=None, offset=None).to_raw_params()
+
+    assert raw_params.limit == settings.PAGINATION_DEFAULT_LIMIT
+    assert raw_params.offset == 0
+
+
+def test_jsonapi_params_lowers_limit_to_maximum_page_size():
+    raw_params = JSONAPIParams(limit=settings.PAGINATION_MAX_LIMIT + 1, offset=None).to_raw_params()
+
+    assert raw_params.limit == settings.PAGINATION_MAX_LIMIT
+
+
+def test_jsonapi_params_passes_through_limit_and_offset():
+    raw_params = JSONAPIParams(limit=10, offset=20).to_raw_params()
+
+    assert raw_params.limit == 10
+    assert raw_params.offset == 20
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(1)[:-2] + "!!"])
+def test_decode_cursor_rejects_malformed_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("total", [7, None])
+def test_render_json_page_matches_jsonapi_page(total):
+    items = [{"a": 1}, {"b": [1.5, None]}]
+    page = JSONAPIPage[dict].create(items, JSONAPIParams(limit=2, offset=0), total=total)
+
+    assert render_json_page(['{"a":1}', '{"b":[1.5,null]}'], total=total) == page.model_dump_json()
+
+
+@pytest.mark.parametrize("documents", [[], ['{"a":1}'], ['{"a":1}', '{"b":[1.5,null]}']])
+@pytest.mark.parametrize("total", [7, None])
+def test_stream_json_page_matches_render_json_page(documents, total):
+    assert "".join(stream_json_page(iter(documents), total=total)) == render_json_page(documents, total=total)
@@ -0,0 +1,146 @@
+import threading
+
+import pytest
+from starlette.datastructures import Address
+
+from core.rate_limit import (
+    FileRateLimitBackend, MemoryRateLimitBackend, RateLimit, RateLimitExceededError, client_address,
+    create_rate_limit_backend
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["memory", "file"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryRateLimitBackend(max_entries=100)
+    return FileRateLimitBackend(directory=str(tmp_path))
+
+
+def test_rate_limit_backend_allows_a_burst(backend):
+    assert [backend.take("client", rate=1, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert 0 < backend.take("client", rate=1, burst=3) <= 1
+
+
+def test_rate_limit_backend_refills(backend, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.rate_limit.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("core.rate_limit.time.time", lambda: now[0])
+
+    backend.take("client", rate=2, burst=1)
+    assert backend.take("client", rate=2, burst=1) == pytest.approx(0.5)
+
+    now[0] += 0.5
+    assert backend.take("client", rate=2, burst=1) == 0
+    now[0] += 60
+    assert [backend.take("client", rate=2, burst=1) for _ in range(2)][1] > 0
+
+
+def test_rate_limit_backend_keeps_a_bucket_per_key(backend):
+    backend.take("client", rate=1, burst=1)
+
+    assert backend.take("client", rate=1, burst=1) > 0
+    assert backend.take("other", rate=1, burst=1) == 0
+
+
+def test_rate_limit_backend_clear(backend):
+    backend.take("client", rate=1, burst=1)
+    backend.clear()
+
+    assert backend.take("client", rate=1, burst=1) == 0
+
+
+def test_memory_rate_limit_backend_drops_least_recently_seen():
+    backend = MemoryRateLimitBackend(max_entries=2)
+    for key in ["a", "b", "a", "c"]:
+        backend.take(key, rate=1, burst=1)
+
+    assert backend.take("b", rate=1, burst=1) == 0
+    assert backend.take("a", rate=1, burst=1) == 0
+
+
+def test_file_rate_limit_backend_is_shared_between_instances(tmp_path):
+    first = FileRateLimitBackend(directory=str(tmp_path))
+    second = FileRateLimitBackend(directory=str(tmp_path))
+
+    def take_many():
+        for _ in range(25):
+            first.take("client", rate=0.001, burst=50)
+            second.take("client", rate=0.001, burst=50)
+
+    threads = [threading.Thread(target=take_many) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert first.take("client", rate=0.001, burst=50) > 0
+
+
+def test_file_rate_limit_backend_prunes_idle_buckets(tmp_path):
+    backend = FileRateLimitBackend(directory=str(tmp_path), prune_after=-1)
+    backend.take("client", rate=1, burst=1)
+    backend.prune()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_create_rate_limit_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr("core.rate_limit.settings.RATE_LIMIT_DIRECTORY", str(tmp_path))
+
+    assert isinstance(create_rate_limit_backend("memory"), MemoryRateLimitBackend)
+    assert isinstance(create_rate_limit_backend("file"), FileRateLimitBackend)
+    with pytest.raises(ValueError):
+        create_rate_limit_backend("redis")
+
+
+class _Request:
+    client = None
+
+
+@pytest.mark.anyio
+async def test_rate_limit_raises_when_the_client_has_no_token_left():
+    async def client(request):
+        return "client"
+
+    limit = RateLimit("group", rate=1, burst=2, client=client, backend=MemoryRateLimitBackend(max_entries=10))
+    await limit(_Request())
+    await limit(_Request())
+
+    with pytest.raises(RateLimitExceededError) as error:
+        await limit(_Request())
+    assert 0 < error.value.retry_after <= 1
+
+
+@pytest.mark.anyio
+async def test_rate_limit_disabled():
+    async def client(request):
+        raise AssertionError("a disabled limit does not identify the client")
+
+    limit = RateLimit("group", rate=0, burst=1, client=client, backend=MemoryRateLimitBackend(max_entries=10))
+    for _ in range(3):
+        await limit(_Request())
+
+
+@pytest.mark.anyio
+async def test_rate_limit_falls_back_to_the_client_address():
+    async def client(request):
+        return None
+
+    backend = MemoryRateLimitBackend(max_entries=10)
+    limit = RateLimit("group", rate=1, burst=1, client=client, backend=backend)
+    await limit(_Request())
+
+    assert backend.take("group:address:unknown", rate=1, burst=1) > 0
+
+
+@pytest.mark.anyio
+async def test_client_address():
+    class Request:
+        client = Address("192.0.2.1", 50000)
+
+    assert await client_address(Request()) == "address:192.0.2.1"
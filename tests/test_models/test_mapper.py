@@ -0,0 +1,40 @@
+import pytest
+
+from db.mapper import product_footprint_mapper, to_product_footprint_schema
+from db.repository.product_footprints import create_new_product_footprint, retrieve_product_footprint
+from schemas.product_footprint import ProductFootprint
+
+
+@pytest.fixture
+def stored_product_footprint(db_session, valid_json_product_footprint):
+    schema = ProductFootprint(**valid_json_product_footprint)
+    create_new_product_footprint(schema, db_session)
+    db_session.expire_all()
+    return schema, retrieve_product_footprint(str(schema.id), db_session)
+
+
+def test_mapper_covers_every_schema_field():
+    mapped_fields = [field_name for field_name, *_ in product_footprint_mapper.fields]
+    assert mapped_fields == list(ProductFootprint.model_fields)
+
+    pcf_mapper = product_footprint_mapper.fields[mapped_fields.index("pcf")][2]
+    assert "pCfExcludingBiogenic" in [field_name for field_name, *_ in pcf_mapper.fields]
+    assert "dLucGhgEmissions" in [field_name for field_name, *_ in pcf_mapper.fields]
+
+
+@pytest.mark.parametrize("trusted", [True, False])
+def test_to_product_footprint_schema_round_trips(stored_product_footprint, trusted):
+    schema, product_footprint = stored_product_footprint
+
+    mapped = to_product_footprint_schema(product_footprint, trusted=trusted)
+
+    assert mapped.model_dump(mode="json") == schema.model_dump(mode="json")
+
+
+def test_trusted_and_validated_paths_serialise_identically(stored_product_footprint):
+    _, product_footprint = stored_product_footprint
+
+    trusted = to_product_footprint_schema(product_footprint, trusted=True)
+    validated = to_product_footprint_schema(product_footprint, trusted=False)
+
+    assert trusted.model_dump_json() == validated.model_dump_json()
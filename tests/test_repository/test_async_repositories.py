@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from db.mapper import to_product_footprint_schema
+from db.repository import async_product_footprints, async_users, product_footprints
+from db.repository.product_footprints import product_footprint_cache
+from db.session import AsyncSessionLocal
+from schemas.product_footprint import ProductFootprint
+from schemas.user import UserCreate
+from tests.conftest import SQLALCHEMY_DATABASE_URL, SessionTesting, engine
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_db(app):
+    # Connections are not pooled, as asyncpg connections are tied to the event loop of a test.
+    async_engine = create_async_engine(
+        make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg"), poolclass=NullPool
+    )
+    async with AsyncSessionLocal(bind=async_engine) as db:
+        yield db
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def product_footprint(valid_json_product_footprint):
+    return ProductFootprint(**valid_json_product_footprint)
+
+
+@pytest.mark.anyio
+async def test_async_create_and_retrieve_product_footprint(async_db, product_footprint):
+    product_footprint_cache.set(str(product_footprint.id), b"stale")
+
+    await async_product_footprints.create_new_product_footprint(product_footprint, async_db)
+
+    assert product_footprint_cache.get(str(product_footprint.id)) is None
+    retrieved = await async_product_footprints.retrieve_product_footprint(str(product_footprint.id), async_db)
+    assert to_product_footprint_schema(retrieved) == product_footprint
+    version = await async_product_footprints.retrieve_product_footprint_version(str(product_footprint.id), async_db)
+    assert version.version == product_footprint.version
+
+
+@pytest.mark.anyio
+async def test_async_product_footprints_match_sync(async_db, product_footprint):
+    await async_product_footprints.create_new_product_footprint(product_footprint, async_db)
+    id = str(product_footprint.id)
+
+    sync_db = SessionTesting(bind=engine)
+    try:
+        for name in ["retrieve_product_footprint_json", "retrieve_product_footprint_document"]:
+            expected = getattr(product_footprints, name)(id=id, db=sync_db)
+            assert await getattr(async_product_footprints, name)(id=id, db=async_db) == expected
+        for name in ["list_product_footprints_json", "list_product_footprint_documents"]:
+            expected = getattr(product_footprints, name)(db=sync_db, limit=10)
+            assert await getattr(async_product_footprints, name)(db=async_db, limit=10) == expected
+        assert await async_product_footprints.count_product_footprints(async_db) == 1
+        assert await async_product_footprints.estimate_product_footprints(async_db) == 1
+    finally:
+        sync_db.close()
+
+
+@pytest.mark.anyio
+async def test_async_list_product_footprints_pagination(async_db, product_footprint):
+    assert await async_product_footprints.list_product_footprints(async_db) is None
+    await async_product_footprints.create_new_product_footprint(product_footprint, async_db)
+
+    product_footprints_page = await async_product_footprints.list_product_footprints(async_db, limit=1)
+    assert [row.id for row in product_footprints_page] == [str(product_footprint.id)]
+    after = await async_product_footprints.list_product_footprints(async_db, after_pk=product_footprints_page[0].pk)
+    assert after is None
+
+
+@pytest.mark.anyio
+async def test_async_stream_product_footprint_documents(async_db, product_footprint):
+    await async_product_footprints.create_new_product_footprint(product_footprint, async_db)
+    document = await async_product_footprints.retrieve_product_footprint_document(str(product_footprint.id), async_db)
+
+    streamed = async_product_footprints.stream_product_footprint_documents(async_db, limit=1)
+    assert [each async for each in streamed] == [document]
+    rows, last_pk, has_more = await async_product_footprints.retrieve_page_bounds(async_db, limit=1)
+    assert (rows, has_more) == (1, False)
+    assert [each async for each in async_product_footprints.stream_product_footprint_documents(async_db, after_pk=last_pk)] == []
+
+
+@pytest.mark.anyio
+async def test_async_lazy_loading_is_not_supported(async_db):
+    with pytest.raises(ValueError):
+        await async_product_footprints.list_product_footprints(async_db, loading_strategy="lazy")
+
+
+@pytest.mark.anyio
+async def test_async_create_and_authenticate_user(async_db):
+    user = UserCreate(username="asyncuser", email="asyncuser@example.com", password="asyncpassword")
+
+    created = await async_users.create_new_user(user, async_db)
+    with pytest.raises(ValueError):
+        await async_users.create_new_user(user, async_db)
+
+    assert (await async_users.retrieve_user_by_id(db=async_db, user_id=created.id)).email == user.email
+    assert await async_users.authenticate_user("asyncuser@example.com", "asyncpassword", async_db) is not None
+    assert await async_users.authenticate_user("asyncuser@example.com", "wrong", async_db) is None
+    assert await async_users.authenticate_user("nobody@example.com", "asyncpassword", async_db) is None
+
+
+@pytest.mark.anyio
+async def test_async_password_change_and_deactivation_forget_verified_credentials(async_db):
+    user = UserCreate(username="asyncuser", email="asyncuser@example.com", password="asyncpassword")
+    created = await async_users.create_new_user(user, async_db)
+    assert await async_users.authenticate_user("asyncuser@example.com", "asyncpassword", async_db) is not None
+
+    await async_users.update_user_password(db=async_db, user_id=created.id, password="newpassword")
+    assert await async_users.authenticate_user("asyncuser@example.com", "asyncpassword", async_db) is None
+    assert await async_users.authenticate_user("asyncuser@example.com", "newpassword", async_db) is not None
+
+    await async_users.update_user(db=async_db, user_id=created.id, is_active=False)
+    assert await async_users.authenticate_user("asyncuser@example.com", "newpassword", async_db) is None
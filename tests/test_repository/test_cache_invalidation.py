@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from core.app_config import create_app
+from core.cache_backends import MemoryCacheBackend
+from db.cache_invalidation import InvalidationListener, broadcast_invalidation
+from tests.conftest import SQLALCHEMY_DATABASE_URL, SessionTesting, engine
+
+
+@pytest.fixture
+def worker_cache():
+    cache = MemoryCacheBackend(max_bytes=1024, ttl=60)
+    dsn = make_url(SQLALCHEMY_DATABASE_URL).render_as_string(hide_password=False)
+    listener = InvalidationListener(dsn=dsn, cache=cache, poll_interval=0.05)
+    listener.start()
+    yield cache
+    listener.stop()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_committed_invalidations_reach_other_workers(worker_cache):
+    worker_cache.set("a", b"value")
+    worker_cache.set("b", b"value")
+
+    session = SessionTesting(bind=engine)
+    broadcast_invalidation(session, "a")
+    session.commit()
+    session.close()
+
+    assert wait_for(lambda: worker_cache.cache.get("a") is None)
+    assert worker_cache.cache.get("b") == b"value"
+
+
+def test_rolled_back_invalidations_are_not_broadcast(worker_cache):
+    worker_cache.set("a", b"value")
+
+    session = SessionTesting(bind=engine)
+    broadcast_invalidation(session, "a")
+    session.rollback()
+    session.close()
+
+    # A committed invalidation sent afterwards acts as a marker that the first one was
+    # not delivered before it.
+    worker_cache.set("marker", b"value")
+    session = SessionTesting(bind=engine)
+    broadcast_invalidation(session, "marker")
+    session.commit()
+    session.close()
+
+    assert wait_for(lambda: worker_cache.cache.get("marker") is None)
+    assert worker_cache.cache.get("a") == b"value"
+
+
+def _invalidation_listeners(app) -> list:
+    return [
+        handler for handler in app.router.on_startup
+        if isinstance(getattr(handler, "__self__", None), InvalidationListener)
+    ]
+
+
+def test_app_listens_for_invalidations_of_a_memory_cache(monkeypatch):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_CACHE_BACKEND", "memory")
+
+    assert len(_invalidation_listeners(create_app())) == 1
+
+
+def test_app_does_not_listen_for_invalidations_when_the_cache_is_disabled(monkeypatch):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_CACHE_BACKEND", "memory")
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_CACHE_MAX_BYTES", 0)
+
+    assert _invalidation_listeners(create_app()) == []
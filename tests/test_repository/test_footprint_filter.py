@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from db.footprint_filter import MAX_FILTER_DEPTH, MAX_FILTER_LENGTH, parse_footprint_filter
+from db.repository.product_footprints import (
+    count_product_footprints, create_new_product_footprint, list_product_footprints
+)
+from schemas.product_footprint import ProductFootprint
+
+
+def _sql(expression: str) -> str:
+    return str(parse_footprint_filter(expression).compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize("expression", [None, "", "   "])
+def test_parse_footprint_filter_without_filter(expression):
+    assert parse_footprint_filter(expression) is None
+
+
+def test_parse_footprint_filter_compiles_comparisons():
+    clause = parse_footprint_filter("(created ge '2023-01-01T00:00:00.000Z') and productCategoryCpc eq 'it''s'")
+
+    assert _sql("created ge '2023-01-01T00:00:00.000Z'") == "productfootprint.created >= %(created_1)s"
+    assert clause.compile().params == {
+        "created_1": datetime(2023, 1, 1, tzinfo=timezone.utc), "productCategoryCpc_1": "it's"
+    }
+
+
+@pytest.mark.parametrize("timestamp, expected", [
+    ("2023-01-01T00:00:00.000Z", datetime(2023, 1, 1, tzinfo=timezone.utc)),
+    ("2023-01-01T00:00:00Z", datetime(2023, 1, 1, tzinfo=timezone.utc)),
+    ("2023-01-01T00:00:00.5Z", datetime(2023, 1, 1, 0, 0, 0, 500000, tzinfo=timezone.utc)),
+    ("2023-01-01T02:00:00+02:00", datetime(2023, 1, 1, tzinfo=timezone.utc)),
+])
+def test_parse_footprint_filter_timestamps(timestamp, expected):
+    assert parse_footprint_filter(f"updated lt '{timestamp}'").compile().params == {"updated_1": expected}
+
+
+@pytest.mark.parametrize("timestamp", ["2023-01-01T00:00:00", "yesterday"])
+def test_parse_footprint_filter_rejects_timestamps_without_time_zone(timestamp):
+    with pytest.raises(ValueError):
+        parse_footprint_filter(f"updated lt '{timestamp}'")
+
+
+def test_parse_footprint_filter_allows_nesting_up_to_the_maximum_depth():
+    expression = "(" * MAX_FILTER_DEPTH + "productCategoryCpc eq '1'" + ")" * MAX_FILTER_DEPTH
+
+    assert _sql(expression) == _sql("productCategoryCpc eq '1'")
+
+
+def test_parse_footprint_filter_compiles_carbon_footprint_properties_to_exists():
+    sql = _sql("pcf/geographyCountry eq 'DE'")
+
+    assert sql.startswith("EXISTS (SELECT *")
+    assert "FROM carbonfootprint" in sql
+    assert "FROM productfootprint" not in sql
+
+
+@pytest.mark.parametrize("expression", [
+    "productIds/any(productId:(productId eq 'urn:a'))",
+    "productIds/any(id:id eq 'urn:a')",
+])
+def test_parse_footprint_filter_compiles_any_to_containment(expression):
+    assert _sql(expression) == 'productfootprint."productIds" @> %(productIds_1)s::VARCHAR[]'
+
+
+@pytest.mark.parametrize("expression", [
+    "productCategoryCpc eq '1' or productCategoryCpc eq '2'",
+    "not productCategoryCpc eq '1'",
+    "productCategoryCpc ne '1'",
+    "companyName eq 'Acme'",
+    "productCategoryCpc eq 22222",
+    "productCategoryCpc eq 'unterminated",
+    "(productCategoryCpc eq '1'",
+    "created ge '2023-01-01T00:00:00'",
+    "created ge 'yesterday'",
+    "productIds/any(productId:(other eq 'urn:a'))",
+    "productIds/any(productId:(productId lt 'urn:a'))",
+    "productCategoryCpc eq '1' and",
+    "productCategoryCpc eq '1' ; drop table productfootprint",
+    "productCategoryCpc eq '" + "1" * MAX_FILTER_LENGTH + "'",
+    "(" * (MAX_FILTER_DEPTH + 1) + "productCategoryCpc eq '1'" + ")" * (MAX_FILTER_DEPTH + 1),
+    "(" * 600 + "created eq '2023-01-01T00:00:00Z'" + ")" * 600,
+])
+def test_parse_footprint_filter_rejects_unsupported_expressions(expression):
+    with pytest.raises(ValueError):
+        parse_footprint_filter(expression)
+
+
+def test_filters_select_matching_footprints(db_session, valid_json_product_footprint):
+    data = valid_json_product_footprint
+    germany = {**data, "id": "90163d8f-8465-4a6f-9e43-a58d68bef72f", "productIds": ["urn:a", "urn:b"]}
+    germany["pcf"] = {**data["pcf"], "geographyCountry": "DE"}
+    other = {**data, "id": "80b79a90-0dbc-48d0-b910-551c09037d61", "productIds": ["urn:c"]}
+    for each in (germany, other):
+        create_new_product_footprint(ProductFootprint(**each), db_session)
+
+    def matching(expression: str) -> list[str]:
+        where = parse_footprint_filter(expression)
+        assert count_product_footprints(db_session, where=where) == len(list_product_footprints(db_session, where=where) or [])
+        return [product_footprint.id for product_footprint in list_product_footprints(db_session, where=where) or []]
+
+    assert matching("pcf/geographyCountry eq 'DE'") == [germany["id"]]
+    assert matching("productIds/any(productId:(productId eq 'urn:b'))") == [germany["id"]]
+    assert matching("productIds/any(productId:(productId eq 'urn:c')) and pcf/geographyCountry eq 'DE'") == []
+    assert matching("pcf/referencePeriodStart ge '2000-01-01T00:00:00Z'") == [germany["id"], other["id"]]
@@ -0,0 +1,104 @@
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+from db.footprint_import import import_footprints, read_footprints
+from db.mapper import to_product_footprint_schema
+from db.repository.product_footprints import (
+    create_new_product_footprint, count_product_footprints, retrieve_product_footprint,
+    retrieve_product_footprint_document
+)
+from schemas.product_footprint import ProductFootprint
+from tests.conftest import SessionTesting, engine
+
+
+SAMPLE_FOOTPRINT = Path(__file__).resolve().parents[2] / "docs" / "valid_test_product_footprint.json"
+
+
+@pytest.fixture
+def sample_footprint_data():
+    with open(SAMPLE_FOOTPRINT) as f:
+        data = json.load(f)
+    # Values that are easy to get wrong in COPY text: escapes, tabs, non ASCII text,
+    # quotes in array elements, SQL NULLs next to JSON nulls, and nested JSONB.
+    data["comment"] = "Line one\nline\ttwo \\ \"three\" é \U0001f600"
+    data["productIds"] = ["urn:a", "urn:with \"quotes\", commas and \\ {braces}"]
+    data["pcf"]["aircraftGhgEmissions"] = None
+    data["pcf"]["dqi"] = {"b": [1.5, {"x": None}, 2, True, "s"], "a": 1e-7}
+    data["pcf"]["assurance"] = None
+    return data
+
+
+def _footprint(data: dict, id: str | None = None) -> dict:
+    return {**data, "id": id or str(uuid.uuid4())}
+
+
+def _write_ndjson(path: Path, items: list):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write((item if isinstance(item, str) else json.dumps(item)) + "\n")
+
+
+def test_import_footprints_matches_orm(app, sample_footprint_data, tmp_path):
+    footprints = [_footprint(sample_footprint_data) for _ in range(3)]
+    _write_ndjson(tmp_path / "footprints.ndjson", footprints)
+
+    report = import_footprints(tmp_path / "footprints.ndjson", engine, workers=2, chunk_size=2)
+
+    assert (report.read, report.imported, report.duplicates, report.errors) == (3, 3, 0, [])
+    with SessionTesting() as db:
+        assert count_product_footprints(db) == 3
+        for data in footprints:
+            stored = to_product_footprint_schema(retrieve_product_footprint(data["id"], db))
+            assert stored == ProductFootprint(**data)
+            assert retrieve_product_footprint_document(data["id"], db) == stored.model_dump_json()
+
+
+def test_import_footprints_reports_duplicates_and_invalid_items(app, sample_footprint_data, tmp_path):
+    stored = _footprint(sample_footprint_data)
+    with SessionTesting() as db:
+        create_new_product_footprint(ProductFootprint(**stored), db)
+
+    new = _footprint(sample_footprint_data)
+    repeated = {**new, "comment": "a later copy"}
+    (tmp_path / "nested").mkdir()
+    _write_ndjson(tmp_path / "a.ndjson", [new, "{not json", {**new, "id": "not-a-uuid"}])
+    _write_ndjson(tmp_path / "nested" / "b.jsonl", [stored, repeated])
+    with open(tmp_path / "nested" / "c.json", "w") as f:
+        json.dump([_footprint(sample_footprint_data)], f)
+
+    report = import_footprints(tmp_path, engine, workers=1)
+
+    assert (report.read, report.imported, report.duplicates) == (6, 2, 2)
+    assert [error["source"] for error in report.errors] == [
+        f"{tmp_path / 'a.ndjson'}:2", f"{tmp_path / 'a.ndjson'}:3"
+    ]
+    assert ["id"] in [error["loc"] for error in report.errors[1]["errors"]]
+    with SessionTesting() as db:
+        assert count_product_footprints(db) == 3
+        # The first occurrence of a repeated id is imported.
+        assert retrieve_product_footprint(new["id"], db).comment == new["comment"]
+
+
+def test_import_footprints_dry_run_writes_nothing(app, sample_footprint_data, tmp_path):
+    _write_ndjson(tmp_path / "footprints.ndjson", [_footprint(sample_footprint_data)])
+
+    report = import_footprints(tmp_path / "footprints.ndjson", engine, workers=1, dry_run=True)
+
+    assert report.imported == 1
+    with SessionTesting() as db:
+        assert count_product_footprints(db) == 0
+
+
+def test_read_footprints_reads_json_objects_and_skips_blank_lines(sample_footprint_data, tmp_path):
+    with open(tmp_path / "one.json", "w") as f:
+        json.dump(sample_footprint_data, f)
+    with open(tmp_path / "two.ndjson", "w") as f:
+        f.write("\n" + json.dumps(sample_footprint_data) + "\n\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    sources = [source for source, _ in read_footprints(tmp_path)]
+
+    assert sources == [f"{tmp_path / 'one.json'}[0]", f"{tmp_path / 'two.ndjson'}:2"]
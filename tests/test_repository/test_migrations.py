@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import psycopg2
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from db.mapper import to_product_footprint_schema
+from db.repository.product_footprints import create_new_product_footprint, retrieve_product_footprint
+from schemas.product_footprint import ProductFootprint
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+
+ALEMBIC_DIRECTORY = Path(__file__).resolve().parents[2] / "alembic"
+MIGRATION_DATABASE = "pact_migration_test"
+
+
+@pytest.fixture
+def sydney_database():
+    # A database whose sessions run in another time zone than UTC unless told otherwise.
+    connection = psycopg2.connect(SQLALCHEMY_DATABASE_URL)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {MIGRATION_DATABASE}")
+        cursor.execute(f"CREATE DATABASE {MIGRATION_DATABASE}")
+        cursor.execute(f"ALTER DATABASE {MIGRATION_DATABASE} SET timezone TO 'Australia/Sydney'")
+    yield make_url(SQLALCHEMY_DATABASE_URL).set(database=MIGRATION_DATABASE).render_as_string(hide_password=False)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {MIGRATION_DATABASE} WITH (FORCE)")
+    connection.close()
+
+
+def test_document_backfill_renders_timestamps_in_utc(sydney_database, valid_json_product_footprint):
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIRECTORY))
+    config.set_main_option("sqlalchemy.url", sydney_database)
+    engine = create_engine(sydney_database, connect_args={"options": "-c timezone=UTC"})
+    session = sessionmaker(bind=engine)()
+    try:
+        command.upgrade(config, "head")
+        id = create_new_product_footprint(ProductFootprint(**valid_json_product_footprint), session).id
+        session.commit()
+
+        # Downgrading past the revision that adds the documents drops them, upgrading
+        # again backfills them.
+        command.downgrade(config, "3b8e5d41c7a2")
+        command.upgrade(config, "head")
+
+        document = session.execute(text("SELECT document FROM productfootprint WHERE id = :id"), {"id": id}).scalar()
+        expected = to_product_footprint_schema(retrieve_product_footprint(id, session)).model_dump_json()
+        assert bytes(document).decode() == expected
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from db.pool_metrics import InstrumentedQueuePool, PoolMetrics, WAIT_BUCKETS, pool_metrics
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+
+@pytest.fixture
+def small_engine():
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_metrics_count_overflows_and_timeouts(small_engine):
+    first = small_engine.connect()
+    second = small_engine.connect()
+
+    metrics = pool_metrics(small_engine.pool)
+    assert metrics["checked_out"] == 2
+    assert metrics["overflow"] == 1
+    assert metrics["checkouts"] == 2
+    assert metrics["overflows"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        small_engine.connect()
+    first.close()
+    second.close()
+
+    metrics = pool_metrics(small_engine.pool)
+    assert metrics["checked_out"] == 0
+    assert metrics["timeouts"] == 1
+    assert metrics["wait_seconds_total"] >= 0.05
+    assert sum(metrics["wait_seconds_histogram"].values()) == 3
+
+
+def test_pool_metrics_survive_dispose(small_engine):
+    small_engine.connect().close()
+
+    small_engine.dispose()
+
+    assert pool_metrics(small_engine.pool)["checkouts"] == 1
+
+
+def test_pool_metrics_wait_histogram():
+    metrics = PoolMetrics()
+
+    metrics.record_checkout(0.0005, overflow=False)
+    metrics.record_checkout(WAIT_BUCKETS[1], overflow=False)
+    metrics.record_timeout(60)
+
+    histogram = metrics.stats()["wait_seconds_histogram"]
+    assert histogram[str(WAIT_BUCKETS[0])] == 1
+    assert histogram[str(WAIT_BUCKETS[1])] == 1
+    assert histogram["+Inf"] == 1
+    assert sum(histogram.values()) == 3
@@ -1,10 +1,18 @@
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
 import pytest
+from sqlalchemy import event, text
 
+from db.mapper import to_product_footprint_schema
+from db.models.product_footprint import ProductFootprint as ProductFootprintModel
 from db.repository.product_footprints import (
-    create_new_product_footprint, retrieve_product_footprint, list_product_footprints,
-    count_product_footprints
+    product_footprint_cache, delete_product_footprint_by_id, create_new_product_footprint, retrieve_product_footprint, list_product_footprints,
+    count_product_footprints, estimate_product_footprints, retrieve_product_footprint_json,
+    list_product_footprints_json, retrieve_product_footprint_document, list_product_footprint_documents,
+    retrieve_product_footprint_version, insert_product_footprints, commit_inserted_product_footprints,
+    product_footprint_count, stream_product_footprint_documents, retrieve_page_bounds, with_company_id,
+    with_product_id, search_product_footprints
 )
 from schemas.product_footprint import ProductFootprint
 from schemas.carbon_footprint import CarbonFootprint
@@ -160,3 +168,354 @@ def test_count_product_footprints(two_product_footprints, db_session):
     actual_count = count_product_footprints(db_session)
 
     assert actual_count == expected_count
+
+
+def test_list_product_footprints_with_limit_and_offset(two_product_footprints, db_session):
+    first_page = list_product_footprints(db_session, limit=1, offset=0)
+    second_page = list_product_footprints(db_session, limit=1, offset=1)
+
+    assert len(first_page) == 1
+    assert len(second_page) == 1
+    assert first_page[0].id == "90163d8f-8465-4a6f-9e43-a58d68bef72f"
+    assert second_page[0].id == "80b79a90-0dbc-48d0-b910-551c09037d61"
+
+
+def test_list_product_footprints_offset_past_end_returns_none(two_product_footprints, db_session):
+    assert list_product_footprints(db_session, limit=10, offset=2) is None
+
+
+def test_list_product_footprints_after_pk(two_product_footprints, db_session):
+    first, second = two_product_footprints
+
+    product_footprints = list_product_footprints(db_session, limit=10, after_pk=first.pk)
+
+    assert [footprint.id for footprint in product_footprints] == [second.id]
+
+
+def test_estimate_product_footprints_falls_back_to_exact_count(two_product_footprints, db_session):
+    assert estimate_product_footprints(db_session) == 2
+
+
+def test_estimate_product_footprints_uses_planner_statistics(two_product_footprints, db_session):
+    db_session.execute(text("ANALYZE productfootprint"))
+
+    with count_queries(db_session) as statements:
+        estimate = estimate_product_footprints(db_session)
+
+    assert estimate == 2
+    assert len(statements) == 1
+
+
+@contextmanager
+def count_queries(db_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def touch_relationships(product_footprints):
+    for product_footprint in product_footprints:
+        list(product_footprint.carbon_footprint.product_or_sector_specific_rules)
+        list(product_footprint.carbon_footprint.secondary_emission_factor_sources)
+
+
+@pytest.mark.parametrize("loading_strategy, expected_queries", [("selectin", 4), ("joined", 1)])
+def test_list_product_footprints_query_count_is_independent_of_page_size(
+    two_product_footprints, db_session, loading_strategy, expected_queries
+):
+    for page_size in (1, 2):
+        db_session.expire_all()
+        with count_queries(db_session) as statements:
+            product_footprints = list_product_footprints(
+                db_session, limit=page_size, loading_strategy=loading_strategy
+            )
+            touch_relationships(product_footprints)
+
+        assert len(product_footprints) == page_size
+        assert len(statements) == expected_queries
+
+
+def test_retrieve_product_footprint_eager_loads_relationships(two_product_footprints, db_session):
+    db_session.expire_all()
+    with count_queries(db_session) as statements:
+        product_footprint = retrieve_product_footprint(
+            "90163d8f-8465-4a6f-9e43-a58d68bef72f", db_session, loading_strategy="joined"
+        )
+        touch_relationships([product_footprint])
+
+    assert len(statements) == 1
+
+
+def test_list_product_footprints_unknown_loading_strategy(db_session):
+    with pytest.raises(ValueError):
+        list_product_footprints(db_session, loading_strategy="eager")
+
+
+def test_cached_count_product_footprints_tracks_creates(db_session, valid_product_footprint_data):
+    assert count_product_footprints(db_session, cached=True) == 0
+
+    create_new_product_footprint(ProductFootprint(**valid_product_footprint_data), db_session)
+
+    assert count_product_footprints(db_session, cached=True) == 1
+
+
+@pytest.fixture
+def awkward_product_footprint_data(valid_product_footprint_data, valid_carbon_footprint_data):
+    """
+    A footprint with values whose JSON rendering is easy to get wrong: floats that
+    Pydantic writes in exponent form, whole number floats, escapes and non ASCII text,
+    fractional seconds, and nested JSONB.
+    """
+    carbon_footprint_data = valid_carbon_footprint_data.copy()
+    carbon_footprint_data.update({
+        "pCfExcludingBiogenic": 1e-7,
+        "pCfIncludingBiogenic": 1e16,
+        "fossilGhgEmissions": 8.123456789,
+        "biogenicCarbonContent": 0.1,
+        "aircraftGhgEmissions": None,
+        "boundaryProcessesDescription": "Line one\nline \"two\" \\ \u001f / \u00e9 \U0001f600",
+        "referencePeriodStart": datetime(2023, 1, 1, 1, 2, 3, 4500, tzinfo=timezone.utc).isoformat(),
+        "dqi": {"b": [1.5, {"x": None}, 2, True, "s"], "a": 1e-7, "c": {}},
+        "assurance": None,
+    })
+    data = valid_product_footprint_data.copy()
+    data.update({
+        "created": "2023-06-18T22:38:02.331Z",
+        "companyName": "Ünïcode Company",
+        "extensions": [{"dataSchema": "https://example.com/schema.json", "data": {"value": 10.0}}],
+        "pcf": CarbonFootprint(**carbon_footprint_data),
+    })
+    return data
+
+
+def test_retrieve_product_footprint_json_matches_pydantic(awkward_product_footprint_data, db_session):
+    product_footprint = create_new_product_footprint(ProductFootprint(**awkward_product_footprint_data), db_session)
+    expected = to_product_footprint_schema(product_footprint).model_dump_json()
+
+    document = retrieve_product_footprint_json(product_footprint.id, db_session)
+
+    assert document == expected
+
+
+def test_product_footprint_json_renders_timestamps_in_utc(awkward_product_footprint_data, db_session):
+    product_footprint = create_new_product_footprint(ProductFootprint(**awkward_product_footprint_data), db_session)
+    expected = to_product_footprint_schema(product_footprint).model_dump_json()
+    db_session.execute(text("SET LOCAL timezone = 'Asia/Kolkata'"))
+    db_session.execute(text("UPDATE productfootprint SET document = NULL WHERE pk = :pk"), {"pk": product_footprint.pk})
+
+    assert retrieve_product_footprint_json(product_footprint.id, db_session) == expected
+    assert retrieve_product_footprint_document(product_footprint.id, db_session) == expected
+
+
+def test_list_product_footprints_json_matches_pydantic(two_product_footprints, db_session):
+    rows = list_product_footprints_json(db_session, limit=10)
+
+    assert [pk for pk, _ in rows] == [product_footprint.pk for product_footprint in two_product_footprints]
+    for (_, document), product_footprint in zip(rows, two_product_footprints):
+        assert document == to_product_footprint_schema(product_footprint).model_dump_json()
+
+
+def test_list_product_footprints_json_pagination(two_product_footprints, db_session):
+    first, second = two_product_footprints
+
+    assert [pk for pk, _ in list_product_footprints_json(db_session, limit=1, offset=1)] == [second.pk]
+    assert [pk for pk, _ in list_product_footprints_json(db_session, after_pk=first.pk)] == [second.pk]
+    assert list_product_footprints_json(db_session, after_pk=second.pk) is None
+
+
+def test_retrieve_product_footprint_json_not_found(db_session):
+    assert retrieve_product_footprint_json("non-existent-id", db_session) is None
+
+
+def test_create_new_product_footprint_stores_document(awkward_product_footprint_data, db_session):
+    product_footprint = create_new_product_footprint(ProductFootprint(**awkward_product_footprint_data), db_session)
+
+    assert product_footprint.document.decode() == to_product_footprint_schema(product_footprint).model_dump_json()
+
+
+def test_product_footprint_documents_only_read_productfootprint(two_product_footprints, db_session):
+    first, second = two_product_footprints
+    first_id, first_pk = first.id, first.pk
+
+    with count_queries(db_session) as statements:
+        document = retrieve_product_footprint_document(first_id, db_session)
+        rows = list_product_footprint_documents(db_session, limit=1, after_pk=first_pk)
+
+    assert document == to_product_footprint_schema(first).model_dump_json()
+    assert rows == [(second.pk, to_product_footprint_schema(second).model_dump_json())]
+    assert len(statements) == 2
+    assert not any("carbonfootprint" in statement for statement in statements)
+
+
+def test_product_footprint_documents_render_missing_documents(two_product_footprints, db_session):
+    first, second = two_product_footprints
+    db_session.execute(text("UPDATE productfootprint SET document = NULL WHERE pk = :pk"), {"pk": first.pk})
+
+    rows = list_product_footprint_documents(db_session)
+
+    assert retrieve_product_footprint_document(first.id, db_session) == to_product_footprint_schema(first).model_dump_json()
+    assert rows == [
+        (first.pk, to_product_footprint_schema(first).model_dump_json()),
+        (second.pk, to_product_footprint_schema(second).model_dump_json()),
+    ]
+    assert list_product_footprint_documents(db_session, after_pk=second.pk) is None
+    assert retrieve_product_footprint_document("non-existent-id", db_session) is None
+
+
+def test_retrieve_product_footprint_version_only_reads_productfootprint(two_product_footprints, db_session):
+    first, _ = two_product_footprints
+    first_id, first_version, first_updated = first.id, first.version, first.updated
+
+    with count_queries(db_session) as statements:
+        footprint_version = retrieve_product_footprint_version(first_id, db_session)
+
+    assert (footprint_version.id, footprint_version.version, footprint_version.updated) == (first_id, first_version, first_updated)
+    assert len(statements) == 1
+    assert "carbonfootprint" not in statements[0]
+    assert retrieve_product_footprint_version("non-existent-id", db_session) is None
+
+
+def test_create_invalidates_cached_response(valid_product_footprint_data, db_session):
+    footprint_id = valid_product_footprint_data["id"]
+    product_footprint_cache.set(footprint_id, b"\"etag\"\nstale")
+
+    create_new_product_footprint(ProductFootprint(**valid_product_footprint_data), db_session)
+
+    assert product_footprint_cache.get(footprint_id) is None
+
+
+def test_delete_invalidates_cached_response(valid_product_footprint_model, db_session):
+    db_session.add(valid_product_footprint_model)
+    db_session.commit()
+    product_footprint_cache.set("test_id", b"\"etag\"\nstale")
+
+    delete_product_footprint_by_id("test_id", db_session, owner_id=None)
+
+    assert product_footprint_cache.get("test_id") is None
+
+
+def test_insert_product_footprints(awkward_product_footprint_data, valid_product_footprint_data, db_session):
+    first = ProductFootprint(**awkward_product_footprint_data)
+    second = ProductFootprint(**{**valid_product_footprint_data, "id": "80b79a90-0dbc-48d0-b910-551c09037d61"})
+
+    with count_queries(db_session) as statements:
+        ids = insert_product_footprints([first, second, first], db_session)
+    commit_inserted_product_footprints(ids, db_session)
+
+    assert ids == [str(first.id), str(second.id)]
+    # One multi-row INSERT per table, and one UPDATE for the documents.
+    assert len(statements) == 5
+    for id, product_footprint in zip(ids, [first, second]):
+        stored = to_product_footprint_schema(retrieve_product_footprint(id, db_session))
+        assert stored == product_footprint
+        assert retrieve_product_footprint_document(id, db_session) == stored.model_dump_json()
+
+
+def test_insert_product_footprints_skips_stored_ids(two_product_footprints, valid_product_footprint_data, db_session):
+    count = count_product_footprints(db_session, cached=True)
+    stored = ProductFootprint(**{**valid_product_footprint_data, "id": two_product_footprints[0].id})
+    new = ProductFootprint(**valid_product_footprint_data)
+
+    ids = insert_product_footprints([stored, new], db_session)
+    commit_inserted_product_footprints(ids, db_session)
+
+    assert ids == [str(new.id)]
+    assert count_product_footprints(db_session) == product_footprint_count.get(lambda: None) == count + 1
+    assert insert_product_footprints([stored], db_session) == []
+    assert insert_product_footprints([], db_session) == []
+
+
+def test_stream_product_footprint_documents(two_product_footprints, db_session):
+    # A document that was never written is rendered on the fly.
+    db_session.execute(text("UPDATE productfootprint SET document = NULL WHERE pk = :pk"), {"pk": two_product_footprints[0].pk})
+
+    documents = list(stream_product_footprint_documents(db_session, batch_size=1))
+
+    assert documents == [
+        to_product_footprint_schema(product_footprint).model_dump_json() for product_footprint in two_product_footprints
+    ]
+
+
+def test_stream_product_footprint_documents_paginates(two_product_footprints, db_session):
+    first, second = two_product_footprints
+
+    assert list(stream_product_footprint_documents(db_session, limit=1)) == [first.document.decode()]
+    assert list(stream_product_footprint_documents(db_session, offset=1)) == [second.document.decode()]
+    assert list(stream_product_footprint_documents(db_session, after_pk=second.pk)) == []
+
+
+def test_retrieve_page_bounds(two_product_footprints, db_session):
+    first, second = two_product_footprints
+
+    assert retrieve_page_bounds(db_session, limit=1) == (1, first.pk, True)
+    assert retrieve_page_bounds(db_session, limit=2) == (2, second.pk, False)
+    assert retrieve_page_bounds(db_session, limit=2, offset=1) == (1, second.pk, False)
+    assert retrieve_page_bounds(db_session, limit=1, after_pk=first.pk) == (1, second.pk, False)
+    assert retrieve_page_bounds(db_session, limit=1, after_pk=second.pk) == (0, None, False)
+
+
+def test_list_product_footprints_by_product_and_company_id(valid_product_footprint_data, db_session):
+    other_data = {
+        **valid_product_footprint_data,
+        "id": "90163d8f-8465-4a6f-9e43-a58d68bef72f",
+        "companyIds": ["urn:pathfinder:company:customcode:buyer-assigned:2874"],
+        "productIds": ["urn:pathfinder:product:customcode:buyer-assigned:1000"],
+    }
+    product_footprint = create_new_product_footprint(ProductFootprint(**valid_product_footprint_data), db_session)
+    other = create_new_product_footprint(ProductFootprint(**other_data), db_session)
+
+    by_product_id = list_product_footprints(db_session, where=with_product_id("urn:pathfinder:product:customcode:vendor-assigned:2287"))
+    by_company_id = list_product_footprints(db_session, where=with_company_id("urn:pathfinder:company:customcode:buyer-assigned:2874"))
+
+    assert by_product_id == [product_footprint]
+    assert by_company_id == [product_footprint, other]
+    assert list_product_footprints(db_session, where=with_product_id("urn:pathfinder:product:unknown")) is None
+
+
+@pytest.mark.parametrize("where, index", [
+    (with_product_id("urn:pathfinder:product:customcode:vendor-assigned:2287"), "ix_productfootprint_productIds"),
+    (with_company_id("urn:pathfinder:company:customcode:buyer-assigned:2874"), "ix_productfootprint_companyIds"),
+])
+def test_id_lookups_use_gin_indexes(two_product_footprints, db_session, where, index):
+    # The table is far too small for the planner to prefer an index on its own.
+    db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    compiled = db_session.query(ProductFootprintModel.pk).filter(where).statement.compile(db_session.bind)
+
+    rows = db_session.connection().exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+    plan = "\n".join(row[0] for row in rows)
+
+    assert index in plan
+
+
+def test_search_product_footprints(valid_product_footprint_data, db_session):
+    texts = [
+        ("Steel frame", "Frame of a solar panel", "string"),
+        ("Solar panel", "A photovoltaic module", "string"),
+        ("Aluminium can", "A drinks can", "Recycled from solar panels"),
+        ("Glass bottle", "A bottle", "string"),
+    ]
+    product_footprints = [
+        create_new_product_footprint(ProductFootprint(**{
+            **valid_product_footprint_data,
+            "id": f"00000000-0000-4000-8000-00000000000{index}",
+            "productNameCompany": name,
+            "productDescription": description,
+            "comment": comment,
+        }), db_session)
+        for index, (name, description, comment) in enumerate(texts)
+    ]
+
+    # The product name ranks above the description, which ranks above the comment.
+    assert search_product_footprints(db_session, "solar panels") == [product_footprints[1], product_footprints[0], product_footprints[2]]
+    assert search_product_footprints(db_session, "solar", limit=1, offset=1) == [product_footprints[0]]
+    assert search_product_footprints(db_session, "solar -frame") == [product_footprints[1], product_footprints[2]]
+    assert search_product_footprints(db_session, "solar", where=with_product_id("urn:pathfinder:product:unknown")) is None
+    assert search_product_footprints(db_session, "wooden") is None
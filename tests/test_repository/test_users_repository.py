@@ -1,10 +1,12 @@
 import pytest
 
+from core.authorization import SUPERUSER, user_claims_cache
+from core.credential_cache import verified_credentials
 from core.hashing import Hasher
 from db.models.user import User
 from db.repository.users import (
     create_new_user, create_new_superuser, retrieve_user_by_id,
-    retrieve_user_by_email, retrieve_user_by_username, authenticate_user
+    retrieve_user_by_email, retrieve_user_by_username, authenticate_user, update_user, update_user_password
 )
 from schemas.user import UserCreate
 
@@ -179,3 +181,67 @@ def test_create_new_user_invalid_password(db_session):
     with pytest.raises(ValueError):
         create_new_user(user=UserCreate(**user_data), db=db_session)
 """
+
+
+def test_update_user_records_claims(db_session, test_user):
+    user = update_user(db=db_session, user_id=test_user.id, is_superuser=True)
+
+    assert user.is_superuser is True
+    assert user.is_active is True
+    assert user_claims_cache.get(str(test_user.id)) == (True, frozenset({SUPERUSER}))
+
+    update_user(db=db_session, user_id=test_user.id, is_active=False)
+
+    assert retrieve_user_by_id(db=db_session, user_id=test_user.id).is_active is False
+    assert user_claims_cache.get(str(test_user.id)) == (False, frozenset({SUPERUSER}))
+
+
+def test_update_user_not_found(db_session):
+    assert update_user(db=db_session, user_id=999, is_active=False) is None
+
+
+def test_authenticate_inactive_user(db_session, test_user, test_credentials):
+    update_user(db=db_session, user_id=test_user.id, is_active=False)
+
+    assert authenticate_user(*test_credentials, db=db_session) is None
+
+
+def test_authenticate_user_skips_bcrypt_for_verified_credentials(db_session, test_user, test_credentials, monkeypatch):
+    assert authenticate_user(*test_credentials, db=db_session) == test_user
+
+    def verify_password(**kwargs):
+        raise AssertionError("bcrypt should not run again")
+
+    monkeypatch.setattr(Hasher, "verify_password", staticmethod(verify_password))
+    assert authenticate_user(*test_credentials, db=db_session) == test_user
+    assert verified_credentials.stats()["hits"] >= 1
+
+
+def test_authenticate_user_does_not_cache_failures(db_session, test_user, test_credentials):
+    username, _ = test_credentials
+
+    assert authenticate_user(username, "wrong", db=db_session) is None
+    assert verified_credentials.stats()["entries"] == 0
+
+
+def test_update_user_password_forgets_verified_credentials(db_session, test_user, test_credentials):
+    username, password = test_credentials
+    authenticate_user(username, password, db=db_session)
+
+    update_user_password(db=db_session, user_id=test_user.id, password="newpassword")
+
+    assert authenticate_user(username, password, db=db_session) is None
+    assert authenticate_user(username, "newpassword", db=db_session) == test_user
+
+
+def test_verified_credentials_check_current_password_hash(db_session, test_user, test_credentials):
+    # As another worker process would change it, without this process forgetting anything.
+    authenticate_user(*test_credentials, db=db_session)
+    test_user.hashed_password = Hasher.get_password_hash(password="newpassword")
+    db_session.commit()
+
+    assert authenticate_user(*test_credentials, db=db_session) is None
+
+
+def test_update_user_password_not_found(db_session):
+    assert update_user_password(db=db_session, user_id=999, password="newpassword") is None
@@ -0,0 +1,194 @@
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from core.app_config import create_app
+from db.repository.users import create_new_superuser, create_new_user
+from db.session import AsyncSessionLocal, get_async_db
+from schemas.user import UserCreate
+from tests.conftest import SQLALCHEMY_DATABASE_URL, SessionTesting, engine
+
+
+@pytest.fixture
+def async_client(app, monkeypatch):
+    """
+    A client of the app with `settings.DATABASE_ASYNC` enabled. Unlike `client`, each
+    request commits, as an asyncpg connection cannot share the transaction of `db_session`.
+    """
+    monkeypatch.setattr("core.config.settings.DATABASE_ASYNC", True)
+    async_app = create_app()
+    async_url = make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+    async def _get_test_async_db():
+        # Connections are not pooled, as the test client runs each request on a new event loop.
+        async_engine = create_async_engine(async_url, poolclass=NullPool)
+        async with AsyncSessionLocal(bind=async_engine) as db:
+            yield db
+        await async_engine.dispose()
+
+    async_app.dependency_overrides[get_async_db] = _get_test_async_db
+    with TestClient(async_app) as client:
+        yield client
+
+
+def _auth_header(client, create_user, name):
+    db = SessionTesting(bind=engine)
+    try:
+        create_user(user=UserCreate(username=name, email=f"{name}@example.com", password=name), db=db)
+    finally:
+        db.close()
+    response = client.post("/auth/token", data={"client_id": f"{name}@example.com", "client_secret": name})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def async_auth_header(async_client):
+    return _auth_header(async_client, create_new_user, "asyncuser")
+
+
+def test_async_routes_are_coroutines(async_client):
+    endpoints = {route.path: route.endpoint for route in async_client.app.routes if route.path.startswith("/2/footprints")}
+
+    assert endpoints
+    assert all(
+        endpoint.__module__ == "apis.version1.async_route_product_footprints" for endpoint in endpoints.values()
+    )
+
+
+def test_async_login_rejects_bad_credentials(async_client, async_auth_header):
+    response = async_client.post("/auth/token", data={"client_id": "asyncuser@example.com", "client_secret": "wrong"})
+
+    assert response.status_code == 400
+    assert response.json()["error"] == "invalid_client"
+
+
+def test_async_create_and_read_product_footprint(async_client, async_auth_header, valid_json_product_footprint):
+    response = async_client.post(
+        "/2/footprints/create-product-footprint/", json=valid_json_product_footprint, headers=async_auth_header
+    )
+    assert response.status_code == 200
+
+    url = f"/2/footprints/{valid_json_product_footprint['id']}"
+    response = async_client.get(url, headers=async_auth_header)
+    assert response.status_code == 200
+    assert response.json()["data"]["companyName"] == "Clean Product Company"
+
+    not_modified = async_client.get(url, headers={**async_auth_header, "If-None-Match": response.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+    missing = async_client.get(f"/2/footprints/{uuid.uuid4()}", headers=async_auth_header)
+    assert missing.status_code == 404
+
+
+@pytest.mark.parametrize("serializer", ["python", "postgres", "document"])
+def test_async_list_product_footprints_matches_sync(
+    async_client, async_auth_header, client, auth_header, valid_json_product_footprint, monkeypatch, serializer
+):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_SERIALIZER", serializer)
+    for i in range(3):
+        footprint = {**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4))}
+        async_client.post("/2/footprints/create-product-footprint/", json=footprint, headers=async_auth_header)
+
+    response = async_client.get("/2/footprints?limit=2", headers=async_auth_header)
+    sync_response = client.get("/2/footprints?limit=2", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.content == sync_response.content
+    assert response.headers["Link"] == sync_response.headers["Link"]
+
+
+def test_async_create_user_requires_superuser(async_client, async_auth_header):
+    superuser_header = _auth_header(async_client, create_new_superuser, "asyncsuperuser")
+    user = {"username": "newuser", "email": "newuser@example.com", "password": "newuser"}
+
+    assert async_client.post("/users/", json=user, headers=async_auth_header).status_code == 403
+    response = async_client.post("/users/", json=user, headers=superuser_header)
+    assert response.status_code == 200
+    assert response.json()["email"] == "newuser@example.com"
+
+
+def test_async_create_product_footprints_bulk(async_client, async_auth_header, valid_json_product_footprint):
+    footprints = [{**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4))} for i in range(3)]
+
+    response = async_client.post("/2/footprints/bulk", json=footprints + footprints[:1], headers=async_auth_header)
+
+    assert response.status_code == 200
+    assert response.json()["meta"] == {"created": 3, "duplicate": 1, "invalid": 0}
+    response = async_client.get(f"/2/footprints/{footprints[2]['id']}", headers=async_auth_header)
+    assert response.status_code == 200
+
+
+def test_async_export_product_footprints(async_client, async_auth_header, valid_json_product_footprint):
+    footprints = [{**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4))} for i in range(3)]
+    async_client.post("/2/footprints/bulk", json=footprints, headers=async_auth_header)
+
+    response = async_client.get("/2/footprints/export", headers=async_auth_header)
+
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [footprint["id"] for footprint in footprints]
+
+
+def test_async_streamed_page_matches_built_page(async_client, async_auth_header, valid_json_product_footprint, monkeypatch):
+    footprints = [{**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4))} for i in range(3)]
+    async_client.post("/2/footprints/bulk", json=footprints, headers=async_auth_header)
+
+    built_response = async_client.get("/2/footprints?limit=2", headers=async_auth_header)
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_STREAM_MIN_LIMIT", 2)
+    streamed_response = async_client.get("/2/footprints?limit=2", headers=async_auth_header)
+
+    assert "Content-Length" not in streamed_response.headers
+    assert streamed_response.content == built_response.content
+    assert streamed_response.headers["Link"] == built_response.headers["Link"]
+
+
+def test_async_list_product_footprints_with_filter(async_client, async_auth_header, valid_json_product_footprint):
+    footprints = [
+        {**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4)), "productCategoryCpc": str(22220 + i)}
+        for i in range(3)
+    ]
+    async_client.post("/2/footprints/bulk", json=footprints, headers=async_auth_header)
+
+    response = async_client.get("/2/footprints?$filter=productCategoryCpc gt '22220'", headers=async_auth_header)
+    assert response.status_code == 200
+    assert [footprint["id"] for footprint in response.json()["data"]] == [footprint["id"] for footprint in footprints[1:]]
+    assert response.json()["meta"] == {"total": 2}
+    assert async_client.get("/2/footprints?$filter=or", headers=async_auth_header).status_code == 400
+    nested = "(" * 600 + "productCategoryCpc gt '22220'" + ")" * 600
+    assert async_client.get(f"/2/footprints?$filter={nested}", headers=async_auth_header).status_code == 400
+
+
+def test_async_list_product_footprints_by_product_id(async_client, async_auth_header, valid_json_product_footprint):
+    footprints = [
+        {**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4)), "productIds": [f"urn:gtin:{i % 2}"]}
+        for i in range(3)
+    ]
+    async_client.post("/2/footprints/bulk", json=footprints, headers=async_auth_header)
+
+    response = async_client.get("/2/footprints/by-product-id/urn:gtin:0", headers=async_auth_header)
+    assert response.status_code == 200
+    assert [footprint["id"] for footprint in response.json()["data"]] == [footprints[0]["id"], footprints[2]["id"]]
+
+    response = async_client.get("/2/footprints/by-company-id/urn:epc:id:sgln:0614141.00002.0?limit=1", headers=async_auth_header)
+    assert [footprint["id"] for footprint in response.json()["data"]] == [footprints[0]["id"]]
+    assert "offset=1" in response.headers["Link"]
+
+
+def test_async_search_product_footprints(async_client, async_auth_header, valid_json_product_footprint):
+    footprints = [
+        {**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4)), "productNameCompany": name}
+        for i, name in enumerate(["Steel frame", "Solar panel", "Solar cell"])
+    ]
+    async_client.post("/2/footprints/bulk", json=footprints, headers=async_auth_header)
+
+    response = async_client.get("/2/footprints/search?q=solar&limit=1", headers=async_auth_header)
+    assert response.status_code == 200
+    assert [footprint["id"] for footprint in response.json()["data"]] == [footprints[1]["id"]]
+    assert response.json()["meta"] == {"total": 2}
+    assert "offset=1" in response.headers["Link"]
+    assert async_client.get("/2/footprints/search", headers=async_auth_header).status_code == 400
@@ -0,0 +1,48 @@
+import pytest
+
+
+def test_read_pool_metrics(client, superuser_auth_header):
+    response = client.get("/internal/pool-metrics", headers=superuser_auth_header)
+
+    assert response.status_code == 200
+    metrics = response.json()["sync"]
+    assert metrics["class"] == "InstrumentedQueuePool"
+    assert {"size", "checked_out", "overflow", "timeouts", "wait_seconds_histogram"} <= metrics.keys()
+
+
+def test_read_pool_metrics_requires_token(client):
+    response = client.get("/internal/pool-metrics")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "path", ["/internal/pool-metrics", "/internal/credential-cache-metrics", "/internal/password-hashing-metrics"]
+)
+def test_internal_routes_require_superuser(client, auth_header, path):
+    response = client.get(path, headers=auth_header)
+
+    assert response.status_code == 403
+    assert response.json() == {"message": "Access denied", "code": "AccessDenied"}
+
+
+def test_pool_metrics_are_not_in_openapi_schema(client):
+    assert "/internal/pool-metrics" not in client.get("/openapi.json").json()["paths"]
+
+
+def test_read_credential_cache_metrics(client, auth_header, superuser_auth_header):
+    before = client.get("/internal/credential-cache-metrics", headers=superuser_auth_header).json()
+    # Logging in for `auth_header` verified the credentials, logging in again is a hit.
+    client.post("/auth/token", data={"client_id": "testuser@example.com", "client_secret": "testuser"})
+
+    response = client.get("/internal/credential-cache-metrics", headers=superuser_auth_header)
+
+    assert response.status_code == 200
+    assert response.json() == {"hits": before["hits"] + 1, "misses": before["misses"], "entries": 2}
+
+
+def test_read_password_hashing_metrics(client, superuser_auth_header):
+    response = client.get("/internal/password-hashing-metrics", headers=superuser_auth_header)
+
+    assert response.status_code == 200
+    assert {"workers", "queue_limit", "queued", "completed", "rejected", "wait_seconds_histogram"} <= response.json().keys()
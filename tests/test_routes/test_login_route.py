@@ -1,5 +1,9 @@
 import pytest
 
+from apis.base import auth_rate_limit, footprint_rate_limit
+
+from core.hashing import PasswordHashingBusyError, password_hashing_pool
+
 
 @pytest.fixture
 def test_credentials():
@@ -60,3 +64,65 @@ def test_login_for_access_token_invalid_credentials(client):
     assert response.status_code == 400
     assert response.json()["error"] == "invalid_client"
     assert response.json()["error_description"] == "Authentication failed"
+
+
+def test_login_for_access_token_when_password_hashing_is_busy(client, test_user, test_credentials, monkeypatch):
+    async def run(function, **kwargs):
+        raise PasswordHashingBusyError()
+
+    monkeypatch.setattr(password_hashing_pool, "run", run)
+    username, password = test_credentials
+    response = client.post("/auth/token", data={"grant_type": "", "scope": "", "client_id": username, "client_secret": password})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["error"] == "temporarily_unavailable"
+
+
+def test_login_for_access_token_verifies_in_password_hashing_pool(client, test_user, test_credentials):
+    completed = password_hashing_pool.stats()["completed"]
+    username, password = test_credentials
+
+    response = client.post("/auth/token", data={"grant_type": "", "scope": "", "client_id": username, "client_secret": password})
+
+    assert response.status_code == 200
+    assert password_hashing_pool.stats()["completed"] == completed + 1
+
+
+def test_login_for_access_token_is_rate_limited_per_address(client, test_user, test_credentials, monkeypatch):
+    monkeypatch.setattr(auth_rate_limit, "rate", 1)
+    monkeypatch.setattr(auth_rate_limit, "burst", 2)
+    username, password = test_credentials
+    token_request = {"grant_type": "", "scope": "", "client_id": username, "client_secret": password}
+
+    assert [client.post("/auth/token", data=token_request).status_code for _ in range(2)] == [200, 200]
+    response = client.post("/auth/token", data=token_request)
+
+    assert response.status_code == 429
+    assert response.json() == {"message": "Too many requests, try again later", "code": "TooManyRequests"}
+    assert int(response.headers["Retry-After"]) >= 1
+    # Sending another client id does not get a caller a new bucket.
+    other_client = {**token_request, "client_id": "other@example.com"}
+    assert client.post("/auth/token", data=other_client).status_code == 429
+
+
+def test_login_for_access_token_is_not_rate_limited_by_default(client, test_user, test_credentials):
+    username, password = test_credentials
+    token_request = {"grant_type": "", "scope": "", "client_id": username, "client_secret": password}
+
+    assert {client.post("/auth/token", data=token_request).status_code for _ in range(12)} == {200}
+
+
+def test_rate_limits_are_kept_per_route_group(client, test_user, test_credentials, monkeypatch):
+    monkeypatch.setattr(auth_rate_limit, "rate", 1)
+    monkeypatch.setattr(auth_rate_limit, "burst", 1)
+    monkeypatch.setattr(footprint_rate_limit, "rate", 1)
+    monkeypatch.setattr(footprint_rate_limit, "burst", 1)
+    username, password = test_credentials
+    response = client.post("/auth/token", data={"client_id": username, "client_secret": password})
+    auth_header = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    assert client.get("/2/footprints", headers=auth_header).status_code == 200
+    response = client.get("/2/footprints", headers=auth_header)
+    assert response.status_code == 429
+    assert response.json()["code"] == "TooManyRequests"
@@ -1,9 +1,14 @@
+import json
 import uuid
 from datetime import datetime, timezone, timedelta
 
 import freezegun
 import pytest
 
+from core.config import settings
+from core.pagination import encode_cursor
+from db.repository.product_footprints import product_footprint_cache
+
 
 @pytest.fixture()
 def valid_json_product_footprint(valid_carbon_footprint_data):
@@ -109,6 +114,46 @@ def test_read_product_footprint(client, auth_header, valid_json_product_footprin
     assert response.json()["data"]["companyName"] == "Clean Product Company"
 
 
+def test_read_product_footprint_conditional_get(client, auth_header, valid_json_product_footprint):
+    client.post(url="/2/footprints/create-product-footprint/", json=valid_json_product_footprint, headers=auth_header)
+    url = "/2/footprints/3fa85f64-5717-4562-b3fc-2c963f66afa6"
+
+    response = client.get(url, headers=auth_header)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    not_modified = client.get(url, headers={**auth_header, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+
+    modified = client.get(url, headers={**auth_header, "If-None-Match": '"stale"'})
+    assert modified.status_code == 200
+    assert modified.content == response.content
+
+
+def test_read_product_footprint_is_served_from_cache(client, auth_header, valid_json_product_footprint, monkeypatch):
+    client.post(url="/2/footprints/create-product-footprint/", json=valid_json_product_footprint, headers=auth_header)
+    url = "/2/footprints/3fa85f64-5717-4562-b3fc-2c963f66afa6"
+    hits = product_footprint_cache.hits
+
+    response = client.get(url, headers=auth_header)
+    # Were the footprint read from the database again, this would fail with a 404.
+    monkeypatch.setattr("apis.version1.route_product_footprints.retrieve_product_footprint_version", lambda id, db: None)
+    cached_response = client.get(url, headers=auth_header)
+    not_modified = client.get(url, headers={**auth_header, "If-None-Match": response.headers["ETag"]})
+
+    assert product_footprint_cache.hits == hits + 2
+    assert cached_response.content == response.content
+    assert cached_response.headers["ETag"] == response.headers["ETag"]
+    assert not_modified.status_code == 304
+
+
+def test_read_product_footprint_conditional_get_not_found(client, auth_header):
+    response = client.get("/2/footprints/non-existent-id", headers={**auth_header, "If-None-Match": "*"})
+    assert response.status_code == 404
+
+
 def test_read_product_footprint_with_expired_token(client, auth_header, valid_json_product_footprint):
     _ = client.post(
         url="/2/footprints/create-product-footprint/",
@@ -189,7 +234,171 @@ def test_read_product_footprints_with_limit(client, auth_header, seed_database):
     assert response.json()["data"][2]
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
+def test_read_product_footprints_with_limit_and_offset(client, auth_header, seed_database):
+    first_page = client.get("/2/footprints/?limit=2&offset=0", headers=auth_header).json()
+    second_page = client.get("/2/footprints/?limit=2&offset=2", headers=auth_header).json()
+
+    assert len(first_page["data"]) == 2
+    assert len(second_page["data"]) == 2
+    assert first_page["meta"]["total"] == 5
+    first_ids = {footprint["id"] for footprint in first_page["data"]}
+    second_ids = {footprint["id"] for footprint in second_page["data"]}
+    assert first_ids.isdisjoint(second_ids)
+
+
+def test_read_product_footprints_link_header_offset_mode(client, auth_header, seed_database):
+    response = client.get("/2/footprints/?limit=2&offset=2", headers=auth_header)
+    assert response.status_code == 200
+    assert 'offset=4' in response.headers["Link"]
+    assert response.headers["Link"].endswith('; rel="next"')
+
+    last_page = client.get("/2/footprints/?limit=2&offset=4", headers=auth_header)
+    assert len(last_page.json()["data"]) == 1
+    assert "Link" not in last_page.headers
+
+
+@pytest.mark.parametrize("count_strategy, expected_meta", [
+    ("exact", {"total": 5}),
+    ("estimated", {"total": 5}),
+    ("probe", {}),
+])
+def test_read_product_footprints_count_strategies(client, auth_header, seed_database, monkeypatch, count_strategy, expected_meta):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_COUNT_STRATEGY", count_strategy)
+
+    response = client.get("/2/footprints/?limit=2&offset=2", headers=auth_header)
+    assert response.status_code == 200
+    assert response.json()["meta"] == expected_meta
+    assert 'offset=4' in response.headers["Link"]
+
+    last_page = client.get("/2/footprints/?limit=2&offset=4", headers=auth_header)
+    assert len(last_page.json()["data"]) == 1
+    assert "Link" not in last_page.headers
+
+
+@pytest.mark.parametrize("serializer", ["postgres", "document"])
+@pytest.mark.parametrize("url", [
+    "/2/footprints/?limit=2&offset=1",
+    f"/2/footprints/?limit=2&cursor={encode_cursor(2)}",
+])
+def test_read_product_footprints_document_serializers_are_byte_identical(
+    client, auth_header, seed_database, monkeypatch, url, serializer
+):
+    python_response = client.get(url, headers=auth_header)
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_SERIALIZER", serializer)
+    postgres_response = client.get(url, headers=auth_header)
+
+    assert postgres_response.status_code == 200
+    assert postgres_response.content == python_response.content
+    assert postgres_response.headers["Link"] == python_response.headers["Link"]
+
+
+@pytest.mark.parametrize("count_strategy", ["exact", "probe"])
+@pytest.mark.parametrize("url", [
+    "/2/footprints/?limit=2&offset=1",
+    "/2/footprints/?limit=2&offset=4",
+    "/2/footprints/?limit=5",
+    "/2/footprints/?limit=2&offset=10",
+    f"/2/footprints/?limit=2&cursor={encode_cursor(2)}",
+    f"/2/footprints/?limit=2&cursor={encode_cursor(3)}",
+])
+def test_read_product_footprints_streamed_pages_are_byte_identical(
+    client, auth_header, seed_database, monkeypatch, url, count_strategy
+):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_COUNT_STRATEGY", count_strategy)
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_STREAM_MIN_LIMIT", 0)
+    built_response = client.get(url, headers=auth_header)
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_STREAM_MIN_LIMIT", 2)
+    streamed_response = client.get(url, headers=auth_header)
+
+    assert streamed_response.status_code == 200
+    assert streamed_response.content == built_response.content
+    assert streamed_response.headers.get("Link") == built_response.headers.get("Link")
+
+
+def test_read_product_footprints_streams_large_pages_only(client, auth_header, seed_database, monkeypatch):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_STREAM_MIN_LIMIT", 3)
+    monkeypatch.setattr("apis.version1.route_product_footprints.STREAM_CHUNK_BYTES", 1)
+
+    assert "Content-Length" in client.get("/2/footprints/?limit=2", headers=auth_header).headers
+    response = client.get("/2/footprints/?limit=3", headers=auth_header)
+    assert "Content-Length" not in response.headers
+    assert len(response.json()["data"]) == 3
+    assert "offset=3" in response.headers["Link"]
+
+
+def test_read_product_footprints_streams_pages_of_the_maximum_size_by_default(client, auth_header, seed_database):
+    built_response = client.get("/2/footprints/", headers=auth_header)
+    response = client.get(f"/2/footprints/?limit={settings.PAGINATION_MAX_LIMIT}", headers=auth_header)
+
+    assert settings.FOOTPRINT_STREAM_MIN_LIMIT <= settings.PAGINATION_MAX_LIMIT
+    assert "Content-Length" in built_response.headers
+    assert "Content-Length" not in response.headers
+    assert response.content == built_response.content
+
+
+@pytest.mark.parametrize("serializer", ["postgres", "document"])
+def test_read_product_footprint_document_serializers_are_byte_identical(
+    client, auth_header, seed_database, monkeypatch, serializer
+):
+    footprint_id = client.get("/2/footprints/?limit=1", headers=auth_header).json()["data"][0]["id"]
+
+    python_response = client.get(f"/2/footprints/{footprint_id}", headers=auth_header)
+    product_footprint_cache.clear()
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_SERIALIZER", serializer)
+    postgres_response = client.get(f"/2/footprints/{footprint_id}", headers=auth_header)
+
+    assert postgres_response.status_code == 200
+    assert postgres_response.content == python_response.content
+
+
+@pytest.mark.parametrize("serializer", ["postgres", "document"])
+def test_read_product_footprint_document_serializers_not_found(client, auth_header, monkeypatch, serializer):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_SERIALIZER", serializer)
+    response = client.get("/2/footprints/non-existent-id", headers=auth_header)
+
+    assert response.status_code == 404
+
+
+def test_link_header_only_set_on_list_route(client, auth_header, seed_database):
+    response = client.post("/2/events?limit=1", headers=auth_header)
+    assert "Link" not in response.headers
+
+
+def test_read_product_footprints_cursor_mode_follows_link_headers(client, auth_header, seed_database, monkeypatch):
+    monkeypatch.setattr("core.config.settings.PAGINATION_MODE", "cursor")
+
+    seen_ids = []
+    url = "/2/footprints/?limit=2"
+    while url:
+        response = client.get(url, headers=auth_header)
+        assert response.status_code == 200
+        seen_ids.extend(footprint["id"] for footprint in response.json()["data"])
+        link = response.headers.get("Link")
+        if link is None:
+            break
+        assert "cursor=" in link
+        assert "offset=" not in link
+        url = link[link.index("/2/footprints"):link.index(">")]
+
+    assert len(seen_ids) == 5
+    assert len(set(seen_ids)) == 5
+
+
+def test_read_product_footprints_with_invalid_cursor(client, auth_header, seed_database):
+    response = client.get("/2/footprints/?limit=2&cursor=not-a-cursor", headers=auth_header)
+    assert response.status_code == 400
+    assert response.json() == {"message": "Bad Request", "code": "BadRequest"}
+
+
+def test_read_product_footprints_with_limit_above_maximum(client, auth_header, seed_database, monkeypatch):
+    monkeypatch.setattr("core.config.settings.PAGINATION_MAX_LIMIT", 2)
+    response = client.get("/2/footprints/?limit=100000", headers=auth_header)
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 2
+    assert "limit=100000&offset=2" in response.headers["Link"]
+
+
 def test_list_product_footprints_with_filter_eq(client, auth_header, seed_database):
     filter_param = "$filter=productCategoryCpc eq '22222'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -200,7 +409,6 @@ def test_list_product_footprints_with_filter_eq(client, auth_header, seed_databa
         assert int(footprint["productCategoryCpc"]) == 22222
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_lt(client, auth_header, seed_database):
     filter_param = "$filter=productCategoryCpc lt '22222'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -211,7 +419,6 @@ def test_list_product_footprints_with_filter_lt(client, auth_header, seed_databa
         assert int(footprint["productCategoryCpc"]) < 22222
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_le(client, auth_header, seed_database):
     filter_param = "$filter=productCategoryCpc le '22222'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -222,7 +429,6 @@ def test_list_product_footprints_with_filter_le(client, auth_header, seed_databa
         assert int(footprint["productCategoryCpc"]) <= 22222
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_gt(client, auth_header, seed_database):
     filter_param = "$filter=productCategoryCpc gt '22222'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -233,7 +439,6 @@ def test_list_product_footprints_with_filter_gt(client, auth_header, seed_databa
         assert int(footprint["productCategoryCpc"]) > 22222
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_ge(client, auth_header, seed_database):
     filter_param = "$filter=productCategoryCpc ge '22222'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -244,7 +449,7 @@ def test_list_product_footprints_with_filter_ge(client, auth_header, seed_databa
         assert int(footprint["productCategoryCpc"]) >= 22222
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
+@pytest.mark.xfail(reason="Timestamps are serialised without milliseconds", strict=True)
 def test_list_product_footprints_with_filter_created_eq(client, auth_header, seed_database):
     filter_param = "$filter=created eq '2023-06-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -255,7 +460,6 @@ def test_list_product_footprints_with_filter_created_eq(client, auth_header, see
         assert footprint["created"] == "2023-06-03T00:00:00.000Z"
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_created_lt(client, auth_header, seed_database):
     filter_param = "$filter=created lt '2023-06-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -264,7 +468,6 @@ def test_list_product_footprints_with_filter_created_lt(client, auth_header, see
     assert len(footprints) == 2
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_created_le(client, auth_header, seed_database):
     filter_param = "$filter=created le '2023-06-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -275,7 +478,6 @@ def test_list_product_footprints_with_filter_created_le(client, auth_header, see
         assert footprint["created"] <= "2023-06-18T22:38:02.331Z"
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_created_gt(client, auth_header, seed_database):
     filter_param = "$filter=created gt '2023-06-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -284,7 +486,6 @@ def test_list_product_footprints_with_filter_created_gt(client, auth_header, see
     assert len(footprints) == 2
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_created_ge(client, auth_header, seed_database):
     filter_param = "$filter=created ge '2023-06-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -293,7 +494,7 @@ def test_list_product_footprints_with_filter_created_ge(client, auth_header, see
     assert len(footprints) == 3
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
+@pytest.mark.xfail(reason="Timestamps are serialised without milliseconds", strict=True)
 def test_list_product_footprints_with_filter_updated_eq(client, auth_header, seed_database):
     filter_param = "$filter=updated eq '2023-07-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -303,7 +504,6 @@ def test_list_product_footprints_with_filter_updated_eq(client, auth_header, see
     for footprint in footprints:
         assert footprint["updated"] == "2023-07-03T00:00:00.000Z"
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_updated_lt(client, auth_header, seed_database):
     filter_param = "$filter=updated lt '2023-07-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -311,7 +511,6 @@ def test_list_product_footprints_with_filter_updated_lt(client, auth_header, see
     footprints = response.json()["data"]
     assert len(footprints) == 2
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_updated_le(client, auth_header, seed_database):
     filter_param = "$filter=updated le '2023-07-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -320,7 +519,6 @@ def test_list_product_footprints_with_filter_updated_le(client, auth_header, see
     assert len(footprints) == 3
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_updated_gt(client, auth_header, seed_database):
     filter_param = "$filter=updated gt '2023-07-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -329,7 +527,6 @@ def test_list_product_footprints_with_filter_updated_gt(client, auth_header, see
     assert len(footprints) == 2
 
 
-@pytest.mark.xfail(reason="Filter feature not implemented", strict=True)
 def test_list_product_footprints_with_filter_updated_ge(client, auth_header, seed_database):
     filter_param = "$filter=updated ge '2023-07-03T00:00:00.000Z'"
     response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
@@ -337,5 +534,197 @@ def test_list_product_footprints_with_filter_updated_ge(client, auth_header, see
     footprints = response.json()["data"]
     assert len(footprints) == 3
 
+@pytest.mark.parametrize("filter_param", [
+    "$filter=productCategoryCpc eq '22222' or productCategoryCpc eq '22223'",
+    "$filter=companyName eq 'Clean Product Company'",
+    "$filter=created ge 'not a timestamp'",
+    "$filter=" + "(" * 600 + "created eq '2023-01-01T00:00:00Z'" + ")" * 600,
+])
+def test_list_product_footprints_with_unsupported_filter(client, auth_header, seed_database, filter_param):
+    response = client.get(f"/2/footprints/?{filter_param}", headers=auth_header)
+    assert response.status_code == 400
+    assert response.json() == {"message": "Bad Request", "code": "BadRequest"}
+
+
+@pytest.mark.parametrize("stream_min_limit", [0, 1])
+@pytest.mark.parametrize("count_strategy, expected_meta", [("exact", {"total": 3}), ("estimated", {})])
+def test_list_product_footprints_with_filter_links_filtered_pages(
+    client, auth_header, seed_database, monkeypatch, stream_min_limit, count_strategy, expected_meta
+):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_STREAM_MIN_LIMIT", stream_min_limit)
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_COUNT_STRATEGY", count_strategy)
+
+    seen = []
+    url = "/2/footprints/?limit=2&$filter=productCategoryCpc ge '22222'"
+    while url:
+        response = client.get(url, headers=auth_header)
+        assert response.status_code == 200
+        assert response.json()["meta"] == expected_meta
+        seen.extend(footprint["productCategoryCpc"] for footprint in response.json()["data"])
+        link = response.headers.get("Link")
+        url = link[link.index("/2/footprints"):link.index(">")] if link else None
+
+    assert seen == ["22222", "22223", "22224"]
+
+
+def test_list_product_footprints_with_any_and_pcf_filters(client, auth_header, valid_json_product_footprint):
+    footprints = _bulk_footprints(valid_json_product_footprint, 2)
+    footprints[1]["productIds"] = ["urn:gtin:4712345060507"]
+    footprints[1]["pcf"] = {**footprints[1]["pcf"], "geographyCountry": "DE"}
+    client.post("/2/footprints/bulk", json=footprints, headers=auth_header)
+
+    for filter_param in [
+        "productIds/any(productId:(productId eq 'urn:gtin:4712345060507'))",
+        "pcf/geographyCountry eq 'DE' and companyIds/any(companyId:(companyId eq 'urn:epc:id:sgln:0614141.00002.0'))",
+    ]:
+        response = client.get(f"/2/footprints/?$filter={filter_param}", headers=auth_header)
+        assert response.status_code == 200
+        assert [footprint["id"] for footprint in response.json()["data"]] == [footprints[1]["id"]]
+
+
+@pytest.mark.parametrize("stream_min_limit", [0, 1])
+def test_list_product_footprints_by_product_and_company_id(
+    client, auth_header, valid_json_product_footprint, monkeypatch, stream_min_limit
+):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_STREAM_MIN_LIMIT", stream_min_limit)
+    footprints = _bulk_footprints(valid_json_product_footprint, 3)
+    footprints[1]["productIds"] = ["urn:gtin:4712345060507"]
+    footprints[2]["productIds"] = ["urn:gtin:4712345060507"]
+    footprints[2]["companyIds"] = ["urn:epc:id:sgln:0614141.00009.0"]
+    client.post("/2/footprints/bulk", json=footprints, headers=auth_header)
+
+    response = client.get("/2/footprints/by-product-id/urn:gtin:4712345060507?limit=1", headers=auth_header)
+    assert response.status_code == 200
+    assert [footprint["id"] for footprint in response.json()["data"]] == [footprints[1]["id"]]
+    assert response.json()["meta"] == {"total": 2}
+    assert "/2/footprints/by-product-id/urn:gtin:4712345060507?limit=1&offset=1" in response.headers["Link"]
+
+    response = client.get(
+        "/2/footprints/by-company-id/urn:epc:id:sgln:0614141.00002.0?$filter=productIds/any(p:p eq 'urn:gtin:4712345060507')",
+        headers=auth_header,
+    )
+    assert [footprint["id"] for footprint in response.json()["data"]] == [footprints[1]["id"]]
+
+    response = client.get("/2/footprints/by-company-id/urn:epc:id:sgln:0000000.00000.0", headers=auth_header)
+    assert response.json()["data"] == []
+
+
+@pytest.fixture
+def searchable_footprints(client, auth_header, valid_json_product_footprint):
+    footprints = _bulk_footprints(valid_json_product_footprint, 3)
+    for footprint, name, description in zip(footprints, ["Steel frame", "Solar panel", "Glass bottle"], [
+        "The frame of a solar panel", "A photovoltaic module", "A bottle",
+    ]):
+        footprint["productNameCompany"] = name
+        footprint["productDescription"] = description
+    footprints[0]["productCategoryCpc"] = "22223"
+    client.post("/2/footprints/bulk", json=footprints, headers=auth_header)
+    return footprints
+
+
+def test_search_product_footprints(client, auth_header, searchable_footprints):
+    response = client.get("/2/footprints/search?q=solar panels&limit=1", headers=auth_header)
+    assert response.status_code == 200
+    assert [footprint["id"] for footprint in response.json()["data"]] == [searchable_footprints[1]["id"]]
+    assert response.json()["meta"] == {"total": 2}
+    assert "/2/footprints/search?q=solar+panels&limit=1&offset=1" in response.headers["Link"]
+
+    response = client.get("/2/footprints/search?q=solar&limit=1&offset=1", headers=auth_header)
+    assert [footprint["id"] for footprint in response.json()["data"]] == [searchable_footprints[0]["id"]]
+    assert "Link" not in response.headers
+
+    response = client.get("/2/footprints/search?q=solar&$filter=productCategoryCpc eq '22223'", headers=auth_header)
+    assert [footprint["id"] for footprint in response.json()["data"]] == [searchable_footprints[0]["id"]]
+    assert response.json()["meta"] == {"total": 1}
+
+    response = client.get("/2/footprints/search?q=wooden", headers=auth_header)
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+
+
+@pytest.mark.parametrize("query", ["", "?q=", "?q=%20", f"?q=solar&cursor={encode_cursor(1)}", "?q=solar&$filter=or"])
+def test_search_product_footprints_bad_request(client, auth_header, searchable_footprints, query):
+    response = client.get(f"/2/footprints/search{query}", headers=auth_header)
+    assert response.status_code == 400
+    assert response.json() == {"message": "Bad Request", "code": "BadRequest"}
+
+
+def test_search_product_footprints_in_cursor_mode_links_by_offset(client, auth_header, searchable_footprints, monkeypatch):
+    monkeypatch.setattr("core.config.settings.PAGINATION_MODE", "cursor")
+
+    response = client.get("/2/footprints/search?q=solar&limit=1", headers=auth_header)
+    assert [footprint["id"] for footprint in response.json()["data"]] == [searchable_footprints[1]["id"]]
+    assert "offset=1" in response.headers["Link"]
+
+
 # add a test for bad requests, when i hit "/footprints/?limit=50, it returned a NoneType
 # error for the product_footprint call with has no attribute, need to catch that better
+
+
+def _bulk_footprints(valid_json_product_footprint, count):
+    return [{**valid_json_product_footprint, "id": str(uuid.UUID(int=i, version=4))} for i in range(count)]
+
+
+def test_create_product_footprints_bulk_json_array(client, auth_header, valid_json_product_footprint, monkeypatch):
+    monkeypatch.setattr("core.config.settings.FOOTPRINT_BULK_BATCH_SIZE", 2)
+    footprints = _bulk_footprints(valid_json_product_footprint, 3)
+    invalid = {**valid_json_product_footprint, "id": "not-a-uuid"}
+
+    response = client.post(
+        "/2/footprints/bulk", json=[footprints[0], invalid, footprints[1], footprints[0], footprints[2]],
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["meta"] == {"created": 3, "duplicate": 1, "invalid": 1}
+    assert [item["status"] for item in report["data"]] == ["created", "invalid", "created", "duplicate", "created"]
+    assert [item["index"] for item in report["data"]] == [0, 1, 2, 3, 4]
+    assert report["data"][1]["errors"][0]["loc"] == ["id"]
+    for footprint in footprints:
+        response = client.get(f"/2/footprints/{footprint['id']}", headers=auth_header)
+        assert response.status_code == 200
+        assert response.json()["data"]["companyName"] == "Clean Product Company"
+
+
+def test_create_product_footprints_bulk_ndjson(client, auth_header, valid_json_product_footprint):
+    footprints = _bulk_footprints(valid_json_product_footprint, 2)
+    client.post("/2/footprints/bulk", json=footprints[:1], headers=auth_header)
+    lines = [json.dumps(footprint) for footprint in footprints] + ["", "{not json"]
+
+    response = client.post(
+        "/2/footprints/bulk", content="\n".join(lines) + "\n",
+        headers={**auth_header, "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["data"]] == ["duplicate", "created", "invalid"]
+
+
+@pytest.mark.parametrize("body", [b'{"data": []}', b"[{", b""])
+def test_create_product_footprints_bulk_unreadable_body(client, auth_header, body):
+    response = client.post(
+        "/2/footprints/bulk", content=body, headers={**auth_header, "Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["code"] == "BadRequest"
+
+
+def test_export_product_footprints(client, auth_header, valid_json_product_footprint, monkeypatch):
+    monkeypatch.setattr("apis.version1.route_product_footprints.STREAM_CHUNK_BYTES", 1)
+    footprints = _bulk_footprints(valid_json_product_footprint, 3)
+    client.post("/2/footprints/bulk", json=footprints, headers=auth_header)
+
+    response = client.get("/2/footprints/export", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [footprint["id"] for footprint in footprints]
+    for line in lines:
+        assert line == client.get(f"/2/footprints/{json.loads(line)['id']}", headers=auth_header).text[len('{"data":'):-1]
+
+
+def test_export_product_footprints_requires_token(client):
+    assert client.get("/2/footprints/export").status_code == 400
@@ -1,3 +1,9 @@
+import jwt
+
+from core.config import settings
+from db.repository.users import update_user
+
+
 def test_create_user_by_superuser(client, superuser_auth_header):
     data = {"username": "testuser", "email": "testuser@example.com", "password": "testpassword"}
     response = client.post("/users/", headers=superuser_auth_header, json=data)
@@ -41,3 +47,38 @@ def test_create_user_with_existing_username(client, superuser_auth_header, test_
     assert response.status_code == 409
     assert response.json()["message"] == "A user with this username already exists"
     assert response.json()["code"] == "DuplicateEntry"
+
+
+def test_access_token_has_role_claims(auth_header, superuser_auth_header, test_user, test_superuser):
+    def claims(header):
+        token = header["Authorization"].removeprefix("Bearer ")
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    assert claims(superuser_auth_header)["roles"] == ["superuser"]
+    assert claims(superuser_auth_header)["sub"] == str(test_superuser.id)
+    assert claims(auth_header)["roles"] == []
+
+
+def test_create_user_checks_claims_without_user_lookup(client, superuser_auth_header, monkeypatch):
+    monkeypatch.setattr("db.repository.users.retrieve_user_by_id", None)
+
+    data = {"username": "testuser", "email": "testuser@example.com", "password": "testpassword"}
+    response = client.post("/users/", headers=superuser_auth_header, json=data)
+    assert response.status_code == 200
+
+
+def test_create_user_by_demoted_superuser(client, superuser_auth_header, test_superuser, db_session):
+    update_user(db=db_session, user_id=test_superuser.id, is_superuser=False)
+
+    data = {"username": "testuser", "email": "testuser@example.com", "password": "testpassword"}
+    response = client.post("/users/", headers=superuser_auth_header, json=data)
+    assert response.status_code == 403
+    assert response.json()["code"] == "AccessDenied"
+
+
+def test_create_user_by_promoted_user(client, auth_header, test_user, db_session):
+    update_user(db=db_session, user_id=test_user.id, is_superuser=True)
+
+    data = {"username": "newuser", "email": "newuser@example.com", "password": "testpassword"}
+    response = client.post("/users/", headers=auth_header, json=data)
+    assert response.status_code == 200